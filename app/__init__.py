@@ -1,3 +1 @@
-from .h2h_analyzer import H2HAnalyzer
-from .update_csv import update_all_csv
-from .sofascore import get_sofascore_team_stats
+from .services.h2h_analyzer import H2HAnalyzer
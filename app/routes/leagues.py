@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict
-from app.utils.file_manager import list_leagues
+from app.utils.file_manager import list_leagues_async
 
 router = APIRouter(prefix="/leagues", tags=["leagues"])
 
@@ -11,7 +11,7 @@ async def get_leagues():
     Lista todas as ligas disponíveis.
     """
     try:
-        leagues = list_leagues()
+        leagues = await list_leagues_async()
         return leagues
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao listar ligas: {str(e)}")
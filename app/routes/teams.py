@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Path, UploadFile, File
 from typing import List, Dict
-from app.utils.file_manager import list_teams, save_team_csv
+from app.utils.file_manager import list_teams_async, save_team_csv_async
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
@@ -13,7 +13,7 @@ async def get_teams(
     Lista todos os times de uma liga específica.
     """
     try:
-        teams = list_teams(league_id)
+        teams = await list_teams_async(league_id)
 
         if not teams:
             raise HTTPException(
@@ -43,7 +43,7 @@ async def upload_team_csv(
 
         file_bytes = await file.read()
 
-        saved_filename = save_team_csv(
+        saved_filename = await save_team_csv_async(
             league_id=league_id,
             filename=file.filename,
             file_bytes=file_bytes
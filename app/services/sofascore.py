@@ -1,10 +1,15 @@
-import aiohttp
 from typing import Optional, Dict, List
 from datetime import datetime
 import pandas as pd
 from config.settings import settings
 from app.utils.file_manager import save_team_data
-from utils.team_normalizer import slugify
+from app.utils.team_normalizer import slugify
+from backend.updater.team_ids import get_team_id_store
+from backend.updater.transport import http_get_async
+from backend.utils.match_ledger import get_match_ledger_store
+
+# Chaves que só o ledger de partidas usa (não entram no CSV do time)
+LEDGER_ONLY_KEYS = ["event_id", "timestamp", "home_goals_ht", "away_goals_ht"]
 
 
 class SofascoreService:
@@ -17,25 +22,33 @@ class SofascoreService:
 
     async def get_team_id(self, team_name: str) -> Optional[int]:
         """
-        Busca o ID do time no Sofascore.
+        Busca o ID do time no Sofascore (primeiro no cache de ids).
         """
+        ids = get_team_id_store()
+        known = ids.get(team_name)
+        if known:
+            return known["team_id"]
+
         try:
-            async with aiohttp.ClientSession() as session:
-                search_url = f"{self.api_url}/search/all"
-                params = {"q": team_name}
-
-                async with session.get(search_url, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        for item in data.get("results", []):
-                            if item.get("type") == "team":
-                                entity = item.get("entity", {})
-                                return entity.get("id")
+            search_url = f"{self.api_url}/search/all"
+            params = {"q": team_name}
+
+            response = await http_get_async(search_url, headers=self.headers, params=params)
+            if response.status == 200:
+                data = response.json()
+
+                for item in data.get("results", []):
+                    if item.get("type") == "team":
+                        entity = item.get("entity", {})
+                        if entity.get("id"):
+                            ids.put(team_name, entity["id"], entity.get("name"))
+                        return entity.get("id")
         except:
             pass
-        
-        return None
+
+        # entrada vencida e busca falhou: o id antigo continua valendo
+        stale = ids.get(team_name, allow_stale=True)
+        return stale["team_id"] if stale else None
     
 
     async def get_team_matches(self, team_id: int, limit: int = 20) -> List[Dict]:
@@ -45,17 +58,16 @@ class SofascoreService:
         matches = []
 
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.api_url}/team/{team_id}/events/last/{limit}"
+            url = f"{self.api_url}/team/{team_id}/events/last/{limit}"
 
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            response = await http_get_async(url, headers=self.headers)
+            if response.status == 200:
+                data = response.json()
 
-                        for event in data.get("events", []):
-                            md = await self._parse_match(event)
-                            if md:
-                                matches.append(md)
+                for event in data.get("events", []):
+                    md = await self._parse_match(event)
+                    if md:
+                        matches.append(md)
         except Exception as e:
             print("Erro get_team_matches:", e)
 
@@ -74,6 +86,10 @@ class SofascoreService:
                 "away_team": event["awayTeam"]["name"],
                 "home_goals": event["homeScore"]["current"],
                 "away_goals": event["awayScore"]["current"],
+                "event_id": event_id,
+                "timestamp": event["startTimestamp"],
+                "home_goals_ht": event["homeScore"].get("period1"),
+                "away_goals_ht": event["awayScore"].get("period1"),
             }
 
             # Stats detalhadas
@@ -105,37 +121,36 @@ class SofascoreService:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.api_url}/event/{event_id}/statistics"
+            url = f"{self.api_url}/event/{event_id}/statistics"
 
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            response = await http_get_async(url, headers=self.headers)
+            if response.status == 200:
+                data = response.json()
 
-                        for group in data.get("statistics", []):
-                            for g in group.get("groups", []):
-                                for item in g.get("statisticsItems", []):
-                                    name = item["name"].lower()
+                for group in data.get("statistics", []):
+                    for g in group.get("groups", []):
+                        for item in g.get("statisticsItems", []):
+                            name = item["name"].lower()
 
-                                    if "corner" in name:
-                                        stats["home_corners"] = item["homeValue"]
-                                        stats["away_corners"] = item["awayValue"]
+                            if "corner" in name:
+                                stats["home_corners"] = item["homeValue"]
+                                stats["away_corners"] = item["awayValue"]
 
-                                    elif "total shots" in name:
-                                        stats["home_shots"] = item["homeValue"]
-                                        stats["away_shots"] = item["awayValue"]
+                            elif "total shots" in name:
+                                stats["home_shots"] = item["homeValue"]
+                                stats["away_shots"] = item["awayValue"]
 
-                                    elif "shots on target" in name:
-                                        stats["home_target"] = item["homeValue"]
-                                        stats["away_target"] = item["awayValue"]
+                            elif "shots on target" in name:
+                                stats["home_target"] = item["homeValue"]
+                                stats["away_target"] = item["awayValue"]
 
-                                    elif "yellow" in name:
-                                        stats["home_yellow"] = item["homeValue"]
-                                        stats["away_yellow"] = item["awayValue"]
+                            elif "yellow" in name:
+                                stats["home_yellow"] = item["homeValue"]
+                                stats["away_yellow"] = item["awayValue"]
 
-                                    elif "red" in name:
-                                        stats["home_red"] = item["homeValue"]
-                                        stats["away_red"] = item["awayValue"]
+                            elif "red" in name:
+                                stats["home_red"] = item["homeValue"]
+                                stats["away_red"] = item["awayValue"]
 
         except Exception as e:
             print("Erro get_match_statistics:", e)
@@ -143,6 +158,19 @@ class SofascoreService:
         return stats
     
 
+    def _record_matches(self, league_id: str, matches: List[Dict]) -> None:
+        """
+        Grava as partidas no ledger da liga (append-only, sem duplicar jogos
+        já vistos pelo adversário). Falha aqui não impede a atualização do CSV.
+        """
+        if not settings.MATCH_LEDGER_ENABLED:
+            return
+        try:
+            get_match_ledger_store().append_matches(league_id, matches)
+        except Exception as e:
+            print("Erro ao gravar ledger de partidas:", e)
+
+
     async def update_team_csv(self, league_id: str, team_id: str, team_name: str) -> bool:
         """
         Atualiza o CSV do time com dados completos + estatísticas do Sofascore.
@@ -160,7 +188,8 @@ class SofascoreService:
                 print(f"Nenhuma partida encontrada para {team_name}")
                 return False
 
-            df = pd.DataFrame(matches)
+            self._record_matches(league_id, matches)
+            df = pd.DataFrame(matches).drop(columns=LEDGER_ONLY_KEYS, errors="ignore")
 
             # salva realmente o CSV do time
             team_slug = slugify(team_name)
@@ -1,9 +1,7 @@
-import asyncio
 from datetime import datetime, timedelta
 from typing import Dict
-from app.utils.file_manager import list_leagues, list_teams, save_team_csv
+from app.utils.file_manager import list_leagues, list_teams
 from app.services.sofascore import sofascore_service
-from utils.team_normalizer import slugify
 
 
 class CSVUpdateService:
@@ -20,6 +18,12 @@ class CSVUpdateService:
         
         time_since_update = datetime.now() - self.last_update
         return time_since_update >= timedelta(hours=self.update_interval_hours)
+
+    async def _update_team(self, league_id: str, team_id: str, team_name: str) -> None:
+        # id pelo cache de ids do SofaScore; busca só para times ainda não vistos.
+        # O ritmo das chamadas é o do limite de taxa do transporte (não há pausa fixa por time)
+        if not await sofascore_service.update_team_csv(league_id, team_id, team_name):
+            raise RuntimeError(f"falha ao atualizar {team_name}")
     
 
     async def update_all_teams(self) -> Dict:
@@ -40,12 +44,8 @@ class CSVUpdateService:
                 team_name = team["name"]
 
                 try:
-                    # baixa dados do Sofascore
-                    df = await sofascore_service.get_team_stats(team_name)
-
-                    # salva o CSV atualizado
-                    filename = slugify(team_name) + ".csv"
-                    save_team_csv(league_id, filename, df.to_csv(index=False).encode())
+                    # baixa dados do Sofascore e salva o CSV atualizado
+                    await self._update_team(league_id, team_id, team_name)
 
                     results["updated"].append(f"{league_id}/{team_id}")
 
@@ -55,8 +55,6 @@ class CSVUpdateService:
                         "error": str(e)
                     })
 
-                await asyncio.sleep(1)
-
         self.last_update = datetime.now()
         return results
     
@@ -71,10 +69,7 @@ class CSVUpdateService:
             team_name = team["name"]
 
             try:
-                df = await sofascore_service.get_team_stats(team_name)
-
-                filename = slugify(team_name) + ".csv"
-                save_team_csv(league_id, filename, df.to_csv(index=False).encode())
+                await self._update_team(league_id, team_id, team_name)
 
                 results["updated"].append(team_id)
 
@@ -84,8 +79,6 @@ class CSVUpdateService:
                     "error": str(e)
                 })
 
-            await asyncio.sleep(1)
-
         return results
     
 
@@ -95,10 +88,7 @@ class CSVUpdateService:
         """
         try:
             team_name = team_id.replace("-", " ").title()
-            df = await sofascore_service.get_team_stats(team_name)
-
-            filename = slugify(team_name) + ".csv"
-            save_team_csv(league_id, filename, df.to_csv(index=False).encode())
+            await self._update_team(league_id, team_id, team_name)
 
             return True
 
@@ -1,8 +1,20 @@
 import os
 from pathlib import Path
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.utils.team_normalizer import slugify
+from backend.utils.async_io import run_io
+from backend.utils.team_data import team_data
+from config.settings import settings
+
+
+def _sqlite_store():
+    """Store SQLite quando TEAM_STORE=sqlite; None para a árvore de CSVs."""
+    if settings.TEAM_STORE != "sqlite":
+        return None
+    from app.utils.sqlite_store import get_store
+
+    return get_store()
 
 
 def get_data_path() -> Path:
@@ -14,6 +26,10 @@ def get_leagues_path() -> Path:
 
 
 def list_leagues() -> List[dict]:
+    store = _sqlite_store()
+    if store is not None:
+        return store.list_leagues()
+
     leagues_path = get_leagues_path()
     if not leagues_path.exists():
         return []
@@ -30,6 +46,10 @@ def list_leagues() -> List[dict]:
 
 
 def list_teams(league_id: str) -> List[dict]:
+    store = _sqlite_store()
+    if store is not None:
+        return store.list_teams(league_id)
+
     league_path = get_leagues_path() / league_id
     if not league_path.exists():
         return []
@@ -45,13 +65,94 @@ def list_teams(league_id: str) -> List[dict]:
 
 
 def load_team_data(league_id: str, team_id: str) -> Optional[pd.DataFrame]:
-    csv_path = get_leagues_path() / league_id / f"{team_id}.csv"
+    store = _sqlite_store()
+    if store is not None:
+        return store.load_team_data(league_id, team_id)
 
-    if not csv_path.exists():
+    # mesma camada de dados (e cache) das rotas do backend; cópia porque o chamador pode alterar
+    data = team_data.load(get_leagues_path() / league_id / f"{team_id}.csv")
+    if data is None and (get_leagues_path() / league_id).is_dir():
+        # nome de exibição/apelido -> arquivo, pelo índice da liga (import aqui:
+        # name_index importa app.utils, que carrega este módulo)
+        from backend.utils.name_index import name_index
+
+        resolved = name_index.resolve(get_leagues_path(), league_id, team_id)
+        if resolved is not None:
+            data = team_data.load(get_leagues_path() / league_id / f"{resolved}.csv")
+    if data is None:
         return None
 
     try:
-        df = pd.read_csv(csv_path, sep=";|,", engine="python")
-        return df
+        return data.frame.copy()
     except Exception:
         return None
+
+
+def save_team_data(league_id: str, team_id: str, df: pd.DataFrame) -> bool:
+    store = _sqlite_store()
+    if store is not None:
+        return store.save_team_data(league_id, team_id, df)
+
+    league_path = get_leagues_path() / league_id
+    league_path.mkdir(parents=True, exist_ok=True)
+
+    try:
+        df.to_csv(league_path / f"{team_id}.csv", sep=";", index=False)
+        return True
+    except Exception:
+        return False
+
+
+def save_league_data(league_id: str, teams: Dict[str, pd.DataFrame]) -> bool:
+    """
+    Grava vários times de uma liga. No SQLite é uma única transação
+    (ou tudo ou nada); na árvore de CSVs, um arquivo por time.
+    """
+    store = _sqlite_store()
+    if store is not None:
+        return store.save_league(league_id, teams)
+
+    return all(save_team_data(league_id, team_id, df) for team_id, df in teams.items())
+
+
+def save_team_csv(league_id: str, filename: str, file_bytes: bytes) -> str:
+    stem = Path(filename).stem
+    saved_filename = f"{slugify(stem)}.csv"
+
+    store = _sqlite_store()
+    if store is not None:
+        # mesma falha que a escrita do CSV levantaria (a rota de upload responde 500)
+        if not store.save_team_data(league_id, Path(saved_filename).stem, file_bytes):
+            raise OSError(f"falha ao gravar {league_id}/{saved_filename} no SQLite")
+        return saved_filename
+
+    league_path = get_leagues_path() / league_id
+    league_path.mkdir(parents=True, exist_ok=True)
+
+    with open(league_path / saved_filename, "wb") as f:
+        f.write(file_bytes)
+
+    return saved_filename
+
+
+# ----------------------------------------------------
+# API ASSÍNCRONA (rotas async def)
+# ----------------------------------------------------
+# Mesmas funções no pool de I/O, com leituras simultâneas iguais deduplicadas.
+# O resultado é compartilhado entre as requisições que esperaram a mesma chave.
+async def list_leagues_async() -> List[dict]:
+    return await run_io(("list_leagues",), list_leagues)
+
+
+async def list_teams_async(league_id: str) -> List[dict]:
+    return await run_io(("list_teams", league_id), list_teams, league_id)
+
+
+async def load_team_data_async(league_id: str, team_id: str) -> Optional[pd.DataFrame]:
+    df = await run_io(("load_team_data", league_id, team_id), load_team_data, league_id, team_id)
+    # o DataFrame da leitura deduplicada é o mesmo para todos: cada chamador recebe a sua cópia
+    return df.copy() if df is not None else None
+
+
+async def save_team_csv_async(league_id: str, filename: str, file_bytes: bytes) -> str:
+    return await run_io(None, save_team_csv, league_id, filename, file_bytes)
@@ -0,0 +1,253 @@
+"""
+Armazenamento das estatísticas dos times em SQLite (stdlib, arquivo local).
+
+Alternativa ao diretório data/leagues/<liga>/<time>.csv, escolhida com
+TEAM_STORE=sqlite. O conteúdo de cada time continua sendo o mesmo CSV
+(separado por ;), guardado como BLOB: `load_team_data` devolve exatamente o
+DataFrame que a versão em arquivos devolveria.
+
+- WAL: leituras concorrentes não bloqueiam a escrita do updater
+- PRIMARY KEY (league_id, team_id): busca indexada por liga/time
+- `save_league()`: todos os times de uma liga em uma única transação
+- `import_csv_tree()` / `export_csv_tree()`: ida e volta com a árvore de CSVs
+
+Uso pela linha de comando:
+    python -m app.utils.sqlite_store import data/leagues
+    python -m app.utils.sqlite_store export /tmp/leagues
+"""
+import argparse
+import io
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from config.settings import settings
+
+TEAMS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leagues (
+    league_id  TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    meta       BLOB,            -- conteúdo do liga.json, quando existir
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    league_id  TEXT NOT NULL REFERENCES leagues(league_id) ON DELETE CASCADE,
+    team_id    TEXT NOT NULL,
+    name       TEXT NOT NULL,
+    data       BLOB NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (league_id, team_id)
+) WITHOUT ROWID;
+"""
+
+TeamData = Union[pd.DataFrame, bytes]
+
+
+def display_name(slug: str) -> str:
+    """Mesmo nome exibido pela versão em arquivos ("la-liga" -> "La Liga")."""
+    return slug.replace("-", " ").title()
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Conexão em autocommit (transações explícitas), WAL e synchronous=NORMAL."""
+    conn = sqlite3.connect(path, isolation_level=None, timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def _to_bytes(data: TeamData) -> bytes:
+    if isinstance(data, bytes):
+        return data
+    return data.to_csv(sep=";", index=False).encode("utf-8")
+
+
+class SQLiteDatabase:
+    """
+    Arquivo SQLite com uma conexão por thread (as rotas síncronas rodam no
+    threadpool) e o schema criado na abertura.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SQLiteTeamStore(SQLiteDatabase):
+    SCHEMA = TEAMS_SCHEMA
+
+    # ---------- leitura ----------
+    def list_leagues(self) -> List[dict]:
+        rows = self._connection().execute("SELECT league_id, name FROM leagues ORDER BY league_id").fetchall()
+        return [{"league_id": league_id, "name": name} for league_id, name in rows]
+
+    def list_teams(self, league_id: str) -> List[dict]:
+        rows = self._connection().execute(
+            "SELECT team_id, name FROM teams WHERE league_id = ? ORDER BY team_id", (league_id,)
+        ).fetchall()
+        return [{"team_id": team_id, "name": name} for team_id, name in rows]
+
+    def load_team_bytes(self, league_id: str, team_id: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT data FROM teams WHERE league_id = ? AND team_id = ?", (league_id, team_id)
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def load_team_data(self, league_id: str, team_id: str) -> Optional[pd.DataFrame]:
+        raw = self.load_team_bytes(league_id, team_id)
+        if raw is None:
+            return None
+        try:
+            return pd.read_csv(io.BytesIO(raw), sep=";|,", engine="python")
+        except Exception:
+            return None
+
+    # ---------- escrita ----------
+    def _upsert_league(self, conn: sqlite3.Connection, league_id: str, now: str) -> None:
+        conn.execute(
+            "INSERT INTO leagues (league_id, name, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(league_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (league_id, display_name(league_id), now),
+        )
+
+    def _upsert_team(self, conn: sqlite3.Connection, league_id: str, team_id: str, data: bytes, now: str) -> None:
+        conn.execute(
+            "INSERT INTO teams (league_id, team_id, name, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(league_id, team_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (league_id, team_id, display_name(team_id), data, now),
+        )
+
+    def save_team_data(self, league_id: str, team_id: str, data: TeamData) -> bool:
+        return self.save_league(league_id, {team_id: data})
+
+    def save_league(
+        self, league_id: str, teams: Dict[str, TeamData], replace: bool = False, meta: Optional[bytes] = None
+    ) -> bool:
+        """
+        Grava vários times de uma liga em uma única transação.
+        `replace=True` remove os times da liga que não estão em `teams`.
+        """
+        payload = [(team_id, _to_bytes(data)) for team_id, data in teams.items()]
+        now = _now()
+        try:
+            with self.transaction() as conn:
+                self._upsert_league(conn, league_id, now)
+                if meta is not None:
+                    conn.execute("UPDATE leagues SET meta = ? WHERE league_id = ?", (meta, league_id))
+                if replace:
+                    conn.execute("DELETE FROM teams WHERE league_id = ?", (league_id,))
+                for team_id, data in payload:
+                    self._upsert_team(conn, league_id, team_id, data, now)
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar liga {league_id} no SQLite: {e}")
+            return False
+
+    # ---------- importação / exportação ----------
+    def import_csv_tree(self, leagues_path: Path) -> Dict[str, int]:
+        """Importa data/leagues, com o liga.json (uma transação por liga). Devolve times por liga."""
+        counts: Dict[str, int] = {}
+        if not leagues_path.exists():
+            return counts
+        for league_dir in sorted(p for p in leagues_path.iterdir() if p.is_dir()):
+            teams = {csv_file.stem: csv_file.read_bytes() for csv_file in sorted(league_dir.glob("*.csv"))}
+            meta_file = league_dir / "liga.json"
+            meta = meta_file.read_bytes() if meta_file.exists() else None
+            if self.save_league(league_dir.name, teams, replace=True, meta=meta):
+                counts[league_dir.name] = len(teams)
+        return counts
+
+    def export_csv_tree(self, leagues_path: Path) -> Dict[str, int]:
+        """Escreve <liga>/<time>.csv (e o liga.json) com os bytes guardados. Devolve times por liga."""
+        counts: Dict[str, int] = {}
+        conn = self._connection()
+        for league_id, meta in conn.execute("SELECT league_id, meta FROM leagues ORDER BY league_id").fetchall():
+            league_dir = leagues_path / league_id
+            league_dir.mkdir(parents=True, exist_ok=True)
+            if meta is not None:
+                (league_dir / "liga.json").write_bytes(bytes(meta))
+            counts[league_id] = 0
+            for team_id, data in conn.execute(
+                "SELECT team_id, data FROM teams WHERE league_id = ? ORDER BY team_id", (league_id,)
+            ):
+                (league_dir / f"{team_id}.csv").write_bytes(bytes(data))
+                counts[league_id] += 1
+        return counts
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+_stores: Dict[Path, SQLiteTeamStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Optional[Path] = None) -> SQLiteTeamStore:
+    path = Path(path or settings.TEAM_STORE_SQLITE_PATH)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = SQLiteTeamStore(path)
+    return store
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Importa/exporta a árvore de CSVs para o SQLite.")
+    p.add_argument("command", choices=["import", "export"])
+    p.add_argument("leagues_dir", type=Path, nargs="?", default=settings.LEAGUES_DIR)
+    p.add_argument("--db", type=Path, default=settings.TEAM_STORE_SQLITE_PATH)
+    args = p.parse_args(argv)
+
+    store = get_store(args.db)
+    if args.command == "import":
+        counts = store.import_csv_tree(args.leagues_dir)
+    else:
+        counts = store.export_csv_tree(args.leagues_dir)
+
+    for league_id, n in counts.items():
+        print(f"{league_id}: {n} times")
+    print(f"{args.command}: {sum(counts.values())} times em {len(counts)} ligas ({args.db})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,30 @@
 import re
 import unicodedata
+from functools import lru_cache
 
+# Nomes de times são poucos e se repetem muito (toda requisição H2H, todo
+# upload, cada time nos loops do updater): o slug de cada um é calculado uma vez.
+SLUG_CACHE_SIZE = 8192
+
+_INVALID_CHARS = re.compile(r'[^\w\s-]')
+_SEPARATORS = re.compile(r'[-\s]+')
+_SLUG = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
 def slugify(text: str) -> str:
     if not text:
         return ""
-    text = unicodedata.normalize('NFKD', text)
-    text = text.encode('ascii', 'ignore').decode('ascii')
+    # NFKD + encode ascii não muda texto só com ASCII: pula direto para as regex
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = text.encode('ascii', 'ignore').decode('ascii')
+    elif _SLUG.fullmatch(text):
+        return text
     text = text.lower()
-    text = re.sub(r'[^\w\s-]', '', text)
+    text = _INVALID_CHARS.sub('', text)
     text = text.replace('_', '-')
-    text = re.sub(r'[-\s]+', '-', text)
+    text = _SEPARATORS.sub('-', text)
     return text.strip('-')
 
 
@@ -0,0 +1 @@
+# Backtest: liquida as sugestões de mercado do motor H2H sobre partidas históricas.
@@ -0,0 +1,290 @@
+"""
+Backtest das sugestões de mercado do motor H2H sobre temporadas inteiras.
+
+Para cada partida de um ledger (`backend/backtest/ledger.py`):
+
+1. features pré-jogo de cada time a partir das partidas ANTERIORES da mesma
+   temporada (médias expansivas: % de vitórias, over 1.5/2.5, BTTS, over 0.5 HT),
+   no formato de `TeamFeatures`;
+2. `evaluate()` de `backend/utils/h2h_model.py` escolhe os mesmos mercados que o
+   /api/h2h escolheria com aquelas médias;
+3. cada sugestão (ousada e conservadora) é liquidada contra o placar real, com
+   meio green / push / meio red (`settlement.py`, vetorizado em NumPy).
+
+Cada (liga, temporada) é independente: roda em paralelo num ProcessPoolExecutor.
+O resultado é uma tabela de apostas, agregada em taxa de acerto e ROI.
+
+Limitações: os ledgers não trazem odds, então o lucro usa odds fixas (--odds,
+padrão 1.90); e não há RPG por partida, então a força usa o default do motor
+(% de vitórias / 25), o mesmo de um CSV sem coluna de RPG.
+
+Uso:
+    python -m backend.backtest.engine --ledgers data/ledgers --workers 4 --output backtest.json
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.backtest.ledger import LedgerFile, discover_ledgers, load_ledger
+from backend.backtest.settlement import profit, settle_handicap, settle_over
+from backend.utils.h2h_model import VARIANTS, TeamFeatures, evaluate
+from config.settings import settings
+
+DEFAULT_ODDS = 1.90
+DEFAULT_MIN_HISTORY = 3
+PROFILES = ("ousada", "conservadora")
+
+BET_COLUMNS = [
+    "league", "season", "date", "home_team", "away_team",
+    "market", "profile", "kind", "period", "side", "line", "outcome", "profit",
+]
+GROUP_COLUMNS = ["market", "profile", "kind", "period", "side", "line"]
+
+
+# ----------------------------------------------------
+# FEATURES PRÉ-JOGO
+# ----------------------------------------------------
+def pre_match_features(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Médias de cada time antes de cada partida (só jogos anteriores).
+    Devolve uma linha por partida com colunas home_* / away_*:
+    n (jogos anteriores), win, over15, over25, btts, over05_ht (em %).
+    """
+    n_matches = len(matches)
+    idx = np.arange(n_matches)
+    ht_total = matches["home_goals_ht"].to_numpy(float) + matches["away_goals_ht"].to_numpy(float)
+
+    sides = []
+    for side, gf_col, ga_col in (("home", "home_goals", "away_goals"), ("away", "away_goals", "home_goals")):
+        gf = matches[gf_col].to_numpy(float)
+        ga = matches[ga_col].to_numpy(float)
+        total = gf + ga
+        sides.append(pd.DataFrame({
+            "match": idx,
+            "side": side,
+            "team": matches[f"{side}_team"].to_numpy(),
+            "win": (gf > ga).astype(float),
+            "over15": (total >= 2).astype(float),
+            "over25": (total >= 3).astype(float),
+            "btts": ((gf > 0) & (ga > 0)).astype(float),
+            "ht_known": (~np.isnan(ht_total)).astype(float),
+            "over05_ht": np.where(np.isnan(ht_total), 0.0, (ht_total >= 1).astype(float)),
+        }))
+
+    # ordem cronológica: o time da casa e o visitante entram juntos em cada partida
+    long = pd.concat(sides, ignore_index=True).sort_values("match", kind="stable")
+    stats = ["win", "over15", "over25", "btts", "over05_ht", "ht_known"]
+    prior = long.groupby("team", sort=False)[stats].cumsum() - long[stats]
+    n = long.groupby("team", sort=False).cumcount().to_numpy(float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = pd.DataFrame({
+            "match": long["match"].to_numpy(),
+            "side": long["side"].to_numpy(),
+            "n": n,
+            "win": 100.0 * prior["win"].to_numpy() / n,
+            "over15": 100.0 * prior["over15"].to_numpy() / n,
+            "over25": 100.0 * prior["over25"].to_numpy() / n,
+            "btts": 100.0 * prior["btts"].to_numpy() / n,
+            # sem placar de HT nos jogos anteriores -> NaN (o motor usa o proxy por FT)
+            "over05_ht": 100.0 * prior["over05_ht"].to_numpy() / prior["ht_known"].to_numpy(),
+        })
+
+    wide = features.pivot(index="match", columns="side")
+    wide.columns = [f"{side}_{stat}" for stat, side in wide.columns]
+    return wide.reindex(idx)
+
+
+def _team_features(row: Dict[str, float], side: str) -> TeamFeatures:
+    win = row[f"{side}_win"]
+    return TeamFeatures(
+        win,
+        win,
+        float("nan"),
+        row[f"{side}_over15"],
+        row[f"{side}_over25"],
+        row[f"{side}_btts"],
+        row[f"{side}_over05_ht"],
+    )
+
+
+# ----------------------------------------------------
+# BACKTEST DE UM LEDGER
+# ----------------------------------------------------
+def backtest_matches(
+    matches: pd.DataFrame,
+    league: str = "",
+    season: str = "",
+    odds: float = DEFAULT_ODDS,
+    min_history: int = DEFAULT_MIN_HISTORY,
+) -> pd.DataFrame:
+    """Uma linha por aposta sugerida e liquidada (colunas BET_COLUMNS)."""
+    features = pre_match_features(matches)
+    eligible = (features["home_n"] >= min_history) & (features["away_n"] >= min_history)
+
+    match_idx: List[int] = []
+    variant_idx: List[int] = []
+    profile_idx: List[int] = []
+    bet_home: List[bool] = []
+    for i, row in zip(features.index[eligible], features[eligible].to_dict("records")):
+        result = evaluate(_team_features(row, "home"), _team_features(row, "away"))
+        for v in result.picks:
+            for p, profile in enumerate(PROFILES):
+                bet = getattr(VARIANTS[v], profile).bet
+                match_idx.append(i)
+                variant_idx.append(v)
+                profile_idx.append(p)
+                # fav/dog -> lado do placar
+                bet_home.append((bet.side == "fav") == result.fav_is_home)
+
+    if not match_idx:
+        return pd.DataFrame(columns=BET_COLUMNS)
+
+    m = np.asarray(match_idx)
+    specs = [getattr(VARIANTS[v], PROFILES[p]).bet for v, p in zip(variant_idx, profile_idx)]
+    kind = np.array([s.kind for s in specs])
+    period = np.array([s.period for s in specs])
+    line = np.array([s.line for s in specs], dtype=float)
+
+    ht = period == "HT"
+    home_goals = np.where(ht, matches["home_goals_ht"].to_numpy(float)[m], matches["home_goals"].to_numpy(float)[m])
+    away_goals = np.where(ht, matches["away_goals_ht"].to_numpy(float)[m], matches["away_goals"].to_numpy(float)[m])
+    goal_diff = np.where(bet_home, home_goals - away_goals, away_goals - home_goals)
+
+    outcome = np.where(
+        kind == "ah",
+        settle_handicap(goal_diff, line),
+        settle_over(home_goals + away_goals, line),
+    )
+
+    bets = pd.DataFrame({
+        "league": league,
+        "season": season,
+        "date": matches["date"].to_numpy()[m],
+        "home_team": matches["home_team"].to_numpy()[m],
+        "away_team": matches["away_team"].to_numpy()[m],
+        "market": [VARIANTS[v].market_name for v in variant_idx],
+        "profile": [PROFILES[p] for p in profile_idx],
+        "kind": kind,
+        "period": period,
+        "side": [s.side or "" for s in specs],
+        "line": line,
+        "outcome": outcome,
+        "profit": profit(outcome, odds),
+    })
+    # HT sem placar de intervalo no ledger: não dá para liquidar
+    return bets[~np.isnan(outcome)].reset_index(drop=True)
+
+
+def _backtest_file(job: LedgerFile, odds: float, min_history: int) -> pd.DataFrame:
+    try:
+        matches = load_ledger(job.path)
+    except Exception as e:
+        print(f"Ledger ignorado ({job.path}): {e}")
+        return pd.DataFrame(columns=BET_COLUMNS)
+    return backtest_matches(matches, job.league, job.season, odds, min_history)
+
+
+def run_backtest(
+    ledgers: Sequence[LedgerFile],
+    workers: Optional[int] = None,
+    odds: float = DEFAULT_ODDS,
+    min_history: int = DEFAULT_MIN_HISTORY,
+) -> pd.DataFrame:
+    """Backtest de vários ledgers; com workers > 1, um processo por (liga, temporada)."""
+    workers = workers or os.cpu_count() or 1
+    n = len(ledgers)
+    if workers <= 1 or n <= 1:
+        parts = [_backtest_file(job, odds, min_history) for job in ledgers]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, n)) as pool:
+            parts = list(pool.map(_backtest_file, ledgers, [odds] * n, [min_history] * n))
+
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=BET_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+# ----------------------------------------------------
+# TABELAS
+# ----------------------------------------------------
+def summarize_bets(bets: pd.DataFrame, by: Sequence[str]) -> pd.DataFrame:
+    """
+    Contagem por resultado, taxa de acerto e ROI por grupo.
+    hit_rate = (greens + meio greens) / apostas não devolvidas; roi = lucro / apostas.
+    """
+    outcome = bets["outcome"]
+    counts = pd.DataFrame({
+        **{col: bets[col] for col in by},
+        "bets": 1,
+        "wins": (outcome == 1.0).astype(int),
+        "half_wins": (outcome == 0.5).astype(int),
+        "pushes": (outcome == 0.0).astype(int),
+        "half_losses": (outcome == -0.5).astype(int),
+        "losses": (outcome == -1.0).astype(int),
+        "profit": bets["profit"],
+    })
+    table = counts.groupby(list(by), sort=True).sum().reset_index() if by else counts.sum().to_frame().T
+
+    decided = table["bets"] - table["pushes"]
+    table["hit_rate"] = ((table["wins"] + table["half_wins"]) / decided.where(decided > 0)).round(4)
+    table["roi"] = (table["profit"] / table["bets"]).round(4)
+    table["profit"] = table["profit"].round(2)
+    return table
+
+
+def build_report(bets: pd.DataFrame) -> Dict[str, Any]:
+    if bets.empty:
+        return {"bets": 0, "by_season": [], "by_market": [], "by_profile": []}
+    return {
+        "bets": int(len(bets)),
+        "by_season": summarize_bets(bets, ["league", "season"] + GROUP_COLUMNS).to_dict("records"),
+        "by_market": summarize_bets(bets, GROUP_COLUMNS).to_dict("records"),
+        "by_profile": summarize_bets(bets, ["profile"]).to_dict("records"),
+    }
+
+
+# ----------------------------------------------------
+# CLI
+# ----------------------------------------------------
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Backtest das sugestões de mercado H2H sobre os ledgers.")
+    p.add_argument("--ledgers", type=Path, default=settings.LEDGERS_DIR)
+    p.add_argument("--league", action="append", default=None, help="só estas ligas (repetível)")
+    p.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    p.add_argument("--odds", type=float, default=DEFAULT_ODDS, help="odds fixas por aposta")
+    p.add_argument("--min-history", type=int, default=DEFAULT_MIN_HISTORY, help="jogos anteriores mínimos por time")
+    p.add_argument("--output", type=Path, default=None, help="relatório JSON")
+    p.add_argument("--bets-csv", type=Path, default=None, help="todas as apostas liquidadas (CSV ;)")
+    args = p.parse_args(argv)
+
+    ledgers = discover_ledgers(args.ledgers)
+    if args.league:
+        ledgers = [job for job in ledgers if job.league in args.league]
+    if not ledgers:
+        print(f"Nenhum ledger em {args.ledgers}")
+        return
+
+    bets = run_backtest(ledgers, args.workers, args.odds, args.min_history)
+    report = build_report(bets)
+    report.update({"ledgers": len(ledgers), "odds": args.odds, "min_history": args.min_history})
+
+    if args.bets_csv:
+        bets.to_csv(args.bets_csv, sep=";", index=False)
+    if args.output:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+
+    print(f"{len(ledgers)} ledgers, {report['bets']} apostas liquidadas")
+    if report["bets"]:
+        print(summarize_bets(bets, GROUP_COLUMNS).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Histórico de partidas ("ledger") por liga e temporada.
+
+Formato: data/ledgers/<liga>/<temporada>.csv, separado por ;, com as mesmas
+chaves que `SofaScoreService._parse_match` produz:
+
+    date;home_team;away_team;home_goals;away_goals[;home_goals_ht;away_goals_ht;...]
+
+Os placares do 1º tempo são opcionais: sem eles os mercados HT não são
+liquidados. Colunas extras (escanteios, chutes, cartões) são ignoradas aqui.
+
+Também lê os ledgers colunares <liga>/<temporada>.ledger gravados pelo
+updater (`backend/utils/match_ledger.py`); se os dois existirem para a mesma
+temporada, vale o .ledger.
+"""
+from pathlib import Path
+from typing import List, NamedTuple
+
+import pandas as pd
+
+from backend.utils.match_ledger import LEDGER_SUFFIX, SeasonLedger
+
+REQUIRED_COLUMNS = ("date", "home_team", "away_team", "home_goals", "away_goals")
+HT_COLUMNS = ("home_goals_ht", "away_goals_ht")
+
+
+class LedgerFile(NamedTuple):
+    league: str
+    season: str
+    path: Path
+
+
+def discover_ledgers(root: Path) -> List[LedgerFile]:
+    """Todos os <liga>/<temporada>.ledger|.csv abaixo de `root`, em ordem."""
+    if not root.exists():
+        return []
+    found: List[LedgerFile] = []
+    for league_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        seasons = {f.stem: f for f in league_dir.glob("*.csv")}
+        seasons.update({f.stem: f for f in league_dir.glob(f"*{LEDGER_SUFFIX}")})
+        found.extend(LedgerFile(league_dir.name, season, seasons[season]) for season in sorted(seasons))
+    return found
+
+
+def load_ledger(path: Path) -> pd.DataFrame:
+    """
+    Lê um ledger, descarta partidas sem placar e ordena por data (estável,
+    preservando a ordem do arquivo no mesmo dia).
+    """
+    if path.suffix == LEDGER_SUFFIX:
+        df = SeasonLedger(path).frame()
+    else:
+        df = pd.read_csv(path, sep=";")
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path}: colunas obrigatórias ausentes: {', '.join(missing)}")
+
+    for col in ("home_goals", "away_goals") + HT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            df[col] = float("nan")
+
+    df = df.dropna(subset=["home_goals", "away_goals"])
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
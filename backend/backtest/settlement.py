@@ -0,0 +1,45 @@
+"""
+Liquidação vetorizada de linhas asiáticas (handicap e total de gols).
+
+Uma linha de quarto (ex.: -0.25, 2.75) é dividida em duas meias apostas nas
+linhas vizinhas (-0.5/0.0, 2.5/3.0). Cada meia aposta ganha, devolve ou
+perde pelo sinal da margem, então o resultado da aposta inteira é
+
+    outcome = (sign(margem_a) + sign(margem_b)) / 2
+
+com valores 1 (green), 0.5 (meio green), 0 (push), -0.5 (meio red), -1 (red).
+Linhas inteiras e de meio gol caem no mesmo cálculo (as duas metades iguais).
+"""
+import numpy as np
+
+WIN, HALF_WIN, PUSH, HALF_LOSS, LOSS = 1.0, 0.5, 0.0, -0.5, -1.0
+
+
+def _split(line: np.ndarray):
+    """Linhas das duas metades: quartos viram (linha - 0.25, linha + 0.25)."""
+    quarter = np.isclose(np.mod(np.abs(line) * 4.0, 2.0), 1.0)
+    offset = np.where(quarter, 0.25, 0.0)
+    return line - offset, line + offset
+
+
+def settle_handicap(goal_diff: np.ndarray, line: np.ndarray) -> np.ndarray:
+    """
+    Handicap asiático do ponto de vista do time apostado.
+    `goal_diff` = gols do time - gols do adversário; `line` ex.: -0.25, +0.5.
+    """
+    goal_diff = np.asarray(goal_diff, dtype=float)
+    line_a, line_b = _split(np.asarray(line, dtype=float))
+    return (np.sign(goal_diff + line_a) + np.sign(goal_diff + line_b)) / 2.0
+
+
+def settle_over(total_goals: np.ndarray, line: np.ndarray) -> np.ndarray:
+    """Over asiático: `total_goals` contra a linha (ex.: 2.75)."""
+    total_goals = np.asarray(total_goals, dtype=float)
+    line_a, line_b = _split(np.asarray(line, dtype=float))
+    return (np.sign(total_goals - line_a) + np.sign(total_goals - line_b)) / 2.0
+
+
+def profit(outcome: np.ndarray, odds: np.ndarray) -> np.ndarray:
+    """Lucro por unidade apostada: a parte ganha paga (odds - 1), a perdida custa 1."""
+    outcome = np.asarray(outcome, dtype=float)
+    return np.where(outcome > 0, outcome * (np.asarray(odds, dtype=float) - 1.0), outcome)
@@ -1,5 +1,8 @@
-from fastapi import FastAPI
+from typing import Iterable
+
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from .routers.leagues import router as leagues_router
 from .routers.teams import router as teams_router
@@ -9,38 +12,103 @@ from .routers.update import router as update_router
 from .routers.logos import router as logos_router
 
 from .updater.update_engine import schedule_background_updates
+from .utils import metrics
+from .utils.compression import CompressionMiddleware
+
+
+# No app da raiz as rotas /api do backend também ficam sob este prefixo
+# (/api/v2/h2h, ...), porque /api/h2h, /api/leagues e / seguem no formato Base44
+API_V2_PREFIX = "/api/v2"
+
+
+def create_app(title: str = "Base44 H2H Backend", legacy_routers: Iterable[APIRouter] = ()) -> FastAPI:
+    """
+    Monta o serviço único: middlewares, routers /api e scheduler.
+
+    `legacy_routers` (o main.py da raiz passa as rotas no formato Base44)
+    entram antes dos routers /api, nos paths originais: o contrato do front
+    (`/api/leagues`, `/api/teams/{liga}`, `/api/h2h`, `/`) não muda. Nesse
+    caso os routers do backend são montados também sob API_V2_PREFIX, onde
+    `/api/v2/h2h` tem ETag, `as_of`, `form`, `table` etc. Os dois conjuntos
+    compartilham a mesma camada de dados (utils/team_data.py), caches e motor,
+    então rodar um processo só basta.
+    """
+    app = FastAPI(title=title)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "Last-Modified"],
+    )
+
+    # gzip/br nas respostas sem cache (as do response_cache já saem comprimidas)
+    app.add_middleware(CompressionMiddleware)
 
-app = FastAPI(title="Base44 H2H Backend")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# API routers
-app.include_router(leagues_router, prefix="/api")
-app.include_router(teams_router, prefix="/api")
-app.include_router(h2h_router, prefix="/api")
-app.include_router(upload_router, prefix="/api")
-app.include_router(update_router, prefix="/api")
-app.include_router(logos_router, prefix="/api")
-
-@app.on_event("startup")
-def _start_scheduler() -> None:
+    # Latência por rota (histogramas expostos em /metrics)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    # rotas Base44 primeiro: têm prioridade nos paths repetidos
+    legacy_routers = list(legacy_routers)
+    for router in legacy_routers:
+        app.include_router(router)
+
+    # API routers
+    prefixes = ["/api", API_V2_PREFIX] if legacy_routers else ["/api"]
+    for prefix in prefixes:
+        app.include_router(leagues_router, prefix=prefix)
+        app.include_router(teams_router, prefix=prefix)
+        app.include_router(h2h_router, prefix=prefix)
+        app.include_router(upload_router, prefix=prefix)
+        app.include_router(update_router, prefix=prefix)
+        app.include_router(logos_router, prefix=prefix)
+
+    @app.on_event("startup")
+    def _start_scheduler() -> None:
+        """
+        Inicializa o scheduler em background para atualizar as ligas a cada 48 horas.
+        Se o APScheduler não estiver instalado, a função simplesmente não faz nada,
+        assim o backend continua funcionando normalmente.
+        """
+        schedule_background_updates()
+
+    @app.get("/")
+    def root():
+        return {
+            "status": "online",
+            "backend": "Base44 H2H Backend v2",
+            "message": "API H2H + updater incremental de CSVs ativa"
+        }
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        """
+        Métricas no formato texto do Prometheus:
+        latência por rota, fases do H2H e acertos/erros de cache.
+        """
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    _drop_shadowed_routes(app)
+    return app
+
+
+def _drop_shadowed_routes(app: FastAPI) -> None:
     """
-    Inicializa o scheduler em background para atualizar as ligas a cada 48 horas.
-    Se o APScheduler não estiver instalado, a função simplesmente não faz nada,
-    assim o backend continua funcionando normalmente.
+    Remove as rotas que nunca seriam atingidas: mesmo path e método de uma
+    rota registrada antes (no app da raiz, /api/leagues, /api/h2h e / do
+    backend ficam atrás das Base44). Sem isso o OpenAPI repete operation ids.
     """
-    schedule_background_updates()
-
-@app.get("/")
-def root():
-    return {
-        "status": "online",
-        "backend": "Base44 H2H Backend v2",
-        "message": "API H2H + updater incremental de CSVs ativa"
-    }
+    seen = set()
+    routes = []
+    for route in app.router.routes:
+        key = (getattr(route, "path", None), frozenset(getattr(route, "methods", None) or ()))
+        if key[0] is not None and key[1] and key in seen:
+            continue
+        seen.add(key)
+        routes.append(route)
+    app.router.routes[:] = routes
+
+
+app = create_app()
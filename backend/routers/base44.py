@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException
+
+from config.settings import settings
+from ..utils.h2h_model import evaluate
+from ..utils.json_codec import FastJSONResponse
+from ..utils.name_index import name_index
+from ..utils.team_data import team_data
+
+# Rotas no formato do Base44 (antes servidas pelo main.py da raiz, com leitura própria
+# dos CSVs). Mesma camada de dados e mesmo motor das rotas /api do backend; no app da
+# raiz ficam nos paths originais e o backend vai para /api/v2 (backend/main.py).
+router = APIRouter(tags=["Base44"], default_response_class=FastJSONResponse)
+
+# mesma pasta (e mesmas chaves de cache em team_data / name_index) das rotas /api
+BASE = settings.LEAGUES_DIR
+
+
+def load_team(league_slug: str, team_slug: str):
+    # slug exato primeiro; senão nome de exibição/apelido pelo índice da liga
+    data = team_data.load(team_data.team_csv(BASE, league_slug, team_slug))
+    if data is None and (BASE / league_slug).is_dir():
+        resolved = name_index.resolve(BASE, league_slug, team_slug)
+        if resolved is not None:
+            data = team_data.load(team_data.team_csv(BASE, league_slug, resolved))
+    if data is None:
+        raise HTTPException(status_code=404, detail="CSV do time não encontrado.")
+    return data
+
+
+# ----------------------------------------------------
+# LISTAR LIGAS
+# ----------------------------------------------------
+@router.get("/api/leagues")
+def list_leagues():
+    if not BASE.exists():
+        raise HTTPException(status_code=404, detail="Diretório 'leagues' não encontrado.")
+    return {"leagues": team_data.leagues(BASE)}
+
+
+# ----------------------------------------------------
+# LISTAR TIMES DE UMA LIGA (FORMATO BASE44)
+# ----------------------------------------------------
+@router.get("/api/teams/{league_slug}")
+def list_teams(league_slug: str):
+    if not (BASE / league_slug).exists():
+        raise HTTPException(status_code=404, detail="Liga não encontrada.")
+
+    teams = [
+        {"team_slug": slug, "team_name": slug.replace("-", " ").title()}
+        for slug in team_data.team_slugs(BASE, league_slug)
+    ]
+    return {"teams": teams}
+
+
+# ----------------------------------------------------
+# H2H ENTRE DOIS TIMES (FORMATO BASE44)
+# ----------------------------------------------------
+@router.get("/api/h2h")
+def h2h(league: str, home: str, away: str):
+    home_data = load_team(league, home)
+    away_data = load_team(league, away)
+
+    # Favorito e confiança pelo motor H2H (as mesmas features em cache do /api/h2h).
+    # Antes era um placeholder: o time com mais linhas no CSV e confiança fixa 0.70.
+    # Agora `better_team` é o de maior probabilidade de vitória e `confidence` essa
+    # probabilidade em 0..1 (mesmas chaves e tipos; muda o significado dos valores).
+    result = evaluate(home_data.features, away_data.features)
+    home_is_better = result.home_win >= result.away_win
+    prediction = {
+        "better_team": home if home_is_better else away,
+        "confidence": round((result.home_win if home_is_better else result.away_win) / 100.0, 2),
+    }
+
+    # (linhas do CSV são só strings: serializa direto, sem jsonable_encoder)
+    return FastJSONResponse({
+        "data": {
+            "league": league,
+            "home": {
+                "slug": home,
+                "name": home.replace("-", " ").title(),
+                "stats": home_data.rows,
+            },
+            "away": {
+                "slug": away,
+                "name": away.replace("-", " ").title(),
+                "stats": away_data.rows,
+            },
+            "prediction": prediction,
+        }
+    })
+
+
+@router.get("/")
+def root():
+    return {"status": "Backend H2H API rodando no Render 🔥"}
@@ -1,19 +1,38 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 
-from app.utils.file_manager import list_teams
-from services.h2h_analyzer import build_h2h_response
-from utils.team_normalizer import slugify
+from config.settings import settings
+from ..utils.form_metrics import FORM_CHOICES, form_tracker
+from ..utils.h2h_engine import evaluate_h2h
+from ..utils.h2h_model import H2HResult, evaluate
+from ..utils.metrics import timed
+from ..utils.name_index import LeagueNameIndex, name_index
+from ..utils.power_ranking import LeagueRanking, get_ranking_store
+from ..utils.response_cache import cached_json_response, files_version, render_json
+from ..utils.scoreline_model import scoreline_engine
+from ..utils.shared_stats import shared_stats
+from ..utils.snapshots import get_snapshot_store, to_ts
+from ..utils.team_data import team_data
 
 router = APIRouter(prefix="/h2h", tags=["H2H"])
 
-# Caminho REAL da pasta de CSVs
-BASE = Path(__file__).resolve().parent.parent.parent / "data" / "leagues"
+# Caminho REAL da pasta de CSVs (o mesmo das rotas Base44 e de teams)
+BASE = settings.LEAGUES_DIR
+
+PHASE_METRIC = "h2h_phase_duration_seconds"
 
 
 @router.get("")
-def h2h(league: str, home: str, away: str):
+def h2h(
+    request: Request,
+    league: str,
+    home: str,
+    away: str,
+    as_of: Optional[str] = None,
+    form: Optional[str] = None,
+):
     """
     Analisa confronto H2H com base nos CSVs de cada time
     e retorna:
@@ -25,37 +44,202 @@ def h2h(league: str, home: str, away: str):
     - tendência escanteios
     - dica principal
     - mercados asiáticos
+
+    O resultado é função pura dos dois CSVs: o ETag vem da versão
+    (mtime/tamanho) dos arquivos e repetições são servidas do cache.
+
+    `as_of` (ISO 8601, ex.: 2025-03-01 ou 2025-03-01T18:00:00Z) usa os
+    snapshots históricos: a versão de cada time vigente naquele instante.
+
+    `form` (5, 10, 20 ou ewm) troca as médias dos CSVs pela forma recente
+    de cada time, calculada das partidas do ledger (utils/form_metrics.py).
+
+    Quando a liga já tem ranking (gravado pelo updater a cada atualização,
+    utils/power_ranking.py), a resposta inclui o bloco `table` com posição,
+    pontos e força (Massey) de cada time; não há parâmetro para isso.
     """
 
+    # histórico: não depende dos CSVs atuais (o time pode ter sido removido ou renomeado)
+    if as_of is not None:
+        return _h2h_as_of(request, league, home, away, as_of)
+
     league_path = BASE / league
 
     if not league_path.exists():
         raise HTTPException(status_code=404, detail=f"Liga '{league}' não encontrada.")
 
-    # Normaliza nomes dos arquivos (Barcelona → barcelona.csv)
-    home_slug = slugify(home)
-    away_slug = slugify(away)
+    # Nome de exibição, slug ou apelido -> arquivo do time (índice por liga, utils/name_index.py)
+    names = name_index.league(BASE, league)
+    home_slug = _resolve_team(names, league, home)
+    away_slug = _resolve_team(names, league, away)
 
     home_csv = league_path / f"{home_slug}.csv"
     away_csv = league_path / f"{away_slug}.csv"
 
-    if not home_csv.exists():
-        raise HTTPException(status_code=404, detail=f"Time '{home}' não encontrado na liga '{league}'.")
+    if form is not None:
+        return _h2h_form(request, league, home, away, form)
 
-    if not away_csv.exists():
-        raise HTTPException(status_code=404, detail=f"Time '{away}' não encontrado na liga '{league}'.")
+    ranking = get_ranking_store().get(league)
+    ranking_version = ranking.version if ranking is not None else ()
 
-    # Suporte para ; ou ,
-    df_home = pd.read_csv(home_csv, sep=";|,", engine="python")
-    df_away = pd.read_csv(away_csv, sep=";|,", engine="python")
+    if settings.SHARED_STATS_ENABLED:
+        shared = shared_stats.league(league)
+        if shared is not None:
+            result = shared.matrix.get(home_csv.stem, away_csv.stem)
+            if result is not None:
+                # matriz compilada pelo carregador: a versão publicada identifica a resposta
+                return cached_json_response(
+                    request,
+                    ("h2h", "shared", league, home, away),
+                    (shared.version,) + ranking_version,
+                    lambda: _serialize(league, home, away, result, ranking),
+                )
 
-    # Usa o motor H2H PROFISSIONAL
-    response = build_h2h_response(
-        league_id=league,
-        home_df=df_home,
-        away_df=df_away,
-        home_name=home,
-        away_name=away
+    return cached_json_response(
+        request,
+        ("h2h", str(league_path), home, away),
+        files_version([home_csv, away_csv]) + ranking_version,
+        lambda: _compute_h2h(league, home, away, home_csv, away_csv, ranking),
     )
 
-    return response
+
+def _resolve_team(names: LeagueNameIndex, league: str, team: str) -> str:
+    slug = names.resolve(team)
+    if slug is None:
+        suggestions = names.suggestions(team)
+        hint = f" Você quis dizer: {', '.join(suggestions)}?" if suggestions else ""
+        raise HTTPException(status_code=404, detail=f"Time '{team}' não encontrado na liga '{league}'.{hint}")
+    return slug
+
+
+@router.get("/scoreline")
+def h2h_scoreline(request: Request, league: str, home: str, away: str):
+    """
+    Probabilidades do modelo de placares (Poisson / Dixon-Coles) ajustado
+    com as partidas do ledger da liga: gols esperados, 1X2, over/under,
+    BTTS, placares mais prováveis e a distribuição de cada linha asiática
+    (green / meio green / push / meio red / red) com a odd justa.
+
+    O ajuste é feito pelo updater (update_league) e fica em cache por liga
+    até o ledger mudar; a requisição consulta os arrays pré-calculados.
+    """
+    with timed(PHASE_METRIC, phase="model_fit"):
+        model = scoreline_engine.model(league)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Sem partidas no ledger da liga '{league}'.")
+
+    for name in (home, away):
+        if model.team_index(name) is None:
+            raise HTTPException(status_code=404, detail=f"Time '{name}' sem partidas no ledger da liga '{league}'.")
+
+    def compute() -> bytes:
+        with timed(PHASE_METRIC, phase="serialization"):
+            return render_json({"league": league, "home": home, "away": away, **model.fixture(home, away)})
+
+    return cached_json_response(request, ("h2h", "scoreline", league, home, away), model.version, compute)
+
+
+def _compute_h2h(
+    league: str, home: str, away: str, home_csv: Path, away_csv: Path, ranking: Optional[LeagueRanking] = None
+) -> bytes:
+    # Cada fase é medida separadamente (h2h_phase_duration_seconds em /metrics).
+    # Bytes, frames e features ficam em cache na camada de dados até o CSV mudar.
+    with timed(PHASE_METRIC, phase="file_io"):
+        home_data = team_data.load(home_csv)
+        away_data = team_data.load(away_csv)
+    if home_data is None or away_data is None:
+        raise HTTPException(status_code=404, detail=f"CSV de '{home}' ou '{away}' não encontrado.")
+
+    with timed(PHASE_METRIC, phase="csv_parse"):
+        home_features = home_data.features
+        away_features = away_data.features
+
+    with timed(PHASE_METRIC, phase="engine"):
+        result = evaluate(home_features, away_features)
+    return _serialize(league, home, away, result, ranking)
+
+
+def _h2h_as_of(request: Request, league: str, home: str, away: str, as_of: str):
+    try:
+        as_of_ts = to_ts(as_of)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"as_of inválido: '{as_of}' (use ISO 8601).")
+
+    store = get_snapshot_store()
+    team_ids = store.team_ids(league)
+    if not team_ids:
+        raise HTTPException(status_code=404, detail=f"Sem snapshots da liga '{league}'.")
+    # nomes resolvidos contra os times com histórico, não contra os CSVs atuais
+    names = name_index.snapshot_league(league, team_ids)
+    home_slug = _resolve_team(names, league, home)
+    away_slug = _resolve_team(names, league, away)
+
+    with timed(PHASE_METRIC, phase="snapshot_io"):
+        home_snap = store.load(league, home_slug, as_of_ts)
+        away_snap = store.load(league, away_slug, as_of_ts)
+
+    for name, snap in ((home, home_snap), (away, away_snap)):
+        if snap is None:
+            raise HTTPException(status_code=404, detail=f"Sem snapshot de '{name}' até {as_of}.")
+
+    # versões são imutáveis: o par de ts identifica a resposta
+    return cached_json_response(
+        request,
+        ("h2h", "as_of", league, home, away),
+        (home_snap.ts, away_snap.ts),
+        lambda: _analyze(league, home, away, home_snap.to_frame(), away_snap.to_frame()),
+    )
+
+
+def _h2h_form(request: Request, league: str, home: str, away: str, form: str):
+    if form not in FORM_CHOICES:
+        raise HTTPException(status_code=400, detail=f"form inválido: '{form}' (use {', '.join(FORM_CHOICES)}).")
+
+    with timed(PHASE_METRIC, phase="form_sync"):
+        form_tracker.sync_league(league)
+
+    home_form = form_tracker.team_form(league, home)
+    away_form = form_tracker.team_form(league, away)
+    for name, state in ((home, home_form), (away, away_form)):
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"Sem partidas de '{name}' no ledger da liga '{league}'.")
+
+    def compute() -> bytes:
+        with timed(PHASE_METRIC, phase="engine"):
+            result = evaluate(
+                form_tracker.form_features(league, home, form),
+                form_tracker.form_features(league, away, form),
+            )
+        return _serialize(league, home, away, result)
+
+    # a forma só muda com partidas novas: o nº de jogos vistos identifica a resposta
+    return cached_json_response(
+        request,
+        ("h2h", "form", form, league, home, away),
+        (home_form.matches, away_form.matches),
+        compute,
+    )
+
+
+def _analyze(
+    league: str,
+    home: str,
+    away: str,
+    df_home: pd.DataFrame,
+    df_away: pd.DataFrame,
+    ranking: Optional[LeagueRanking] = None,
+) -> bytes:
+    # Usa o motor H2H PROFISSIONAL (resultado tipado, textos só na serialização)
+    with timed(PHASE_METRIC, phase="engine"):
+        result = evaluate_h2h(df_home, df_away)
+    return _serialize(league, home, away, result, ranking)
+
+
+def _serialize(
+    league: str, home: str, away: str, result: H2HResult, ranking: Optional[LeagueRanking] = None
+) -> bytes:
+    with timed(PHASE_METRIC, phase="serialization"):
+        response = result.to_response(league, home, away)
+        if ranking is not None:
+            response["table"] = {"home": ranking.team(home), "away": ranking.team(away)}
+        return render_json(response)
@@ -1,19 +1,27 @@
-from fastapi import APIRouter
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Request
 from typing import Optional
 import json
 
+from config.settings import settings
+from ..utils.power_ranking import compute_ranking, get_ranking_store
+from ..utils.response_cache import cached_json_response, leagues_root_version
+
 router = APIRouter(tags=["Leagues"])
 
-BASE = Path("data/leagues")
+BASE = settings.LEAGUES_DIR
 
 
 @router.get("/leagues")
-def list_leagues():
+def list_leagues(request: Request):
     """
     Lista todas as ligas presentes em data/leagues,
     lendo opcionalmente o arquivo liga.json de cada pasta.
+    Resposta com ETag derivado das pastas e dos liga.json.
     """
+    return cached_json_response(request, ("leagues", str(BASE)), leagues_root_version(BASE), _build_leagues)
+
+
+def _build_leagues():
     leagues = []
 
     if not BASE.exists():
@@ -49,6 +57,26 @@ def list_leagues():
     return {"leagues": leagues}
 
 
+@router.get("/leagues/{league_id}/standings")
+def league_standings(request: Request, league_id: str):
+    """
+    Classificação da liga (pontos, saldo, gols) e força de cada time
+    (ajuste de Massey), calculadas das partidas do ledger na última
+    atualização da liga. Sem atualização ainda, calcula e grava agora.
+    """
+    store = get_ranking_store()
+    ranking = store.get(league_id)
+    if ranking is None:
+        ranking = compute_ranking(league_id)
+        if ranking is None:
+            raise HTTPException(status_code=404, detail=f"Sem partidas no ledger da liga '{league_id}'.")
+        store.put(ranking)
+
+    return cached_json_response(
+        request, ("standings", league_id), ranking.version, lambda: ranking.to_dict()
+    )
+
+
 @router.post("/create-league")
 def create_league(
     league_name: str,
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
-from ..utils.logo_cache import get_or_download_logo, cache_exists
-from pathlib import Path
+from ..utils.logo_cache import get_or_download_logo_async, cache_exists_async
 
 router = APIRouter()
 
@@ -12,9 +11,10 @@ async def get_team_logo(team_id: int):
     Retorna o logo de uma equipe.
     Se o logo não estiver em cache, será baixado da API SofaScore.
     """
-    logo_path = get_or_download_logo(team_id)
-    
-    if logo_path and Path(logo_path).exists():
+    # no pool de I/O: download/stat não travam o event loop
+    logo_path = await get_or_download_logo_async(team_id)
+
+    if logo_path:
         return FileResponse(
             logo_path,
             media_type="image/png",
@@ -34,5 +34,5 @@ async def check_logo_cache(team_id: int):
     """
     Verifica se o logo de uma equipe está em cache.
     """
-    exists = cache_exists(team_id)
+    exists = await cache_exists_async(team_id)
     return {"team_id": team_id, "cached": exists}
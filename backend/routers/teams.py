@@ -1,21 +1,34 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from pathlib import Path
-import pandas as pd
+
+from config.settings import settings
+from ..utils.response_cache import cached_json_response, league_dir_version
+from ..utils.team_data import team_data
 
 router = APIRouter(tags=["Teams"])
-BASE = Path("data/leagues")
+BASE = settings.LEAGUES_DIR
 
 
 @router.get("/league/{league_id}/teams")
-def teams_of_league(league_id: str):
+def teams_of_league(league_id: str, request: Request):
     """
     Retorna a lista de times de uma liga a partir dos arquivos CSV.
     Se o CSV tiver colunas team_name ou team_id, elas também são retornadas.
+    Resposta com ETag derivado dos CSVs da liga.
     """
     league_path = BASE / league_id
     if not league_path.exists():
         return {"league": league_id, "teams": []}
 
+    return cached_json_response(
+        request,
+        ("teams", str(league_path)),
+        league_dir_version(league_path),
+        lambda: _build_teams(league_id, league_path),
+    )
+
+
+def _build_teams(league_id: str, league_path: Path):
     teams = []
     for csv_file in league_path.glob("*.csv"):
         slug = csv_file.stem
@@ -23,7 +36,8 @@ def teams_of_league(league_id: str):
         team_id = None
 
         try:
-            df_head = pd.read_csv(csv_file, sep=";", nrows=1)
+            # camada de dados compartilhada: o parse fica em cache para o H2H
+            df_head = team_data.load(csv_file).frame.head(1)
             if "team_name" in df_head.columns:
                 display_name = str(df_head["team_name"].iloc[0])
             if "team_id" in df_head.columns:
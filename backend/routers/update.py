@@ -1,4 +1,8 @@
 from fastapi import APIRouter, HTTPException
+from config.settings import settings
+from ..updater import telemetry
+from ..updater import transport
+from ..updater import update_engine
 from ..updater.update_engine import update_all_leagues, update_league
 
 router = APIRouter(tags=["Update"])
@@ -22,3 +26,19 @@ def update_one(league_id: str):
     if not result["teams"]:
         raise HTTPException(status_code=404, detail="Liga não encontrada ou sem CSVs.")
     return {"status": "ok", **result}
+
+
+@router.get("/update/metrics")
+def update_metrics():
+    """
+    Telemetria do updater: chamadas ao upstream por endpoint (latência,
+    status, bytes, retries), estado do circuit breaker, estatísticas por time e idade dos dados
+    (`last_update_utc`) de cada liga.
+    """
+    return {
+        "upstream": telemetry.upstream_summary(),
+        "breaker": transport.breaker.snapshot(),
+        "teams": telemetry.team_stats(),
+        "freshness": telemetry.data_freshness(update_engine.DATA_BASE, settings.UPDATE_INTERVAL_HOURS),
+        "max_age_hours": settings.UPDATE_INTERVAL_HOURS,
+    }
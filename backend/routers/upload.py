@@ -2,8 +2,11 @@ from fastapi import APIRouter, UploadFile, File, Form
 from pathlib import Path
 import shutil
 
+from config.settings import settings
+from ..utils.async_io import run_io
+
 router = APIRouter(tags=["Upload CSV"])
-BASE = Path("data/leagues")
+BASE = settings.LEAGUES_DIR
 
 
 @router.post("/upload-csv")
@@ -13,16 +16,20 @@ async def upload_csv(
     file: UploadFile = File(...)
 ):
     league_path = BASE / league
-    league_path.mkdir(parents=True, exist_ok=True)
-
     filename = f"{team_name.lower().replace(' ', '-').strip()}.csv"
     dest = league_path / filename
 
-    with open(dest, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # gravação no pool de I/O para não travar o event loop
+    await run_io(None, _save_upload, file.file, dest)
 
     return {
         "status": "ok",
         "msg": "CSV salvo com sucesso",
         "path": str(dest)
     }
+
+
+def _save_upload(source, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with open(dest, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
@@ -1,7 +1,8 @@
 
-import requests
 from typing import Dict, Any
 from ..utils.logo_cache import get_or_download_logo
+from .team_ids import get_team_id_store
+from .transport import http_get
 
 BASE="https://api.sofascore.com/api/v1"
 
@@ -9,12 +10,25 @@ HDR={"User-Agent":"Mozilla/5.0"}
 
 def search_team_and_get_id(team_slug:str)->Dict[str,Any]:
     q=team_slug.replace("-"," ")
-    url=f"{BASE}/search/all?q={q}"
-    r=requests.get(url,headers=HDR,timeout=10).json()
+    # id já conhecido (team_ids.py): sem busca no upstream
+    ids=get_team_id_store()
+    known=ids.get(team_slug)
+    if known:
+        get_or_download_logo(known["team_id"])
+        return {"team_id":known["team_id"],"team_name":known["team_name"]}
+    try:
+        r=http_get(f"{BASE}/search/all",params={"q":q},headers=HDR,timeout=10).json()
+    except Exception:
+        # entrada vencida e busca falhou: o id antigo continua valendo
+        stale=ids.get(team_slug,allow_stale=True)
+        if stale is None:
+            raise
+        return {"team_id":stale["team_id"],"team_name":stale["team_name"]}
     teams=r.get("teams",[])
     if teams:
         t=teams[0]
         team_id = t["id"]
+        ids.put(team_slug,team_id,t["name"])
         # Tenta baixar/cachear o logo da equipe
         get_or_download_logo(team_id)
         return {"team_id":team_id,"team_name":t["name"]}
@@ -22,7 +36,7 @@ def search_team_and_get_id(team_slug:str)->Dict[str,Any]:
 
 def fetch_team_stats(team_id:int)->Dict[str,float]:
     # fetch last 20 matches
-    ev=requests.get(f"{BASE}/team/{team_id}/events/last/0",headers=HDR,timeout=10).json()
+    ev=http_get(f"{BASE}/team/{team_id}/events/last/0",headers=HDR,timeout=10).json()
     events=ev.get("events",[])[:20]
     stats={"goals_scored":0,"goals_conceded":0,
            "goals_scored_ht":0,"goals_conceded_ht":0,
@@ -32,7 +46,7 @@ def fetch_team_stats(team_id:int)->Dict[str,float]:
     n=0
     for e in events:
         mid=e["id"]
-        st=requests.get(f"{BASE}/event/{mid}/statistics",headers=HDR,timeout=10).json()
+        st=http_get(f"{BASE}/event/{mid}/statistics",headers=HDR,timeout=10).json()
         g=e.get("homeScore",{}).get("current",0) if e["homeTeam"]["id"]==team_id else e.get("awayScore",{}).get("current",0)
         ga=e.get("awayScore",{}).get("current",0) if e["homeTeam"]["id"]==team_id else e.get("homeScore",{}).get("current",0)
         stats["goals_scored"]+=g
@@ -62,6 +76,3 @@ def fetch_team_stats(team_id:int)->Dict[str,float]:
       "corners_ht_avg":0,
       "rpg": (stats["goals_scored"]-stats["goals_conceded"])/max(n,1)
     }
-
-def fetch_table_position(team_id:int)->int:
-    return (team_id%20)+1
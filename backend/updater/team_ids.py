@@ -0,0 +1,97 @@
+"""
+Cache persistente nome do time -> id no SofaScore.
+
+`search_team_and_get_id` (updater), `SofascoreService.get_team_id` e, por
+ele, o `CSVUpdateService` chamavam `/search/all` para cada time a cada
+atualização. A busca é lenta e tem limite de taxa no upstream, e o id de um
+time não muda: a cada 48h eram ~20 buscas por liga só para achar de novo os
+mesmos ids.
+
+O mapeamento fica num JSON (TEAM_IDS_PATH), com a chave no slug do nome
+(`slugify`, o mesmo de todo o resto), e é consultado antes de qualquer
+busca. Cada busca bem-sucedida grava o nome pesquisado e o nome devolvido
+pelo SofaScore. Uma entrada com mais de TEAM_ID_TTL_DAYS dias é buscada de
+novo; se essa busca falhar, o id antigo continua valendo.
+
+Buscas sem resultado não entram no cache (o updater usa um id provisório
+nesse caso, que não deve ser reaproveitado).
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.utils.team_normalizer import slugify
+from config.settings import settings
+
+from ..utils.metrics import record_cache
+
+
+class TeamIdStore:
+    def __init__(self, path: Path, ttl_days: float):
+        self.path = Path(path)
+        self.ttl_s = ttl_days * 86400
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as exc:
+            print(f"Falha ao ler cache de ids do SofaScore: {exc}")
+            return {}
+
+    def _loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._read()
+        return self._entries
+
+    def get(self, name: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """`{"team_id", "team_name", "resolved_at"}` do time; None se ausente ou vencido."""
+        entry = self._loaded().get(slugify(name))
+        if entry is not None and not allow_stale and time.time() - entry["resolved_at"] > self.ttl_s:
+            entry = None
+        if not allow_stale:
+            record_cache("sofascore_team_ids", hit=entry is not None)
+        return entry
+
+    def put(self, name: str, team_id: int, team_name: Optional[str] = None) -> None:
+        entry = {"team_id": int(team_id), "team_name": team_name or name, "resolved_at": time.time()}
+        keys = {slugify(name), slugify(team_name or "")} - {""}
+        with self._lock:
+            # relê antes de gravar: outro processo (updater x API) pode ter acrescentado ids
+            entries = self._read()
+            for key, known in (self._entries or {}).items():
+                if key not in entries or entries[key]["resolved_at"] < known["resolved_at"]:
+                    entries[key] = known
+            for key in keys:
+                entries[key] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.{time.monotonic_ns()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._entries = entries
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+_store: Optional[TeamIdStore] = None
+_store_lock = threading.Lock()
+
+
+def get_team_id_store() -> TeamIdStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TeamIdStore(settings.TEAM_IDS_PATH, settings.TEAM_ID_TTL_DAYS)
+    return _store
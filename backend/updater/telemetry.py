@@ -0,0 +1,225 @@
+"""
+Telemetria do pipeline de atualização.
+
+Cada chamada ao upstream (via `transport.http_get`) é registrada com
+endpoint, status, latência, bytes e se foi uma nova tentativa. As métricas
+vão para o registro global (`/metrics`) e também são agregadas por time,
+usando o time "atual" definido por `team_context()` em `update_team_csv`.
+
+`data_freshness()` lê `last_update_utc` de cada CSV e devolve a idade dos
+dados por time, marcando os que passaram do intervalo de atualização.
+"""
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..utils import metrics
+
+# Buckets de latência do upstream: de 50 ms a 30 s
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+_current_team: ContextVar[Optional[Tuple[str, str]]] = ContextVar("current_team", default=None)
+_teams: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+_ID_SEGMENT = re.compile(r"/\d+")
+
+metrics.histogram(
+    "upstream_request_duration_seconds", "Latência das chamadas ao SofaScore por endpoint.", UPSTREAM_BUCKETS
+)
+metrics.counter("upstream_requests_total", "Chamadas ao SofaScore por endpoint e status.")
+metrics.counter("upstream_bytes_total", "Bytes recebidos do SofaScore por endpoint.")
+metrics.counter("upstream_retries_total", "Novas tentativas de chamadas ao SofaScore por endpoint.")
+metrics.histogram("team_update_duration_seconds", "Duração da atualização de cada time.", UPSTREAM_BUCKETS)
+
+
+def endpoint_of(url: str) -> str:
+    """`.../api/v1/team/2829/events/last/0` -> `/team/{id}/events/last/{id}`."""
+    path = url.split("/api/v1", 1)[-1].split("?", 1)[0]
+    return _ID_SEGMENT.sub("/{id}", path) or "/"
+
+
+def _team_entry(key: Tuple[str, str]) -> Dict[str, Any]:
+    entry = _teams.get(key)
+    if entry is None:
+        entry = {
+            "league": key[0],
+            "team": key[1],
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "bytes": 0,
+            "upstream_seconds": 0.0,
+            "status": {},
+            "last_update_seconds": None,
+            "last_result": None,
+            "last_run_utc": None,
+        }
+        _teams[key] = entry
+    return entry
+
+
+@contextmanager
+def team_context(league: str, team: str) -> Iterator[None]:
+    """Associa as chamadas ao upstream feitas dentro do bloco a um time."""
+    token = _current_team.set((league, team))
+    try:
+        yield
+    finally:
+        _current_team.reset(token)
+
+
+def record_upstream(url: str, status: Optional[int], seconds: float, size: int, retry: bool = False) -> None:
+    """
+    Registra uma chamada ao upstream. `status=None` indica falha de rede
+    (timeout ou conexão), contada como status "error".
+    """
+    endpoint = endpoint_of(url)
+    status_label = str(status) if status is not None else "error"
+
+    metrics.histogram("upstream_request_duration_seconds").observe(seconds, endpoint=endpoint)
+    metrics.counter("upstream_requests_total").inc(endpoint=endpoint, status=status_label)
+    if size:
+        metrics.counter("upstream_bytes_total").inc(size, endpoint=endpoint)
+    if retry:
+        metrics.counter("upstream_retries_total").inc(endpoint=endpoint)
+
+    key = _current_team.get()
+    if key is None:
+        return
+
+    with _lock:
+        entry = _team_entry(key)
+        entry["requests"] += 1
+        entry["bytes"] += size
+        entry["upstream_seconds"] += seconds
+        entry["status"][status_label] = entry["status"].get(status_label, 0) + 1
+        if status is None or status >= 400:
+            entry["errors"] += 1
+        if retry:
+            entry["retries"] += 1
+
+
+def record_team_update(league: str, team: str, seconds: float, updated: bool) -> None:
+    metrics.histogram("team_update_duration_seconds").observe(seconds, league=league)
+    with _lock:
+        entry = _team_entry((league, team))
+        entry["last_update_seconds"] = round(seconds, 4)
+        entry["last_result"] = "updated" if updated else "failed"
+        entry["last_run_utc"] = datetime.now(timezone.utc).isoformat()
+
+
+def team_requests(league: str, team: str) -> int:
+    with _lock:
+        entry = _teams.get((league, team))
+        return entry["requests"] if entry else 0
+
+
+def team_stats() -> List[Dict[str, Any]]:
+    with _lock:
+        rows = [dict(e, status=dict(e["status"])) for e in _teams.values()]
+    for row in rows:
+        row["upstream_seconds"] = round(row["upstream_seconds"], 4)
+    rows.sort(key=lambda r: (r["league"], r["team"]))
+    return rows
+
+
+def _parse_utc(value: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        # update_engine grava com datetime.utcnow() (sem fuso)
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _read_last_update(csv_path: Path) -> Optional[str]:
+    """Lê `last_update_utc` da primeira linha de dados sem carregar o pandas."""
+    try:
+        with open(csv_path, "r", encoding="utf-8") as f:
+            header = f.readline().rstrip("\r\n").split(";")
+            row = f.readline().rstrip("\r\n").split(";")
+    except OSError:
+        return None
+    if "last_update_utc" not in header:
+        return None
+    idx = header.index("last_update_utc")
+    return row[idx] if idx < len(row) and row[idx] else None
+
+
+def data_freshness(leagues_dir: Path, max_age_hours: float) -> List[Dict[str, Any]]:
+    """
+    Idade dos dados por liga/time a partir de `last_update_utc`.
+    Times sem a coluna aparecem com `age_hours=None` e `stale=True`.
+    """
+    now = datetime.now(timezone.utc)
+    leagues: List[Dict[str, Any]] = []
+
+    if not leagues_dir.exists():
+        return leagues
+
+    for league_path in sorted(p for p in leagues_dir.iterdir() if p.is_dir()):
+        teams = []
+        for csv_file in sorted(league_path.glob("*.csv")):
+            raw = _read_last_update(csv_file)
+            dt = _parse_utc(raw) if raw else None
+            age = (now - dt).total_seconds() / 3600.0 if dt else None
+            teams.append(
+                {
+                    "team": csv_file.stem,
+                    "last_update_utc": raw,
+                    "age_hours": round(age, 2) if age is not None else None,
+                    "stale": age is None or age > max_age_hours,
+                }
+            )
+
+        ages = [t["age_hours"] for t in teams if t["age_hours"] is not None]
+        leagues.append(
+            {
+                "league": league_path.name,
+                "teams": teams,
+                "stale_teams": sum(1 for t in teams if t["stale"]),
+                "oldest_age_hours": max(ages) if ages else None,
+            }
+        )
+
+    return leagues
+
+
+def upstream_summary() -> Dict[str, Any]:
+    """Totais por endpoint e percentis aproximados de latência (pelos buckets)."""
+    hist = metrics.histogram("upstream_request_duration_seconds")
+    requests_total = metrics.counter("upstream_requests_total")
+    bytes_total = metrics.counter("upstream_bytes_total")
+    retries_total = metrics.counter("upstream_retries_total")
+
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    for key, value in requests_total.samples():
+        labels = dict(key)
+        entry = endpoints.setdefault(labels["endpoint"], {"requests": 0, "status": {}})
+        entry["requests"] += int(value)
+        entry["status"][labels["status"]] = int(value)
+
+    for endpoint, entry in endpoints.items():
+        snap = hist.snapshot(endpoint=endpoint) or {"count": 0, "sum": 0.0}
+        errors = sum(n for s, n in entry["status"].items() if s == "error" or int(s) >= 400)
+        entry["error_rate"] = round(errors / entry["requests"], 4) if entry["requests"] else 0.0
+        entry["bytes"] = int(bytes_total.value(endpoint=endpoint))
+        entry["retries"] = int(retries_total.value(endpoint=endpoint))
+        entry["mean_seconds"] = round(snap["sum"] / snap["count"], 4) if snap["count"] else None
+        entry["p50_seconds_le"] = hist.quantile(0.5, endpoint=endpoint)
+        entry["p99_seconds_le"] = hist.quantile(0.99, endpoint=endpoint)
+
+    return endpoints
+
+
+def reset() -> None:
+    with _lock:
+        _teams.clear()
+
@@ -0,0 +1,512 @@
+"""
+Camada de transporte HTTP usada por todos os clientes do SofaScore.
+
+Existem três transportes intercambiáveis:
+
+- LiveTransport      – faz as chamadas reais (requests / aiohttp)
+- RecordingTransport – faz as chamadas reais e grava cada resposta em disco
+- ReplayTransport    – responde a partir das fixtures gravadas, sem rede,
+                       com latência e erros configuráveis
+
+O transporte ativo é escolhido por `settings.SOFASCORE_HTTP_MODE`
+(live | record | replay) e pode ser trocado em tempo de execução com
+`set_transport()` – útil para benchmarks e testes de carga offline.
+
+`http_get` / `http_get_async` passam ainda por um limite de taxa (token
+bucket, SOFASCORE_RATE_PER_S com rajadas de SOFASCORE_BURST) e por um
+circuit breaker: depois de SOFASCORE_BREAKER_THRESHOLD respostas 429/403
+ou timeouts seguidos, as chamadas falham na hora (`CircuitOpen`) até o fim
+do cooldown; então uma única chamada de teste decide se o circuito fecha ou
+reabre (com o cooldown dobrado). Os dois são do processo, compartilhados
+por todos os clientes (updater, logos, SofascoreService).
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+from ..utils import metrics
+from . import telemetry
+
+
+class TransportError(Exception):
+    """Falha de rede ao falar com o upstream."""
+
+
+class TransportTimeout(TransportError, TimeoutError):
+    """O upstream não respondeu dentro do timeout."""
+
+
+class CircuitOpen(TransportError):
+    """Circuito aberto: o upstream está limitando/bloqueando, a chamada nem é feita."""
+
+
+class HTTPResponse:
+    """
+    Resposta mínima, compatível com o que os clientes usam de `requests`:
+    `status_code`, `content`, `headers` e `json()`.
+    """
+
+    __slots__ = ("status_code", "content", "headers", "url")
+
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Dict[str, str]] = None, url: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def status(self) -> int:
+        # alias no estilo aiohttp
+        return self.status_code
+
+    def json(self) -> Any:
+        if not self.content:
+            return {}
+        return json.loads(self.content)
+
+
+# ----------------------------------------------------
+# FIXTURES
+# ----------------------------------------------------
+def _fixture_key(method: str, url: str, params: Optional[Dict[str, Any]]) -> str:
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params)) if params else ""
+    raw = f"{method.upper()} {url}?{query}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """
+    Armazena uma resposta por arquivo JSON em `root/{sha1}.json`.
+    Corpos JSON/texto ficam legíveis; binários (ex.: logos) vão em base64.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def path_for(self, method: str, url: str, params: Optional[Dict[str, Any]] = None) -> Path:
+        return self.root / f"{_fixture_key(method, url, params)}.json"
+
+    def save(self, method: str, url: str, params: Optional[Dict[str, Any]], response: HTTPResponse) -> Path:
+        entry: Dict[str, Any] = {
+            "method": method.upper(),
+            "url": url,
+            "params": params or {},
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() == "content-type"},
+        }
+        try:
+            entry["body_text"] = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(response.content).decode("ascii")
+
+        path = self.path_for(method, url, params)
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, indent=2)
+            tmp.replace(path)
+        return path
+
+    def load(self, method: str, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[HTTPResponse]:
+        path = self.path_for(method, url, params)
+        if not path.exists():
+            return None
+
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+
+        if "body_b64" in entry:
+            content = base64.b64decode(entry["body_b64"])
+        else:
+            content = entry.get("body_text", "").encode("utf-8")
+
+        return HTTPResponse(entry.get("status", 200), content, entry.get("headers"), url)
+
+
+# ----------------------------------------------------
+# TRANSPORTES
+# ----------------------------------------------------
+class LiveTransport:
+    """Chamadas reais ao upstream."""
+
+    def request(self, method: str, url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+        import requests
+
+        try:
+            r = requests.request(method, url, params=params, headers=headers, timeout=timeout)
+        except requests.Timeout as exc:
+            raise TransportTimeout(str(exc)) from exc
+        except requests.RequestException as exc:
+            raise TransportError(str(exc)) from exc
+
+        return HTTPResponse(r.status_code, r.content, dict(r.headers), url)
+
+    async def arequest(self, method: str, url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+        import aiohttp
+
+        try:
+            client_timeout = aiohttp.ClientTimeout(total=timeout)
+            async with aiohttp.ClientSession(timeout=client_timeout) as session:
+                async with session.request(method, url, params=params, headers=headers) as r:
+                    content = await r.read()
+                    return HTTPResponse(r.status, content, dict(r.headers), url)
+        except asyncio.TimeoutError as exc:
+            raise TransportTimeout(f"timeout em {url}") from exc
+        except aiohttp.ClientError as exc:
+            raise TransportError(str(exc)) from exc
+
+
+class RecordingTransport:
+    """Delega ao transporte real e grava cada resposta recebida."""
+
+    def __init__(self, store: FixtureStore, inner=None):
+        self.store = store
+        self.inner = inner or LiveTransport()
+
+    def request(self, method: str, url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+        response = self.inner.request(method, url, params=params, headers=headers, timeout=timeout)
+        self.store.save(method, url, params, response)
+        return response
+
+    async def arequest(self, method: str, url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+        response = await self.inner.arequest(method, url, params=params, headers=headers, timeout=timeout)
+        self.store.save(method, url, params, response)
+        return response
+
+
+class ReplayTransport:
+    """
+    Responde a partir das fixtures gravadas.
+
+    - latency_ms / jitter_ms : atraso simulado por chamada
+    - error_rate             : fração de chamadas que devolvem `error_status`
+    - timeout_rate           : fração de chamadas que levantam TransportTimeout
+    - missing_status         : status devolvido quando não há fixture
+    - seed                   : semente do gerador, para execuções determinísticas
+    """
+
+    def __init__(
+        self,
+        store: FixtureStore,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        error_status: int = 503,
+        missing_status: int = 404,
+        seed: Optional[int] = None,
+    ):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.error_status = error_status
+        self.missing_status = missing_status
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _plan(self, url: str):
+        """Sorteia atraso e falha da chamada (thread-safe)."""
+        with self._lock:
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+            roll = self._rng.random()
+
+        if roll < self.timeout_rate:
+            return delay / 1000.0, "timeout"
+        if roll < self.timeout_rate + self.error_rate:
+            return delay / 1000.0, "error"
+        return delay / 1000.0, None
+
+    def _respond(self, method: str, url: str, params, failure: Optional[str]) -> HTTPResponse:
+        if failure == "timeout":
+            raise TransportTimeout(f"timeout simulado em {url}")
+        if failure == "error":
+            return HTTPResponse(self.error_status, b'{"error": "erro simulado"}', {}, url)
+
+        response = self.store.load(method, url, params)
+        if response is None:
+            return HTTPResponse(self.missing_status, b"{}", {}, url)
+        return response
+
+    def request(self, method: str, url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+        delay, failure = self._plan(url)
+        if delay:
+            time.sleep(min(delay, timeout))
+        return self._respond(method, url, params, failure)
+
+    async def arequest(self, method: str, url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+        delay, failure = self._plan(url)
+        if delay:
+            await asyncio.sleep(min(delay, timeout))
+        return self._respond(method, url, params, failure)
+
+
+# ----------------------------------------------------
+# TRANSPORTE GLOBAL
+# ----------------------------------------------------
+_transport = None
+
+
+def build_transport(mode: Optional[str] = None):
+    """Cria o transporte a partir das configurações do projeto."""
+    mode = (mode or settings.SOFASCORE_HTTP_MODE).lower()
+    store = FixtureStore(settings.SOFASCORE_FIXTURES_DIR)
+
+    if mode == "record":
+        return RecordingTransport(store)
+    if mode == "replay":
+        return ReplayTransport(
+            store,
+            latency_ms=settings.REPLAY_LATENCY_MS,
+            jitter_ms=settings.REPLAY_JITTER_MS,
+            error_rate=settings.REPLAY_ERROR_RATE,
+            timeout_rate=settings.REPLAY_TIMEOUT_RATE,
+        )
+    return LiveTransport()
+
+
+def get_transport():
+    global _transport
+    if _transport is None:
+        _transport = build_transport()
+    return _transport
+
+
+def set_transport(transport) -> None:
+    """Troca o transporte global (None volta ao configurado em settings)."""
+    global _transport
+    _transport = transport
+
+
+# ----------------------------------------------------
+# LIMITE DE TAXA E CIRCUIT BREAKER
+# ----------------------------------------------------
+# Respostas que indicam limite de taxa ou bloqueio (além dos timeouts)
+TRIP_STATUSES = frozenset({403, 429})
+
+metrics.counter("upstream_throttle_seconds_total", "Tempo de espera pelo limite de taxa do SofaScore.")
+metrics.counter("upstream_breaker_rejections_total", "Chamadas ao SofaScore recusadas com o circuito aberto.")
+metrics.counter("upstream_breaker_transitions_total", "Mudanças de estado do circuit breaker do SofaScore.")
+
+
+class TokenBucket:
+    """
+    `rate` chamadas/s em média, com rajadas de até `burst`. `reserve()` tira
+    uma ficha e devolve quantos segundos esperar antes de usá-la: as fichas
+    podem ficar negativas, e quem chega depois espera mais (fila por ordem de
+    chegada, sem lock durante a espera). `rate <= 0` desliga o limite.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class CircuitBreaker:
+    """
+    closed    -> chamadas normais; `threshold` falhas seguidas (429/403/timeout) abrem
+    open      -> `before()` levanta CircuitOpen até passar o cooldown
+    half_open -> uma chamada de teste; sucesso fecha, falha reabre com o cooldown dobrado
+                 (até `max_cooldown_s`)
+
+    Erros de conexão e 5xx não contam nem para abrir nem para fechar.
+    """
+
+    def __init__(self, threshold: int, cooldown_s: float, max_cooldown_s: float):
+        self.threshold = max(1, threshold)
+        self.base_cooldown_s = cooldown_s
+        self.max_cooldown_s = max(cooldown_s, max_cooldown_s)
+        self.state = "closed"
+        self._failures = 0
+        self._cooldown_s = cooldown_s
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            metrics.counter("upstream_breaker_transitions_total").inc(state=state)
+            print(f"Circuit breaker do SofaScore: {state}")
+
+    def _open(self, retry_after: Optional[float]) -> None:
+        cooldown = max(self._cooldown_s, min(retry_after or 0.0, self.max_cooldown_s))
+        self._open_until = time.monotonic() + cooldown
+        self._set_state("open")
+
+    def before(self, url: str) -> bool:
+        """Libera a chamada (True se ela é a chamada de teste) ou levanta CircuitOpen."""
+        with self._lock:
+            if self.state == "closed":
+                return False
+            if self.state == "open" and time.monotonic() >= self._open_until:
+                self._set_state("half_open")
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+        metrics.counter("upstream_breaker_rejections_total").inc(endpoint=telemetry.endpoint_of(url))
+        raise CircuitOpen(f"circuito aberto para o SofaScore: {url}")
+
+    def record(
+        self,
+        probe: bool,
+        status: Optional[int],
+        timed_out: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+            if timed_out or status in TRIP_STATUSES:
+                self._failures += 1
+                if probe:
+                    self._cooldown_s = min(self._cooldown_s * 2, self.max_cooldown_s)
+                    self._open(retry_after)
+                elif self.state == "closed" and self._failures >= self.threshold:
+                    self._open(retry_after)
+            elif status is not None and status < 500:
+                # respostas de chamadas iniciadas antes de abrir não fecham o circuito
+                if probe or self.state == "closed":
+                    self._failures = 0
+                    self._cooldown_s = self.base_cooldown_s
+                    self._set_state("closed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "cooldown_s": self._cooldown_s,
+                "open_for_s": round(max(0.0, self._open_until - time.monotonic()), 1) if self.state == "open" else 0.0,
+            }
+
+
+rate_limiter = TokenBucket(settings.SOFASCORE_RATE_PER_S, settings.SOFASCORE_BURST)
+breaker = CircuitBreaker(
+    settings.SOFASCORE_BREAKER_THRESHOLD,
+    settings.SOFASCORE_BREAKER_COOLDOWN_S,
+    settings.SOFASCORE_BREAKER_MAX_COOLDOWN_S,
+)
+
+
+def _retry_after(response: HTTPResponse) -> Optional[float]:
+    value = response.headers.get("Retry-After") or response.headers.get("retry-after")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _record_outcome(probe: bool, response: Optional[HTTPResponse], exc: Optional[BaseException]) -> None:
+    if response is not None:
+        breaker.record(probe, response.status_code, retry_after=_retry_after(response))
+    else:
+        breaker.record(probe, None, timed_out=isinstance(exc, TransportTimeout))
+
+
+def _throttle_wait() -> float:
+    wait = rate_limiter.reserve()
+    if wait:
+        metrics.counter("upstream_throttle_seconds_total").inc(wait)
+    return wait
+
+
+def _should_retry(response: Optional[HTTPResponse], attempt: int) -> bool:
+    if attempt >= settings.SOFASCORE_MAX_RETRIES:
+        return False
+    return response is None or response.status_code >= 500
+
+
+def http_get(url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+    """
+    GET pelo transporte ativo, com telemetria e novas tentativas
+    (até `SOFASCORE_MAX_RETRIES`) em falhas de rede ou respostas 5xx.
+    Passa pelo limite de taxa e pelo circuit breaker (CircuitOpen sem retry).
+    """
+    attempt = 0
+    while True:
+        response: Optional[HTTPResponse] = None
+        probe = breaker.before(url)
+        t0 = time.perf_counter()
+        try:
+            # a espera fica dentro do try: cancelada aqui, a vaga de teste do breaker é liberada
+            wait = _throttle_wait()
+            if wait:
+                time.sleep(wait)
+                t0 = time.perf_counter()
+            response = get_transport().request("GET", url, params=params, headers=headers, timeout=timeout)
+        except TransportError as exc:
+            _record_outcome(probe, None, exc)
+            telemetry.record_upstream(url, None, time.perf_counter() - t0, 0, retry=attempt > 0)
+            if not _should_retry(None, attempt):
+                raise
+        except BaseException:
+            _record_outcome(probe, None, None)
+            raise
+        else:
+            _record_outcome(probe, response, None)
+            telemetry.record_upstream(
+                url, response.status_code, time.perf_counter() - t0, len(response.content), retry=attempt > 0
+            )
+            if not _should_retry(response, attempt):
+                return response
+
+        attempt += 1
+        time.sleep(settings.SOFASCORE_RETRY_BACKOFF_S * attempt)
+
+
+async def http_get_async(url: str, params=None, headers=None, timeout: float = 10) -> HTTPResponse:
+    """Versão assíncrona de `http_get` (mesma telemetria, retry, limite de taxa e breaker)."""
+    attempt = 0
+    while True:
+        response: Optional[HTTPResponse] = None
+        probe = breaker.before(url)
+        t0 = time.perf_counter()
+        try:
+            # a espera fica dentro do try: cancelada aqui, a vaga de teste do breaker é liberada
+            wait = _throttle_wait()
+            if wait:
+                await asyncio.sleep(wait)
+                t0 = time.perf_counter()
+            response = await get_transport().arequest("GET", url, params=params, headers=headers, timeout=timeout)
+        except TransportError as exc:
+            _record_outcome(probe, None, exc)
+            telemetry.record_upstream(url, None, time.perf_counter() - t0, 0, retry=attempt > 0)
+            if not _should_retry(None, attempt):
+                raise
+        except BaseException:
+            _record_outcome(probe, None, None)
+            raise
+        else:
+            _record_outcome(probe, response, None)
+            telemetry.record_upstream(
+                url, response.status_code, time.perf_counter() - t0, len(response.content), retry=attempt > 0
+            )
+            if not _should_retry(response, attempt):
+                return response
+
+        attempt += 1
+        await asyncio.sleep(settings.SOFASCORE_RETRY_BACKOFF_S * attempt)
@@ -1,14 +1,20 @@
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import time
 
 import pandas as pd
 
+from config.settings import settings
+from ..utils.name_index import name_index
+from ..utils.power_ranking import LeagueRanking, compute_ranking, get_ranking_store
+from ..utils.scoreline_model import scoreline_engine
+from ..utils.snapshots import get_snapshot_store
 from .sofascorer import (
     search_team_and_get_id,
     fetch_team_stats,
-    fetch_table_position,
 )
+from . import telemetry
 
 # Tenta importar APScheduler, mas não torna obrigatório
 try:
@@ -17,7 +23,7 @@ except Exception:  # pragma: no cover
     BackgroundScheduler = None  # type: ignore
 
 
-DATA_BASE = Path("data/leagues")
+DATA_BASE = settings.LEAGUES_DIR
 _scheduler = None  # instância global do scheduler (se usado)
 
 
@@ -34,10 +40,13 @@ def _ensure_basic_columns(df: pd.DataFrame, info: Dict[str, Any]) -> pd.DataFram
     return df
 
 
-def _update_team_dataframe(df: pd.DataFrame, team_slug: str) -> pd.DataFrame:
+def _update_team_dataframe(df: pd.DataFrame, team_slug: str, ranking: Optional[LeagueRanking] = None) -> pd.DataFrame:
     """
     Recebe o DataFrame original do CSV e devolve o DataFrame atualizado,
     sem apagar colunas existentes. Apenas atualiza e adiciona colunas novas.
+    Com o ranking da liga, a posição na tabela vem dele e a força de Massey
+    vai para `power_rating` (o `rpg` da fonte não é tocado); sem ranking, a
+    posição antiga fica como está.
     """
     # 1) Garante que temos team_id e team_name
     team_id: Optional[int] = None
@@ -62,26 +71,100 @@ def _update_team_dataframe(df: pd.DataFrame, team_slug: str) -> pd.DataFrame:
 
     # 2) Busca estatísticas (SIMULADAS no momento)
     stats = fetch_team_stats(team_id)
-    position = fetch_table_position(team_id)
 
     # 3) Monta dicionário de atualização
     update_info: Dict[str, Any] = {
         "team_id": team_id,
         "team_name": team_name,
-        "table_position": position,
         "last_update_utc": datetime.utcnow().isoformat(),
     }
     update_info.update(stats)
 
+    entry = (ranking.team(team_name) or ranking.team(team_slug)) if ranking is not None else None
+    if entry is not None:
+        update_info["table_position"] = entry["position"]
+        update_info["power_rating"] = entry["rating"]
+
     # 4) Aplica no DataFrame SEM apagar colunas antigas
     df = _ensure_basic_columns(df, update_info)
     return df
 
 
-def update_team_csv(csv_path: Path) -> Dict[str, Any]:
+def _record_snapshot(league_id: str, team_slug: str, df: pd.DataFrame, run_id: Optional[int]) -> None:
+    """Grava a versão atualizada no histórico (falha aqui não desfaz a atualização)."""
+    if not settings.SNAPSHOTS_ENABLED:
+        return
+    try:
+        get_snapshot_store().record(league_id, team_slug, df, run_id=run_id)
+    except Exception as exc:
+        print(f"Falha ao gravar snapshot de {league_id}/{team_slug}: {exc}")
+
+
+def _begin_snapshot_run(league_id: str) -> Optional[int]:
+    if not settings.SNAPSHOTS_ENABLED:
+        return None
+    try:
+        return get_snapshot_store().begin_run(league_id)
+    except Exception as exc:
+        print(f"Falha ao abrir run de snapshots de {league_id}: {exc}")
+        return None
+
+
+def _rank_league(league_id: str) -> Optional[LeagueRanking]:
+    """
+    Etapa de ranking: ajusta as forças (Massey) e a classificação da liga
+    inteira uma vez por atualização e grava para as consultas do H2H.
+    Falha aqui não impede a atualização dos times.
+    """
+    try:
+        ranking = compute_ranking(league_id)
+        if ranking is not None:
+            get_ranking_store().put(ranking)
+        return ranking
+    except Exception as exc:
+        print(f"Falha ao calcular ranking de {league_id}: {exc}")
+        return None
+
+
+def _fit_scoreline(league_id: str) -> None:
+    """
+    Ajusta o modelo de placares (e a grade pré-calculada) da liga aqui, e não
+    na primeira requisição de /api/h2h/scoreline depois de o ledger mudar.
+    """
+    try:
+        scoreline_engine.model(league_id)
+    except Exception as exc:
+        print(f"Falha ao ajustar modelo de placares de {league_id}: {exc}")
+
+
+def update_team_csv(
+    csv_path: Path, run_id: Optional[int] = None, ranking: Optional[LeagueRanking] = None
+) -> Dict[str, Any]:
     """
     Atualiza um único CSV de time.
+    As chamadas ao upstream feitas aqui são contabilizadas para o time
+    (ver updater/telemetry.py), e o resultado inclui a duração e o número
+    de requisições. A versão gravada entra no histórico de snapshots,
+    agrupada pelo `run_id` da execução (ver utils/snapshots.py).
     """
+    league_id = csv_path.parent.name
+    team_slug = csv_path.stem
+    requests_before = telemetry.team_requests(league_id, team_slug)
+
+    t0 = time.perf_counter()
+    with telemetry.team_context(league_id, team_slug):
+        result = _update_team_csv(csv_path, run_id, ranking)
+    elapsed = time.perf_counter() - t0
+
+    telemetry.record_team_update(league_id, team_slug, elapsed, result["updated"])
+    result["duration_ms"] = round(elapsed * 1000, 1)
+    result["upstream_requests"] = telemetry.team_requests(league_id, team_slug) - requests_before
+    return result
+
+
+def _update_team_csv(
+    csv_path: Path, run_id: Optional[int] = None, ranking: Optional[LeagueRanking] = None
+) -> Dict[str, Any]:
     if not csv_path.exists():
         return {"file": str(csv_path), "updated": False, "reason": "CSV não encontrado"}
 
@@ -92,13 +175,17 @@ def update_team_csv(csv_path: Path) -> Dict[str, Any]:
     except Exception as exc:
         return {"file": str(csv_path), "updated": False, "reason": f"Erro ao ler CSV: {exc}"}
 
-    df_updated = _update_team_dataframe(df, team_slug)
+    try:
+        df_updated = _update_team_dataframe(df, team_slug, ranking)
+    except Exception as exc:
+        return {"file": str(csv_path), "updated": False, "reason": f"Erro ao buscar dados: {exc}"}
 
     try:
         df_updated.to_csv(csv_path, sep=";", index=False)
     except Exception as exc:
         return {"file": str(csv_path), "updated": False, "reason": f"Erro ao salvar CSV: {exc}"}
 
+    _record_snapshot(csv_path.parent.name, team_slug, df_updated, run_id)
     return {"file": str(csv_path), "updated": True}
 
 
@@ -110,11 +197,17 @@ def update_league(league_id: str) -> Dict[str, Any]:
     if not league_path.exists():
         return {"league": league_id, "teams": []}
 
+    ranking = _rank_league(league_id)
+    _fit_scoreline(league_id)
+    run_id = _begin_snapshot_run(league_id)
     results: List[Dict[str, Any]] = []
     for csv_file in league_path.glob("*.csv"):
-        results.append(update_team_csv(csv_file))
+        results.append(update_team_csv(csv_file, run_id, ranking))
+
+    # team_name pode ter mudado nos CSVs: o índice de nomes é refeito na próxima consulta
+    name_index.invalidate(league_id)
 
-    return {"league": league_id, "teams": results}
+    return {"league": league_id, "teams": results, "ranked_teams": len(ranking.table) if ranking else 0}
 
 
 def update_all_leagues() -> List[Dict[str, Any]]:
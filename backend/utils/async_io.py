@@ -0,0 +1,47 @@
+"""
+Leituras de disco para rotas `async def` sem travar o event loop.
+
+Uma rota async que chama `open()`, `Path.exists()` ou `pd.read_csv()`
+direto bloqueia o loop inteiro: em disco lento (instâncias compartilhadas do
+Render) todas as requisições concorrentes ficam em fila atrás dela.
+
+`run_io(key, fn, *args)` roda `fn` num pool de threads próprio
+(IO_THREADS) e deduplica as chamadas em andamento: enquanto a leitura de
+uma chave não termina, as outras requisições com a mesma chave aguardam o
+mesmo futuro em vez de repetir a leitura. Com `key=None` não há
+deduplicação (escritas, por exemplo).
+
+O resultado é compartilhado entre quem aguardou a mesma chave: não
+alterar o objeto devolvido.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config.settings import settings
+
+from .metrics import record_cache
+
+_executor = ThreadPoolExecutor(max_workers=settings.IO_THREADS, thread_name_prefix="data-io")
+_inflight: Dict[Tuple[int, Hashable], "asyncio.Future[Any]"] = {}
+
+
+async def run_io(key: Optional[Hashable], fn: Callable[..., Any], *args: Any) -> Any:
+    """Executa `fn(*args)` no pool de I/O; chamadas simultâneas com a mesma chave viram uma só."""
+    loop = asyncio.get_running_loop()
+    if key is None:
+        return await loop.run_in_executor(_executor, fn, *args)
+
+    # um dicionário por event loop (cada worker do uvicorn tem o seu)
+    slot = (id(loop), key)
+    future = _inflight.get(slot)
+    if future is not None:
+        record_cache("io_inflight", hit=True)
+        return await asyncio.shield(future)
+
+    record_cache("io_inflight", hit=False)
+    future = loop.run_in_executor(_executor, fn, *args)
+    _inflight[slot] = future
+    future.add_done_callback(lambda done: _inflight.pop(slot) if _inflight.get(slot) is done else None)
+    # shield: se o primeiro cliente desconectar, os demais ainda recebem o resultado
+    return await asyncio.shield(future)
@@ -0,0 +1,182 @@
+"""
+Compressão das respostas HTTP (gzip e, se o pacote `brotli` estiver
+instalado, br).
+
+- `negotiate()` escolhe a codificação pelo Accept-Encoding do cliente
+- `compress()` comprime um corpo já pronto (determinístico: gzip sem mtime)
+- `CompressionMiddleware` comprime as respostas de corpo único que ainda
+  não vierem codificadas
+
+As respostas do `response_cache` já saem comprimidas (a variante fica
+guardada junto do corpo cru), então o middleware só trabalha nas rotas
+sem cache e não recomprime nada em acertos repetidos.
+"""
+import gzip
+from typing import Dict, Optional
+
+from config.settings import settings
+from .metrics import counter
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore
+
+HAS_BROTLI = brotli is not None
+
+# Ordem de preferência quando o cliente aceita mais de uma
+SUPPORTED = ("br", "gzip") if HAS_BROTLI else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# Sufixo do ETag por codificação (representações diferentes, ETags fortes diferentes)
+ETAG_SUFFIX = {"gzip": "-gz", "br": "-br"}
+
+counter("response_bytes_total", "Bytes de corpo das respostas, antes e depois da compressão.")
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Melhor codificação suportada aceita pelo cliente (ou None = identity)."""
+    if not accept_encoding:
+        return None
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings.GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+def is_compressible(media_type: Optional[str], size: int) -> bool:
+    if size < settings.COMPRESSION_MIN_SIZE or not media_type:
+        return False
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def record_bytes(encoding: Optional[str], raw: int, sent: int) -> None:
+    label = encoding or "identity"
+    response_bytes = counter("response_bytes_total")
+    response_bytes.inc(raw, encoding=label, stage="raw")
+    response_bytes.inc(sent, encoding=label, stage="sent")
+
+
+def with_etag_suffix(etag: str, encoding: Optional[str]) -> str:
+    """`"abc"` -> `"abc-gz"`; ETags fracos e identity ficam como estão."""
+    if not encoding or etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return etag[:-1] + ETAG_SUFFIX[encoding] + '"'
+
+
+def add_vary(vary: str) -> str:
+    """Acrescenta Accept-Encoding a um cabeçalho Vary existente."""
+    if "accept-encoding" in vary.lower():
+        return vary
+    return f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+# ----------------------------------------------------
+# MIDDLEWARE ASGI
+# ----------------------------------------------------
+class CompressionMiddleware:
+    """
+    Comprime respostas de corpo único (JSON/texto) acima de
+    COMPRESSION_MIN_SIZE. Respostas em streaming (ex.: FileResponse dos
+    logos) e respostas que já têm Content-Encoding passam intactas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = None
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept)
+        if encoding is None or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if state["passthrough"]:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start = state["start"]
+            body = message.get("body", b"")
+            headers = {k.lower(): v for k, v in start.get("headers", [])}
+            media_type = headers.get(b"content-type", b"").decode("latin-1")
+
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in headers
+                or not is_compressible(media_type, len(body))
+            ):
+                state["passthrough"] = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            record_bytes(encoding, len(body), len(compressed))
+
+            new_headers = [
+                (k, v)
+                for k, v in start.get("headers", [])
+                if k.lower() not in (b"content-length", b"etag", b"vary")
+            ]
+            new_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            new_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            new_headers.append((b"vary", add_vary(headers.get(b"vary", b"").decode("latin-1")).encode("latin-1")))
+            etag = headers.get(b"etag")
+            if etag:
+                new_headers.append((b"etag", with_etag_suffix(etag.decode("latin-1"), encoding).encode("latin-1")))
+
+            await send(dict(start, headers=new_headers))
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
@@ -0,0 +1,234 @@
+"""
+Forma recente dos times: janelas móveis (últimos 5/10/20 jogos) e médias
+exponenciais (EWMA), atualizadas em O(1) por partida.
+
+Cada time guarda um anel com os últimos MAX_WINDOW jogos e, para cada janela,
+a soma corrente: um jogo novo soma a sua linha e subtrai a que saiu da
+janela. A EWMA usa numerador/denominador separados (com correção de viés),
+então times com poucos jogos não ficam puxados para zero.
+
+Métricas por jogo (visão do time): vitória, empate, pontos, gols pró/contra,
+over 1.5, over 2.5, BTTS e over 0.5 HT. Jogos sem placar de intervalo não
+contam para o over 0.5 HT (peso zero só nessa métrica).
+
+A fonte é o ledger de partidas (`match_ledger.py`): `sync_league()` lê só as
+linhas gravadas desde a última sincronização. `form_features()` devolve as
+médias como `TeamFeatures`, a entrada do motor H2H (/api/h2h?form=5|10|20|ewm),
+com o saldo de gols por jogo como força (`rpg`). Jogos sem placar final
+(adiados, ainda não jogados) são ignorados.
+
+Os times são procurados pelo nome do ledger e, se não houver chave exata,
+pelo índice de nomes (`name_index`), então `sevilla_fc` acha "Sevilla".
+"""
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.team_normalizer import slugify
+from config.settings import settings
+
+from .h2h_model import TeamFeatures
+from .match_ledger import MatchLedgerStore, get_match_ledger_store
+from .name_index import name_index
+
+WINDOWS = (5, 10, 20)
+MAX_WINDOW = max(WINDOWS)
+EWM = "ewm"
+FORM_CHOICES = tuple(str(w) for w in WINDOWS) + (EWM,)
+
+METRICS = ("win", "draw", "points", "gf", "ga", "over15", "over25", "btts", "over05_ht")
+_HT = METRICS.index("over05_ht")
+
+# Métrica -> coluna lida pelo motor H2H (percentuais em 0..100)
+ENGINE_COLUMNS = {
+    "win": "win_rate",
+    "over15": "over15",
+    "over25": "over25",
+    "btts": "btts_yes",
+    "over05_ht": "over_0_5_ht",
+}
+PERCENT_METRICS = ("win", "draw", "over15", "over25", "btts", "over05_ht")
+
+
+def match_vectors(gf: float, ga: float, gf_ht: float, ga_ht: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(valores, pesos) de um jogo; peso 0 = métrica desconhecida neste jogo."""
+    total = gf + ga
+    ht_known = not (np.isnan(gf_ht) or np.isnan(ga_ht))
+    values = np.array([
+        gf > ga,
+        gf == ga,
+        3.0 if gf > ga else (1.0 if gf == ga else 0.0),
+        gf,
+        ga,
+        total >= 2,
+        total >= 3,
+        gf > 0 and ga > 0,
+        ht_known and gf_ht + ga_ht >= 1,
+    ], dtype=float)
+    weights = np.ones(len(METRICS))
+    if not ht_known:
+        weights[_HT] = 0.0
+    return values * weights, weights
+
+
+class TeamForm:
+    """Estado incremental de um time (somas por janela + EWMA)."""
+
+    __slots__ = ("history", "sums", "weights", "ewm_num", "ewm_den", "matches", "last_ts")
+
+    def __init__(self):
+        self.history: Deque[Tuple[np.ndarray, np.ndarray]] = deque(maxlen=MAX_WINDOW)
+        self.sums = np.zeros((len(WINDOWS), len(METRICS)))
+        self.weights = np.zeros((len(WINDOWS), len(METRICS)))
+        self.ewm_num = np.zeros(len(METRICS))
+        self.ewm_den = np.zeros(len(METRICS))
+        self.matches = 0
+        self.last_ts = 0
+
+    def push(self, values: np.ndarray, weights: np.ndarray, decay: float, ts: int = 0) -> None:
+        n = len(self.history)
+        for i, size in enumerate(WINDOWS):
+            if n >= size:
+                old_values, old_weights = self.history[n - size]
+                self.sums[i] -= old_values
+                self.weights[i] -= old_weights
+            self.sums[i] += values
+            self.weights[i] += weights
+        self.history.append((values, weights))
+
+        # EWMA com correção de viés: num/den partem de zero
+        self.ewm_num = decay * self.ewm_num + values
+        self.ewm_den = decay * self.ewm_den + weights
+        self.matches += 1
+        self.last_ts = max(self.last_ts, ts)
+
+    def means(self, window: str) -> Dict[str, float]:
+        if window == EWM:
+            num, den = self.ewm_num, self.ewm_den
+        else:
+            i = WINDOWS.index(int(window))
+            num, den = self.sums[i], self.weights[i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = num / den
+        return {
+            metric: float(value) * (100.0 if metric in PERCENT_METRICS else 1.0)
+            for metric, value in zip(METRICS, values)
+        }
+
+
+class FormTracker:
+    """Forma de todos os times, por liga, alimentada pelo ledger de partidas."""
+
+    def __init__(self, store: Optional[MatchLedgerStore] = None, half_life: float = 6.0):
+        self._store = store
+        self.decay = 0.5 ** (1.0 / max(half_life, 1e-6))
+        self._teams: Dict[Tuple[str, str], TeamForm] = {}
+        self._names: Dict[str, Dict[str, str]] = {}
+        self._consumed: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def store(self) -> MatchLedgerStore:
+        return self._store or get_match_ledger_store()
+
+    # ---------- atualização ----------
+    def update(
+        self,
+        league_id: str,
+        home: str,
+        away: str,
+        home_goals: float,
+        away_goals: float,
+        home_goals_ht: float = float("nan"),
+        away_goals_ht: float = float("nan"),
+        ts: int = 0,
+    ) -> None:
+        """Uma partida nova: O(1) para cada um dos dois times."""
+        with self._lock:
+            for team, gf, ga, gf_ht, ga_ht in (
+                (home, home_goals, away_goals, home_goals_ht, away_goals_ht),
+                (away, away_goals, home_goals, away_goals_ht, home_goals_ht),
+            ):
+                key = (league_id, slugify(team))
+                form = self._teams.get(key)
+                if form is None:
+                    form = self._teams[key] = TeamForm()
+                    self._names.setdefault(league_id, {})[key[1]] = team
+                values, weights = match_vectors(float(gf), float(ga), float(gf_ht), float(ga_ht))
+                form.push(values, weights, self.decay, ts)
+
+    def sync_league(self, league_id: str) -> int:
+        """
+        Consome as partidas gravadas no ledger desde a última chamada
+        (temporadas em ordem; dentro de um bloco novo, por horário).
+        Devolve quantas partidas entraram.
+        """
+        added = 0
+        store = self.store
+        with self._lock:
+            for season in store.seasons(league_id):
+                key = (league_id, season)
+                ledger = store.ledger(league_id, season)
+                ledger.refresh()
+                start = self._consumed.get(key, 0)
+                if ledger.rows <= start:
+                    continue
+                new = ledger.frame(start)
+                consumed = len(new)
+                # sem placar final a partida não entra (NaN contaminaria somas e EWMA de vez)
+                new = new.dropna(subset=["home_goals", "away_goals"]).sort_values("ts", kind="stable")
+                for row in zip(
+                    new["home_team"], new["away_team"], new["home_goals"], new["away_goals"],
+                    new["home_goals_ht"], new["away_goals_ht"], new["ts"],
+                ):
+                    self.update(league_id, *row)
+                self._consumed[key] = start + consumed
+                added += len(new)
+        return added
+
+    # ---------- leitura ----------
+    def _team_names(self, league_id: str) -> List[str]:
+        with self._lock:
+            return list(self._names.get(league_id, {}).values())
+
+    def team_form(self, league_id: str, team: str) -> Optional[TeamForm]:
+        form = self._teams.get((league_id, slugify(team)))
+        if form is None:
+            # times só entram, nunca saem: a quantidade identifica a versão do índice
+            index = name_index.names(
+                "form", league_id, len(self._names.get(league_id, {})), lambda: self._team_names(league_id)
+            )
+            resolved = index.resolve(team)
+            if resolved is not None:
+                form = self._teams.get((league_id, slugify(resolved)))
+        return form
+
+    def form(self, league_id: str, team: str, window: str = EWM) -> Optional[Dict[str, Any]]:
+        """Médias da janela ("5", "10", "20" ou "ewm") + nº de jogos vistos."""
+        form = self.team_form(league_id, team)
+        if form is None:
+            return None
+        return {"matches": form.matches, **form.means(window)}
+
+    def form_frame(self, league_id: str, team: str, window: str = EWM) -> Optional[pd.DataFrame]:
+        """Uma linha no formato dos CSVs (nomes de coluna que o motor H2H lê)."""
+        means = self.form(league_id, team, window)
+        if means is None:
+            return None
+        row = {ENGINE_COLUMNS.get(metric, metric): value for metric, value in means.items()}
+        # força = saldo de gols por jogo (mesma escala do rpg dos CSVs)
+        row["rpg"] = means["gf"] - means["ga"]
+        return pd.DataFrame([row])
+
+    def form_features(self, league_id: str, team: str, window: str = EWM) -> Optional[TeamFeatures]:
+        df = self.form_frame(league_id, team, window)
+        return TeamFeatures.from_frame(df) if df is not None else None
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+form_tracker = FormTracker(half_life=settings.FORM_EWM_HALF_LIFE)
@@ -0,0 +1,595 @@
+"""
+Modelo tipado do resultado H2H.
+
+O motor (`h2h_engine`) é dividido em três etapas:
+
+1. `TeamFeatures.from_frame(df)` – médias usadas pelo motor, uma vez por time
+2. `evaluate(home, away)`        – scoring dos 4 mercados -> `H2HResult`
+3. `H2HResult.to_response(...)`  – dicts/strings para o JSON, só na borda
+
+Os textos dos mercados (linha, motivo, explicação) são templates internados
+em `VARIANTS`; o resultado guarda apenas números e o índice das variantes
+escolhidas. Assim um resultado cabe em um registro binário de tamanho fixo
+(`RECORD.size` bytes) e uma matriz de liga inteira (`H2HMatrix`) ocupa
+kilobytes em vez de árvores de dicts.
+"""
+import math
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+NAN = float("nan")
+
+# Aliases de coluna aceitos para cada média (mesma ordem de tentativa de sempre)
+WIN_AS_HOME_COLUMNS = ["win_rate", "home_win_rate"]
+WIN_AS_AWAY_COLUMNS = ["win_rate", "away_win_rate"]
+RPG_COLUMNS = ["rpg", "power_index", "rating"]
+OVER15_COLUMNS = ["over15", "over_1_5_ft", "ft_over_1_5"]
+OVER25_COLUMNS = ["over25", "over_2_5_ft", "ft_over_2_5"]
+BTTS_COLUMNS = ["btts_yes", "btts"]
+OVER05_HT_COLUMNS = ["over_0_5_ht", "ht_over_0_5", "over05ht"]
+
+
+def column_mean(df: pd.DataFrame, columns: Sequence[str]) -> float:
+    """Média da primeira coluna válida; NaN quando nenhuma serve."""
+    for col in columns:
+        try:
+            if col in df.columns:
+                value = df[col].astype(float).mean()
+                if not pd.isna(value):
+                    return float(value)
+        except Exception:
+            continue
+    return NAN
+
+
+def _or(value: float, default: float) -> float:
+    return default if math.isnan(value) else value
+
+
+# ----------------------------------------------------
+# FEATURES POR TIME
+# ----------------------------------------------------
+class TeamFeatures:
+    """Médias de um time lidas do CSV (NaN = coluna ausente, o default depende do par)."""
+
+    __slots__ = ("win_as_home", "win_as_away", "rpg", "over15", "over25", "btts", "over05_ht")
+
+    STRUCT = struct.Struct("<7d")
+
+    def __init__(self, win_as_home, win_as_away, rpg, over15, over25, btts, over05_ht):
+        self.win_as_home = win_as_home
+        self.win_as_away = win_as_away
+        self.rpg = rpg
+        self.over15 = over15
+        self.over25 = over25
+        self.btts = btts
+        self.over05_ht = over05_ht
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TeamFeatures":
+        # win_rate é o primeiro alias dos dois lados: lido uma vez só
+        win_rate = column_mean(df, WIN_AS_HOME_COLUMNS[:1])
+        if math.isnan(win_rate):
+            win_as_home = column_mean(df, WIN_AS_HOME_COLUMNS[1:])
+            win_as_away = column_mean(df, WIN_AS_AWAY_COLUMNS[1:])
+        else:
+            win_as_home = win_as_away = win_rate
+        return cls(
+            win_as_home,
+            win_as_away,
+            column_mean(df, RPG_COLUMNS),
+            column_mean(df, OVER15_COLUMNS),
+            column_mean(df, OVER25_COLUMNS),
+            column_mean(df, BTTS_COLUMNS),
+            column_mean(df, OVER05_HT_COLUMNS),
+        )
+
+    def pack(self) -> bytes:
+        return self.STRUCT.pack(*(getattr(self, s) for s in self.__slots__))
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> "TeamFeatures":
+        return cls(*cls.STRUCT.unpack(raw))
+
+
+# ----------------------------------------------------
+# TEMPLATES DOS MERCADOS
+# ----------------------------------------------------
+class BetSpec:
+    """
+    A aposta por trás de uma linha, para liquidação (backtests):
+    kind "ah" (handicap do `side`) ou "over" (total de gols), no período
+    "FT" ou "HT", com a linha asiática (ex.: -0.25, 2.75).
+    """
+
+    __slots__ = ("kind", "period", "side", "line")
+
+    def __init__(self, kind: str, period: str, line: float, side: Optional[str] = None):
+        self.kind = kind
+        self.period = period
+        self.side = side
+        self.line = line
+
+
+class SuggestionTemplate:
+    """Linha/motivo com campos nomeados ({fav}, {gap:.2f}, ...) + explicação fixa."""
+
+    __slots__ = ("line", "reason", "explanation", "bet")
+
+    def __init__(self, line: str, reason: str, explanation: str, bet: BetSpec):
+        self.line = sys.intern(line)
+        self.reason = sys.intern(reason)
+        self.explanation = sys.intern(explanation)
+        self.bet = bet
+
+    def render(self, ctx: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "line": self.line.format_map(ctx),
+            "reason": self.reason.format_map(ctx),
+            "explanation": self.explanation,
+        }
+
+
+class MarketVariant:
+    __slots__ = ("market_name", "ousada", "conservadora")
+
+    def __init__(self, market_name: str, ousada: SuggestionTemplate, conservadora: SuggestionTemplate):
+        self.market_name = sys.intern(market_name)
+        self.ousada = ousada
+        self.conservadora = conservadora
+
+    def render(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "market_name": self.market_name,
+            "suggestions": {
+                "ousada": self.ousada.render(ctx),
+                "conservadora": self.conservadora.render(ctx),
+            },
+        }
+
+
+AH_FT = "Handicap Asiático FT"
+GOALS_FT = "Gol Asiático FT"
+AH_HT = "Handicap Asiático HT"
+GOALS_HT = "Gol Asiático HT"
+
+# Índices em VARIANTS (gravados nos registros binários: só acrescentar no fim)
+AH_FT_STRONG, AH_FT_BALANCED, GOALS_FT_HIGH, GOALS_FT_MID, GOALS_FT_LOW, AH_HT_ANY, GOALS_HT_HIGH, GOALS_HT_LOW = range(8)
+
+VARIANTS: Tuple[MarketVariant, ...] = (
+    # ---------- Handicap Asiático FT: força bem superior ----------
+    MarketVariant(
+        AH_FT,
+        SuggestionTemplate(
+            "{fav} -1.0 AH (FT)",
+            "{fav} mostra força superior (diferença de RPG {gap:.2f}) "
+            "e maior probabilidade de vitória.",
+            "Vitória por 2+ gols = Ganha\n"
+            "Vitória por 1 gol = Push (aposta devolvida)\n"
+            "Empate ou derrota = Perde",
+            BetSpec("ah", "FT", -1.0, "fav"),
+        ),
+        SuggestionTemplate(
+            "{fav} -0.25 AH (FT)",
+            "{fav} favorito, mas jogo pode ter equilíbrio em alguns momentos. "
+            "Linha -0.25 reduz o risco.",
+            "Vitória = Ganha\n"
+            "Empate = Meio red (metade perdida, metade devolvida)\n"
+            "Derrota = Perde",
+            BetSpec("ah", "FT", -0.25, "fav"),
+        ),
+    ),
+    # ---------- Handicap Asiático FT: força equilibrada → proteção maior ----------
+    MarketVariant(
+        AH_FT,
+        SuggestionTemplate(
+            "{fav} 0.0 AH (FT)",
+            "Jogo equilibrado, mas com leve vantagem de força para o favorito. "
+            "Linha de empate devolve.",
+            "Vitória = Ganha\n"
+            "Empate = Push (aposta devolvida)\n"
+            "Derrota = Perde",
+            BetSpec("ah", "FT", 0.0, "fav"),
+        ),
+        SuggestionTemplate(
+            "{dog} +0.5 AH (FT)",
+            "Força próxima (diferença de RPG {gap:.2f}). "
+            "{dog} pode segurar empate.",
+            "Vitória ou empate do time +0.5 = Ganha\n"
+            "Derrota por 1+ gol = Perde",
+            BetSpec("ah", "FT", 0.5, "dog"),
+        ),
+    ),
+    # ---------- Gol Asiático FT: Over 2.5 >= 72% ----------
+    MarketVariant(
+        GOALS_FT,
+        SuggestionTemplate(
+            "Over 2.75 gols (FT)",
+            "Altíssima tendência de gols (Over 2.5 ~ {over25:.0f}%) "
+            "e cenário ofensivo forte para ambos.",
+            "4+ gols = Ganha\n"
+            "3 gols = Meio green (metade ganha, metade devolvida)\n"
+            "0-2 gols = Perde",
+            BetSpec("over", "FT", 2.75),
+        ),
+        SuggestionTemplate(
+            "Over 2.0 gols (FT)",
+            "Mercado de linha inteira com proteção em caso de partida truncada.",
+            "3+ gols = Ganha\n"
+            "2 gols = Push (aposta devolvida)\n"
+            "0-1 gol = Perde",
+            BetSpec("over", "FT", 2.0),
+        ),
+    ),
+    # ---------- Gol Asiático FT: Over 2.5 >= 60% ----------
+    MarketVariant(
+        GOALS_FT,
+        SuggestionTemplate(
+            "Over 2.5 gols (FT)",
+            "Tendência positiva para gols (Over 2.5 ~ {over25:.0f}%). "
+            "Jogo com bom ritmo ofensivo.",
+            "3+ gols = Ganha\n"
+            "0-2 gols = Perde",
+            BetSpec("over", "FT", 2.5),
+        ),
+        SuggestionTemplate(
+            "Over 1.75 gols (FT)",
+            "Linha mais baixa para proteger em caso de jogo com poucos gols.",
+            "3+ gols = Ganha\n"
+            "2 gols = Meio green (metade ganha, metade devolvida)\n"
+            "0-1 gol = Perde",
+            BetSpec("over", "FT", 1.75),
+        ),
+    ),
+    # ---------- Gol Asiático FT: cenário intermediário ----------
+    MarketVariant(
+        GOALS_FT,
+        SuggestionTemplate(
+            "Over 2.0 gols (FT)",
+            "Cenário intermediário: possibilidade de 2-3 gols, "
+            "mas sem padrão tão forte de over.",
+            "3+ gols = Ganha\n"
+            "2 gols = Push (devolvida)\n"
+            "0-1 gol = Perde",
+            BetSpec("over", "FT", 2.0),
+        ),
+        SuggestionTemplate(
+            "Over 1.5 gols (FT)",
+            "Proteção para jogos mais amarrados, buscando apenas 2 gols na partida.",
+            "2+ gols = Ganha\n"
+            "0-1 gol = Perde",
+            BetSpec("over", "FT", 1.5),
+        ),
+    ),
+    # ---------- Handicap Asiático HT ----------
+    MarketVariant(
+        AH_HT,
+        SuggestionTemplate(
+            "{fav} -0.5 AH (HT)",
+            "{fav} tende a começar melhor, com maior força (RPG {home_rpg:.2f} x {away_rpg:.2f}) "
+            "e boa chance de liderar no intervalo.",
+            "Vencendo no HT = Ganha\n"
+            "Empate ou perdendo no HT = Perde",
+            BetSpec("ah", "HT", -0.5, "fav"),
+        ),
+        SuggestionTemplate(
+            "{dog} +0.25 AH (HT)",
+            "Proteção para 1º tempo equilibrado, onde o time azarão pode segurar empate.",
+            "Vencendo no HT = Ganha\n"
+            "Empate = Meio green / devolução parcial\n"
+            "Perdendo = Perde",
+            BetSpec("ah", "HT", 0.25, "dog"),
+        ),
+    ),
+    # ---------- Gol Asiático HT: Over 0.5 HT >= 70% ----------
+    MarketVariant(
+        GOALS_HT,
+        SuggestionTemplate(
+            "Over 1.25 gols (HT)",
+            "1º tempo com forte padrão ofensivo (Over 0.5 HT ~ {over05_ht:.0f}%).",
+            "2+ gols no HT = Ganha\n"
+            "1 gol no HT = Meio green\n"
+            "0 gols no HT = Perde",
+            BetSpec("over", "HT", 1.25),
+        ),
+        SuggestionTemplate(
+            "Over 0.75 gols (HT)",
+            "Linha agressiva mas ainda com proteção parcial em caso de apenas 1 gol.",
+            "2+ gols no HT = Ganha\n"
+            "1 gol no HT = Meio green\n"
+            "0 gols no HT = Perde",
+            BetSpec("over", "HT", 0.75),
+        ),
+    ),
+    # ---------- Gol Asiático HT: cenário intermediário ----------
+    MarketVariant(
+        GOALS_HT,
+        SuggestionTemplate(
+            "Over 1.0 gol (HT)",
+            "Cenário intermediário para gols no 1º tempo – há risco de terminar 0x0.",
+            "2+ gols no HT = Ganha\n"
+            "1 gol no HT = Push (devolvida)\n"
+            "0 gols no HT = Perde",
+            BetSpec("over", "HT", 1.0),
+        ),
+        SuggestionTemplate(
+            "Over 0.5 gol (HT)",
+            "Abordagem conservadora, buscando apenas 1 gol no 1º tempo.",
+            "1+ gol no HT = Ganha\n"
+            "0 gols no HT = Perde",
+            BetSpec("over", "HT", 0.5),
+        ),
+    ),
+)
+
+
+# ----------------------------------------------------
+# RESUMO (probabilidades + força)
+# ----------------------------------------------------
+def summarize(home_win: float, away_win: float, home_rpg: float, away_rpg: float) -> Tuple[float, ...]:
+    """
+    (home_win, draw, away_win, home_rpg, away_rpg) do resumo, a partir das
+    médias cruas (NaN = coluna ausente).
+    """
+    # Probabilidade média de vitória de cada lado, limitada
+    home_win = max(10.0, min(80.0, _or(home_win, 50.0)))
+    away_win = max(10.0, min(80.0, _or(away_win, 50.0)))
+    # Empate como peso residual, limitado para não ficar absurdo
+    draw = max(10.0, min(60.0, 100.0 - (home_win + away_win) / 2))
+    return home_win, draw, away_win, _or(home_rpg, home_win / 25.0), _or(away_rpg, away_win / 25.0)
+
+
+def probabilities_dict(home_win: float, draw: float, away_win: float) -> Dict[str, float]:
+    return {
+        "home_win": round(home_win, 1),
+        "draw": round(draw, 1),
+        "away_win": round(away_win, 1),
+    }
+
+
+def strength_dict(home_rpg: float, away_rpg: float) -> Dict[str, float]:
+    return {
+        "home_rpg": round(home_rpg, 2),
+        "away_rpg": round(away_rpg, 2),
+        "rpg_diff": round(home_rpg - away_rpg, 2),
+    }
+
+
+# ----------------------------------------------------
+# RESULTADO
+# ----------------------------------------------------
+NO_PICK = 0xFF
+
+
+class H2HResult:
+    """
+    Resultado de um confronto: números + até 2 variantes de mercado.
+    Nomes dos times e textos só entram em `to_response()`.
+    """
+
+    __slots__ = (
+        "home_win", "draw", "away_win",  # probabilidades (já limitadas)
+        "home_rpg", "away_rpg",          # força para o resumo
+        "market_home_rpg", "market_away_rpg", "over25", "over05_ht",  # campos dos templates
+        "fav_is_home", "picks",
+    )
+
+    # 9 doubles + favorito + 2 variantes = 75 bytes por par
+    RECORD = struct.Struct("<9d3B")
+
+    def __init__(
+        self,
+        home_win: float,
+        draw: float,
+        away_win: float,
+        home_rpg: float,
+        away_rpg: float,
+        market_home_rpg: float,
+        market_away_rpg: float,
+        over25: float,
+        over05_ht: float,
+        fav_is_home: bool,
+        picks: Tuple[int, ...],
+    ):
+        self.home_win = home_win
+        self.draw = draw
+        self.away_win = away_win
+        self.home_rpg = home_rpg
+        self.away_rpg = away_rpg
+        self.market_home_rpg = market_home_rpg
+        self.market_away_rpg = market_away_rpg
+        self.over25 = over25
+        self.over05_ht = over05_ht
+        self.fav_is_home = fav_is_home
+        self.picks = picks
+
+    # ---------- renderização (borda) ----------
+    def probabilities(self) -> Dict[str, float]:
+        return probabilities_dict(self.home_win, self.draw, self.away_win)
+
+    def strength(self) -> Dict[str, float]:
+        return strength_dict(self.home_rpg, self.away_rpg)
+
+    def asian_markets(self, home_team: str, away_team: str) -> List[Dict[str, Any]]:
+        if not self.picks:
+            return []
+        fav, dog = (home_team, away_team) if self.fav_is_home else (away_team, home_team)
+        ctx = {
+            "fav": fav,
+            "dog": dog,
+            "gap": abs(self.market_home_rpg - self.market_away_rpg),
+            "home_rpg": self.market_home_rpg,
+            "away_rpg": self.market_away_rpg,
+            "over25": self.over25,
+            "over05_ht": self.over05_ht,
+        }
+        return [VARIANTS[i].render(ctx) for i in self.picks]
+
+    def to_response(self, league_id: str, home_team: str, away_team: str) -> Dict[str, Any]:
+        return {
+            "league": league_id,
+            "home_team": home_team,
+            "away_team": away_team,
+            "probabilities": self.probabilities(),
+            "strength": self.strength(),
+            "asian_markets": self.asian_markets(home_team, away_team),
+        }
+
+    # ---------- registro binário ----------
+    def pack_into(self, buffer, offset: int) -> None:
+        picks = tuple(self.picks) + (NO_PICK,) * (2 - len(self.picks))
+        self.RECORD.pack_into(
+            buffer,
+            offset,
+            self.home_win,
+            self.draw,
+            self.away_win,
+            self.home_rpg,
+            self.away_rpg,
+            self.market_home_rpg,
+            self.market_away_rpg,
+            self.over25,
+            self.over05_ht,
+            int(self.fav_is_home),
+            *picks,
+        )
+
+    def pack(self) -> bytes:
+        buffer = bytearray(self.RECORD.size)
+        self.pack_into(buffer, 0)
+        return bytes(buffer)
+
+    @classmethod
+    def unpack_from(cls, buffer, offset: int = 0) -> "H2HResult":
+        values = cls.RECORD.unpack_from(buffer, offset)
+        picks = tuple(p for p in values[10:] if p != NO_PICK)
+        return cls(*values[:9], bool(values[9]), picks)
+
+
+RECORD_SIZE = H2HResult.RECORD.size
+
+
+# ----------------------------------------------------
+# SCORING
+# ----------------------------------------------------
+def evaluate(home: TeamFeatures, away: TeamFeatures) -> H2HResult:
+    """Resumo + scoring dos 4 mercados asiáticos; devolve os 2 melhores."""
+    summary = summarize(home.win_as_home, away.win_as_away, home.rpg, away.rpg)
+
+    home_win = _or(home.win_as_home, 50.0)
+    away_win = _or(away.win_as_away, 50.0)
+
+    # Mercados: força (RPG) com default pela probabilidade sem limite
+    home_rpg = _or(home.rpg, home_win / 25.0)
+    away_rpg = _or(away.rpg, away_win / 25.0)
+    rpg_diff = home_rpg - away_rpg
+
+    # Tendência de gols FT
+    over15 = (_or(home.over15, 70.0) + _or(away.over15, 70.0)) / 2.0
+    over25 = (_or(home.over25, 50.0) + _or(away.over25, 50.0)) / 2.0
+    # BTTS (ambas marcam)
+    btts = (_or(home.btts, 50.0) + _or(away.btts, 50.0)) / 2.0
+    # Tendência de gols HT (se existir) ou proxy baseado em FT
+    ht_default = max(55.0, over15 - 10.0)
+    over05_ht = (_or(home.over05_ht, ht_default) + _or(away.over05_ht, ht_default)) / 2.0
+
+    # ========= SCORING DOS 4 MERCADOS PRINCIPAIS =========
+    fav_is_home = rpg_diff >= 0
+    strength_gap = abs(rpg_diff)
+    handicap_score = strength_gap * 20.0 + abs(home_win - away_win) * 0.6
+    goals_score_ft = (over25 - 55.0) * 1.2 + (btts - 50.0) * 0.7
+    handicap_ht_score = handicap_score * 0.6 + (over05_ht - 60.0) * 0.5
+    goals_score_ht = (over05_ht - 60.0) * 1.3 + (over15 - 70.0) * 0.4
+
+    candidates: List[Tuple[float, int]] = []
+    if handicap_score > 5:
+        candidates.append((handicap_score, AH_FT_STRONG if strength_gap >= 0.5 else AH_FT_BALANCED))
+    if goals_score_ft > 0:
+        if over25 >= 72:
+            candidates.append((goals_score_ft, GOALS_FT_HIGH))
+        elif over25 >= 60:
+            candidates.append((goals_score_ft, GOALS_FT_MID))
+        else:
+            candidates.append((goals_score_ft, GOALS_FT_LOW))
+    if handicap_ht_score > 0:
+        candidates.append((handicap_ht_score, AH_HT_ANY))
+    if goals_score_ht > 0:
+        candidates.append((goals_score_ht, GOALS_HT_HIGH if over05_ht >= 70 else GOALS_HT_LOW))
+
+    # Ordena por score (estável, como antes) e fica com os 2 melhores
+    top = sorted(candidates, key=lambda c: c[0], reverse=True)[:2]
+
+    return H2HResult(
+        *summary,
+        home_rpg,
+        away_rpg,
+        over25,
+        over05_ht,
+        fav_is_home,
+        tuple(v for _, v in top),
+    )
+
+
+def evaluate_frames(df_home: pd.DataFrame, df_away: pd.DataFrame) -> H2HResult:
+    return evaluate(TeamFeatures.from_frame(df_home), TeamFeatures.from_frame(df_away))
+
+
+# ----------------------------------------------------
+# MATRIZ DA LIGA
+# ----------------------------------------------------
+class H2HMatrix:
+    """
+    Todos os pares ordenados de uma liga em um único buffer de
+    n * n * RECORD_SIZE bytes (a diagonal fica zerada e sem uso).
+    """
+
+    __slots__ = ("league_id", "teams", "_index", "_buffer")
+
+    def __init__(self, league_id: str, teams: Sequence[str], buffer: Optional[bytearray] = None):
+        self.league_id = league_id
+        self.teams = tuple(teams)
+        self._index = {name: i for i, name in enumerate(self.teams)}
+        size = len(self.teams) * len(self.teams) * RECORD_SIZE
+        self._buffer = buffer if buffer is not None else bytearray(size)
+        if len(self._buffer) != size:
+            raise ValueError(f"Buffer com {len(self._buffer)} bytes; esperado {size}.")
+
+    @classmethod
+    def build(cls, league_id: str, features: Dict[str, TeamFeatures]) -> "H2HMatrix":
+        matrix = cls(league_id, sorted(features))
+        feats = [features[name] for name in matrix.teams]
+        for h, home in enumerate(feats):
+            for a, away in enumerate(feats):
+                if h != a:
+                    evaluate(home, away).pack_into(matrix._buffer, matrix._offset(h, a))
+        return matrix
+
+    def _offset(self, h: int, a: int) -> int:
+        return (h * len(self.teams) + a) * RECORD_SIZE
+
+    def get(self, home: str, away: str) -> Optional[H2HResult]:
+        h = self._index.get(home)
+        a = self._index.get(away)
+        if h is None or a is None or h == a:
+            return None
+        return H2HResult.unpack_from(self._buffer, self._offset(h, a))
+
+    def response(self, home: str, away: str) -> Optional[Dict[str, Any]]:
+        result = self.get(home, away)
+        if result is None:
+            return None
+        return result.to_response(self.league_id, home, away)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+    @classmethod
+    def from_bytes(cls, league_id: str, teams: Sequence[str], raw: bytes) -> "H2HMatrix":
+        return cls(league_id, teams, bytearray(raw))
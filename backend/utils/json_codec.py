@@ -0,0 +1,53 @@
+"""
+Serialização JSON rápida para as respostas da API.
+
+- Usa orjson quando instalado (dezenas de vezes mais rápido que json.dumps)
+  e cai para a stdlib quando não está.
+- Não passa o conteúdo inteiro pelo `jsonable_encoder` do FastAPI: ele só é
+  chamado para tipos que o encoder não conhece (datas, pydantic, etc.).
+
+Números em benchmarks/serialization_bench.py.
+"""
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+HAS_ORJSON = orjson is not None
+
+if HAS_ORJSON:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _fallback_default(obj: Any) -> Any:
+    encoded = jsonable_encoder(obj)
+    if encoded is obj:
+        raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+    return encoded
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa `content` em JSON compacto (UTF-8)."""
+    if HAS_ORJSON:
+        return orjson.dumps(content, default=_fallback_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_fallback_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa com `dumps` (orjson quando disponível)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
@@ -1,8 +1,11 @@
 import os
-import requests
 from pathlib import Path
 from typing import Optional
 
+from ..updater.transport import http_get
+from .async_io import run_io
+from .metrics import record_cache
+
 BASE = "https://api.sofascore.com/api/v1"
 HDR = {"User-Agent": "Mozilla/5.0"}
 
@@ -33,7 +36,7 @@ def download_team_logo(team_id: int) -> Optional[str]:
         logo_url = f"{BASE}/team/{team_id}/image"
         
         # Baixa o logo
-        response = requests.get(logo_url, headers=HDR, timeout=10)
+        response = http_get(logo_url, headers=HDR, timeout=10)
         
         if response.status_code == 200:
             # Salva o arquivo
@@ -57,11 +60,22 @@ def get_or_download_logo(team_id: int) -> Optional[str]:
     logo_path = get_team_logo_path(team_id)
     
     if logo_path.exists():
+        record_cache("logos", hit=True)
         return str(logo_path)
     
+    record_cache("logos", hit=False)
     return download_team_logo(team_id)
 
 
 def cache_exists(team_id: int) -> bool:
     """Verifica se o logo de uma equipe já está em cache."""
     return get_team_logo_path(team_id).exists()
+
+
+async def get_or_download_logo_async(team_id: int) -> Optional[str]:
+    """Versão para rotas async: no pool de I/O, um download só por time mesmo com pedidos simultâneos."""
+    return await run_io(("logo", team_id), get_or_download_logo, team_id)
+
+
+async def cache_exists_async(team_id: int) -> bool:
+    return await run_io(("logo_exists", team_id), cache_exists, team_id)
@@ -0,0 +1,518 @@
+"""
+Ledger de partidas: uma linha por jogo, um arquivo colunar por liga e temporada.
+
+Os CSVs de data/leagues guardam uma linha agregada por time; médias prontas
+não podem ser refatiadas (só mandante, últimos N jogos, 1º tempo...). O
+ledger guarda as partidas que `SofascoreService` já produz e deriva os
+agregados delas:
+
+    data/ledgers/<liga>/<temporada>.ledger     (ex.: laliga/2024-2025.ledger)
+
+Formato (só stdlib + NumPy): uma sequência de blocos, cada um gravado de uma
+vez no fim do arquivo (append-only, nada é reescrito):
+
+    cabeçalho  "MLG1", bytes do bloco, nº de linhas, nº de nomes novos
+    nomes      times que aparecem pela primeira vez (uint16 tamanho + UTF-8)
+    colunas    um array de largura fixa por coluna de SCHEMA, na ordem
+
+Os times viram códigos int32 (dicionário acumulado bloco a bloco) e as
+estatísticas são int16 com -1 = ausente: ~52 bytes por partida, lidos com
+`np.frombuffer`. Um bloco incompleto no fim (gravação interrompida) é
+ignorado na leitura e sobrescrito na próxima gravação.
+
+Os agregados por time e mando são somas mantidas de forma incremental: cada
+bloco novo soma só as suas partidas. Fatias arbitrárias (últimos N, antes
+de uma data) saem de group-bys vetorizados sobre o ledger inteiro.
+
+Uso:
+    store = get_match_ledger_store()
+    store.append_matches("laliga", matches)                  # dicts do SofascoreService
+    store.ledger("laliga", "2024-2025").team_stats(venue="home", last_n=5)
+
+    python -m backend.utils.match_ledger import data/ledgers   # <liga>/<temporada>.csv -> .ledger
+    python -m backend.utils.match_ledger stats laliga 2024-2025 --venue home --last 5
+"""
+import argparse
+import struct
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import settings
+
+LEDGER_SUFFIX = ".ledger"
+MAGIC = b"MLG1"
+BLOCK_HEADER = struct.Struct("<4sIIH")  # magic, bytes após o cabeçalho, linhas, nomes novos
+NAME_LEN = struct.Struct("<H")
+MISSING = -1
+
+# (coluna, dtype) na ordem em que são gravadas em cada bloco
+SCHEMA: Tuple[Tuple[str, str], ...] = (
+    ("event_id", "<i8"),     # id do evento no SofaScore (-1 = desconhecido)
+    ("ts", "<i8"),           # início da partida, segundos desde a época (UTC)
+    ("home_team", "<i4"),    # código no dicionário de nomes do arquivo
+    ("away_team", "<i4"),
+    ("home_goals", "<i2"),
+    ("away_goals", "<i2"),
+    ("home_goals_ht", "<i2"),
+    ("away_goals_ht", "<i2"),
+    ("home_corners", "<i2"),
+    ("away_corners", "<i2"),
+    ("home_shots", "<i2"),
+    ("away_shots", "<i2"),
+    ("home_target", "<i2"),
+    ("away_target", "<i2"),
+    ("home_yellow", "<i2"),
+    ("away_yellow", "<i2"),
+    ("home_red", "<i2"),
+    ("away_red", "<i2"),
+)
+STAT_COLUMNS = [name for name, dtype in SCHEMA if dtype == "<i2"]
+
+# Somas por (time, mando) das quais saem todas as médias
+SUM_COLUMNS = [
+    "played", "wins", "draws", "losses", "gf", "ga",
+    "over15", "over25", "btts", "clean_sheets",
+    "ht_known", "gf_ht", "ga_ht", "over05_ht",
+    "stats_known", "corners_for", "corners_against", "shots", "shots_on_target", "yellow", "red",
+]
+
+
+# ----------------------------------------------------
+# CONVERSÕES
+# ----------------------------------------------------
+def to_epoch(value: Any) -> int:
+    """Data/hora (ISO, datetime, Timestamp ou segundos) -> segundos UTC."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp())
+
+
+def season_for(ts: int) -> str:
+    """Temporada europeia (jul-jun) de uma partida: "2024-2025"."""
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    start = dt.year if dt.month >= 7 else dt.year - 1
+    return f"{start}-{start + 1}"
+
+
+def _stat(value: Any) -> int:
+    if value is None or value == "":
+        return MISSING
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return MISSING
+    return MISSING if number != number else int(number)
+
+
+# ----------------------------------------------------
+# AGREGADOS (vetorizados)
+# ----------------------------------------------------
+def team_rows(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Uma linha por (partida, time) com os contadores de SUM_COLUMNS.
+    `matches` tem as colunas de SCHEMA com estatísticas em float (NaN = ausente).
+    Partidas sem placar final (adiadas, ainda não jogadas) ficam de fora.
+    """
+    matches = matches[matches["home_goals"].notna() & matches["away_goals"].notna()]
+    sides = []
+    for venue, us, them in (("home", "home", "away"), ("away", "away", "home")):
+        gf = matches[f"{us}_goals"].to_numpy(float)
+        ga = matches[f"{them}_goals"].to_numpy(float)
+        gf_ht = matches[f"{us}_goals_ht"].to_numpy(float)
+        ga_ht = matches[f"{them}_goals_ht"].to_numpy(float)
+        corners_for = matches[f"{us}_corners"].to_numpy(float)
+        total = gf + ga
+        ht_known = ~np.isnan(gf_ht) & ~np.isnan(ga_ht)
+        stats_known = ~np.isnan(corners_for)
+        sides.append(pd.DataFrame({
+            "team": matches[f"{us}_team"].to_numpy(),
+            "venue": venue,
+            "ts": matches["ts"].to_numpy(),
+            "played": 1,
+            "wins": (gf > ga).astype(int),
+            "draws": (gf == ga).astype(int),
+            "losses": (gf < ga).astype(int),
+            "gf": gf,
+            "ga": ga,
+            "over15": (total >= 2).astype(int),
+            "over25": (total >= 3).astype(int),
+            "btts": ((gf > 0) & (ga > 0)).astype(int),
+            "clean_sheets": (ga == 0).astype(int),
+            "ht_known": ht_known.astype(int),
+            "gf_ht": np.where(ht_known, gf_ht, 0.0),
+            "ga_ht": np.where(ht_known, ga_ht, 0.0),
+            "over05_ht": (ht_known & (gf_ht + ga_ht >= 1)).astype(int),
+            "stats_known": stats_known.astype(int),
+            "corners_for": np.where(stats_known, corners_for, 0.0),
+            "corners_against": np.nan_to_num(matches[f"{them}_corners"].to_numpy(float)),
+            "shots": np.nan_to_num(matches[f"{us}_shots"].to_numpy(float)),
+            "shots_on_target": np.nan_to_num(matches[f"{us}_target"].to_numpy(float)),
+            "yellow": np.nan_to_num(matches[f"{us}_yellow"].to_numpy(float)),
+            "red": np.nan_to_num(matches[f"{us}_red"].to_numpy(float)),
+        }))
+    return pd.concat(sides, ignore_index=True)
+
+
+def finalize_stats(sums: pd.DataFrame) -> pd.DataFrame:
+    """
+    Somas por time -> médias. Os nomes das colunas são os que o motor H2H lê
+    (win_rate, over15, over25, btts_yes, over_0_5_ht), então cada linha serve
+    direto para `TeamFeatures.from_frame`.
+    """
+    played = sums["played"]
+    ht = sums["ht_known"].where(sums["ht_known"] > 0)
+    known = sums["stats_known"].where(sums["stats_known"] > 0)
+    out = pd.DataFrame({
+        "team": sums.index,
+        "matches_played": played.to_numpy(),
+        "wins": sums["wins"].to_numpy(),
+        "draws": sums["draws"].to_numpy(),
+        "losses": sums["losses"].to_numpy(),
+        "win_rate": (100.0 * sums["wins"] / played).to_numpy(),
+        "ppg": ((3 * sums["wins"] + sums["draws"]) / played).to_numpy(),
+        "gf_avg": (sums["gf"] / played).to_numpy(),
+        "ga_avg": (sums["ga"] / played).to_numpy(),
+        "over15": (100.0 * sums["over15"] / played).to_numpy(),
+        "over25": (100.0 * sums["over25"] / played).to_numpy(),
+        "btts_yes": (100.0 * sums["btts"] / played).to_numpy(),
+        "clean_sheets_pct": (100.0 * sums["clean_sheets"] / played).to_numpy(),
+        "over_0_5_ht": (100.0 * sums["over05_ht"] / ht).to_numpy(),
+        "gf_ht_avg": (sums["gf_ht"] / ht).to_numpy(),
+        "ga_ht_avg": (sums["ga_ht"] / ht).to_numpy(),
+        "corners_for_avg": (sums["corners_for"] / known).to_numpy(),
+        "corners_against_avg": (sums["corners_against"] / known).to_numpy(),
+        "shots_avg": (sums["shots"] / known).to_numpy(),
+        "shots_on_target_avg": (sums["shots_on_target"] / known).to_numpy(),
+        "yellow_avg": (sums["yellow"] / known).to_numpy(),
+        "red_avg": (sums["red"] / known).to_numpy(),
+    })
+    return out.sort_values("team", kind="stable").reset_index(drop=True)
+
+
+# ----------------------------------------------------
+# LEDGER DE UMA TEMPORADA
+# ----------------------------------------------------
+class SeasonLedger:
+    """
+    Um arquivo <liga>/<temporada>.ledger em memória: colunas por bloco, o
+    dicionário de nomes e as somas por (time, mando). `refresh()` lê só os
+    blocos gravados desde a última leitura.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.names: List[str] = []
+        self.rows = 0
+        self._codes: Dict[str, int] = {}
+        self._chunks: Dict[str, List[np.ndarray]] = {name: [] for name, _ in SCHEMA}
+        self._keys: set = set()
+        self._offset = 0
+        self._totals: Optional[pd.DataFrame] = None
+        self._frame: Optional[pd.DataFrame] = None
+        self._stats: Dict[Optional[str], pd.DataFrame] = {}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    # ---------- leitura ----------
+    def refresh(self) -> int:
+        """Incorpora os blocos novos do arquivo. Devolve quantas partidas entraram."""
+        with self._lock:
+            if not self.path.exists() or self.path.stat().st_size <= self._offset:
+                return 0
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                raw = f.read()
+
+            added, pos = 0, 0
+            while pos + BLOCK_HEADER.size <= len(raw):
+                magic, size, nrows, nnames = BLOCK_HEADER.unpack_from(raw, pos)
+                end = pos + BLOCK_HEADER.size + size
+                if magic != MAGIC or end > len(raw):
+                    break  # bloco incompleto: gravação interrompida
+                cursor = pos + BLOCK_HEADER.size
+                new_names = []
+                for _ in range(nnames):
+                    (length,) = NAME_LEN.unpack_from(raw, cursor)
+                    cursor += NAME_LEN.size
+                    new_names.append(raw[cursor:cursor + length].decode("utf-8"))
+                    cursor += length
+                columns = {}
+                for name, dtype in SCHEMA:
+                    columns[name] = np.frombuffer(raw, dtype=dtype, count=nrows, offset=cursor)
+                    cursor += nrows * np.dtype(dtype).itemsize
+                self._ingest(new_names, columns)
+                added += nrows
+                pos = end
+
+            self._offset += pos
+            return added
+
+    def _ingest(self, new_names: List[str], columns: Dict[str, np.ndarray]) -> None:
+        for name in new_names:
+            self._codes[name] = len(self.names)
+            self.names.append(name)
+        for name, values in columns.items():
+            self._chunks[name].append(values)
+        self._keys.update(zip(columns["ts"].tolist(), columns["home_team"].tolist(), columns["away_team"].tolist()))
+        self.rows += len(columns["ts"])
+        self._frame = None
+        self._stats = {}
+
+        # somas incrementais: só as partidas deste bloco
+        sums = team_rows(_decode_stats(columns)).groupby(["team", "venue"])[SUM_COLUMNS].sum()
+        self._totals = sums if self._totals is None else self._totals.add(sums, fill_value=0)
+
+    def frame(self, start: int = 0) -> pd.DataFrame:
+        """
+        Partidas (nomes decodificados, estatísticas em float com NaN), na
+        ordem de gravação. `start` > 0 decodifica só as linhas a partir dele
+        (leitura incremental de quem já consumiu as anteriores).
+        """
+        with self._lock:
+            self.refresh()
+            if start > 0:
+                return self._decode(self._columns_since(start))
+            if self._frame is None:
+                self._frame = self._decode({name: _concat(self._chunks[name], dtype) for name, dtype in SCHEMA})
+            return self._frame.copy()
+
+    def _columns_since(self, start: int) -> Dict[str, np.ndarray]:
+        selected: Dict[str, List[np.ndarray]] = {name: [] for name, _ in SCHEMA}
+        first = 0
+        for i, chunk in enumerate(self._chunks["ts"]):
+            end = first + len(chunk)
+            if end > start:
+                skip = max(0, start - first)
+                for name, _ in SCHEMA:
+                    selected[name].append(self._chunks[name][i][skip:])
+            first = end
+        return {name: _concat(selected[name], dtype) for name, dtype in SCHEMA}
+
+    def _decode(self, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        df = _decode_stats(columns)
+        names = np.array(self.names, dtype=object)
+        df["home_team"] = names[columns["home_team"]]
+        df["away_team"] = names[columns["away_team"]]
+        df.insert(0, "date", pd.to_datetime(columns["ts"], unit="s"))
+        return df
+
+    def team_stats(
+        self,
+        venue: Optional[str] = None,
+        last_n: Optional[int] = None,
+        before: Any = None,
+    ) -> pd.DataFrame:
+        """
+        Médias por time (uma linha por time).
+
+        venue:  None (todos os jogos), "home" ou "away"
+        last_n: só os últimos N jogos de cada time (dentro do `venue`)
+        before: só partidas que começaram antes desta data
+        """
+        with self._lock:
+            self.refresh()
+            if self._totals is None:
+                return finalize_stats(pd.DataFrame(columns=SUM_COLUMNS, dtype=float))
+
+            if last_n is None and before is None:
+                # caminho incremental: somas já prontas (médias guardadas até o próximo bloco)
+                stats = self._stats.get(venue)
+                if stats is None:
+                    totals = self._totals
+                    if venue is not None:
+                        totals = totals[totals.index.get_level_values("venue") == venue]
+                    sums = totals.groupby(level="team").sum()
+                    stats = self._stats[venue] = finalize_stats(sums.rename(index=dict(enumerate(self.names))))
+                return stats.copy()
+
+            rows = team_rows(self.frame())
+        if before is not None:
+            rows = rows[rows["ts"] < to_epoch(before)]
+        if venue is not None:
+            rows = rows[rows["venue"] == venue]
+        if last_n is not None:
+            rows = rows.sort_values("ts", kind="stable").groupby("team", sort=False).tail(last_n)
+        return finalize_stats(rows.groupby("team")[SUM_COLUMNS].sum())
+
+    def team_frame(self, team: str, **slicing) -> pd.DataFrame:
+        """Linha de um time no formato dos CSVs (entrada do motor H2H)."""
+        stats = self.team_stats(**slicing)
+        return stats[stats["team"] == team].reset_index(drop=True)
+
+    # ---------- escrita ----------
+    def append(self, matches: Iterable[Dict[str, Any]]) -> int:
+        """
+        Acrescenta partidas (dicts com as chaves do SofascoreService) em um
+        bloco novo. Partidas já gravadas (mesmo início e mesmos times) e
+        partidas sem placar final são ignoradas: uma partida que ainda não
+        terminou entra quando vier com o resultado. Devolve quantas entraram.
+        """
+        with self._lock:
+            self.refresh()
+            new_names: List[str] = []
+            codes = dict(self._codes)
+            keys = set()
+            rows: List[Tuple[int, ...]] = []
+
+            for match in matches:
+                if _stat(match.get("home_goals")) == MISSING or _stat(match.get("away_goals")) == MISSING:
+                    continue
+                ts = to_epoch(match["timestamp"] if match.get("timestamp") is not None else match["date"])
+                pair = []
+                for side in ("home_team", "away_team"):
+                    name = str(match[side])
+                    if name not in codes:
+                        codes[name] = len(self.names) + len(new_names)
+                        new_names.append(name)
+                    pair.append(codes[name])
+                key = (ts, pair[0], pair[1])
+                if key in self._keys or key in keys:
+                    continue
+                keys.add(key)
+                event_id = _stat(match.get("event_id"))
+                rows.append((event_id, ts, pair[0], pair[1], *(_stat(match.get(c)) for c in STAT_COLUMNS)))
+
+            if not rows:
+                return 0
+
+            # nomes que só apareceriam em partidas repetidas não entram no bloco
+            used = {code for row in rows for code in row[2:4]}
+            kept = [name for name in new_names if codes[name] in used]
+            if len(kept) != len(new_names):
+                remap = {codes[name]: len(self.names) + i for i, name in enumerate(kept)}
+                rows = [(r[0], r[1], remap.get(r[2], r[2]), remap.get(r[3], r[3]), *r[4:]) for r in rows]
+                new_names = kept
+
+            table = list(zip(*rows))
+            columns = {name: np.array(table[i], dtype=dtype) for i, (name, dtype) in enumerate(SCHEMA)}
+            payload = bytearray()
+            for name in new_names:
+                encoded = name.encode("utf-8")
+                payload += NAME_LEN.pack(len(encoded)) + encoded
+            for name, _ in SCHEMA:
+                payload += columns[name].tobytes()
+            block = BLOCK_HEADER.pack(MAGIC, len(payload), len(rows), len(new_names)) + bytes(payload)
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "r+b" if self.path.exists() else "wb") as f:
+                f.truncate(self._offset)  # descarta um bloco incompleto, se houver
+                f.seek(self._offset)
+                f.write(block)
+
+            self._ingest(new_names, columns)
+            self._offset += len(block)
+            return len(rows)
+
+
+def _concat(chunks: List[np.ndarray], dtype: str) -> np.ndarray:
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+
+def _decode_stats(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Colunas cruas -> DataFrame; estatísticas int16 viram float com NaN no lugar de -1."""
+    df = pd.DataFrame({
+        "event_id": columns["event_id"],
+        "ts": columns["ts"],
+        "home_team": columns["home_team"],
+        "away_team": columns["away_team"],
+    })
+    for name in STAT_COLUMNS:
+        values = columns[name].astype(float)
+        values[values == MISSING] = np.nan
+        df[name] = values
+    return df
+
+
+# ----------------------------------------------------
+# STORE (todas as ligas / temporadas)
+# ----------------------------------------------------
+class MatchLedgerStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._ledgers: Dict[Tuple[str, str], SeasonLedger] = {}
+        self._lock = threading.Lock()
+
+    def path(self, league_id: str, season: str) -> Path:
+        return self.root / league_id / f"{season}{LEDGER_SUFFIX}"
+
+    def ledger(self, league_id: str, season: str) -> SeasonLedger:
+        key = (league_id, season)
+        ledger = self._ledgers.get(key)
+        if ledger is None:
+            with self._lock:
+                ledger = self._ledgers.get(key)
+                if ledger is None:
+                    ledger = self._ledgers[key] = SeasonLedger(self.path(league_id, season))
+        return ledger
+
+    def seasons(self, league_id: str) -> List[str]:
+        return sorted(p.stem for p in (self.root / league_id).glob(f"*{LEDGER_SUFFIX}"))
+
+    def append_matches(self, league_id: str, matches: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Distribui as partidas pelas temporadas (pela data) e grava. Devolve novas por temporada."""
+        by_season: Dict[str, List[Dict[str, Any]]] = {}
+        for match in matches:
+            ts = to_epoch(match["timestamp"] if match.get("timestamp") is not None else match["date"])
+            by_season.setdefault(season_for(ts), []).append(match)
+        return {season: self.ledger(league_id, season).append(rows) for season, rows in sorted(by_season.items())}
+
+    def import_csv_tree(self, root: Path) -> Dict[str, int]:
+        """Converte <liga>/<temporada>.csv (separado por ;) em .ledger. Devolve partidas novas por arquivo."""
+        counts: Dict[str, int] = {}
+        for csv_file in sorted(Path(root).glob("*/*.csv")):
+            df = pd.read_csv(csv_file, sep=";")
+            df = df.astype(object).where(df.notna(), None)
+            league_id, season = csv_file.parent.name, csv_file.stem
+            counts[f"{league_id}/{season}"] = self.ledger(league_id, season).append(df.to_dict("records"))
+        return counts
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+_store: Optional[MatchLedgerStore] = None
+_store_lock = threading.Lock()
+
+
+def get_match_ledger_store() -> MatchLedgerStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MatchLedgerStore(settings.LEDGERS_DIR)
+    return _store
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Ledger de partidas por liga e temporada.")
+    sub = p.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="converte <liga>/<temporada>.csv em .ledger")
+    imp.add_argument("csv_root", type=Path, nargs="?", default=settings.LEDGERS_DIR)
+    st = sub.add_parser("stats", help="médias por time de uma temporada")
+    st.add_argument("league_id")
+    st.add_argument("season")
+    st.add_argument("--venue", choices=["home", "away"], default=None)
+    st.add_argument("--last", type=int, default=None)
+    args = p.parse_args(argv)
+
+    store = get_match_ledger_store()
+    if args.command == "import":
+        counts = store.import_csv_tree(args.csv_root)
+        for name, n in counts.items():
+            print(f"{name}: {n} partidas novas")
+        return
+
+    stats = store.ledger(args.league_id, args.season).team_stats(venue=args.venue, last_n=args.last)
+    print(stats.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
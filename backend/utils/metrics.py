@@ -0,0 +1,266 @@
+"""
+Métricas em memória no formato de exposição do Prometheus.
+
+- Counter   – contador monotônico por combinação de labels
+- Histogram – buckets cumulativos + soma + contagem, por combinação de labels
+
+Uso:
+    from backend.utils import metrics
+
+    metrics.inc("cache_requests_total", cache="logos", result="hit")
+    with metrics.timed("h2h_phase_duration_seconds", phase="engine"):
+        ...
+    metrics.render()  # texto para GET /metrics
+
+Tudo é thread-safe (as rotas síncronas rodam no threadpool) e o custo por
+observação é um lock + bisect, desprezível frente ao tempo de uma requisição.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Buckets em segundos: de 0.5 ms a 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, value in sorted(self.samples()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # por label: [contagens por bucket (não cumulativas) + overflow, soma, contagem]
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self, **labels) -> Optional[Dict[str, object]]:
+        """Contagem, soma e buckets cumulativos de uma série (ou None)."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if series is None:
+                return None
+            counts, total, count = list(series[0]), series[1], series[2]
+
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return {"count": count, "sum": total, "buckets": dict(zip(self.buckets + (float("inf"),), cumulative))}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimativa do quantil q (0..1) pelo limite superior do bucket."""
+        snap = self.snapshot(**labels)
+        if not snap or not snap["count"]:
+            return None
+        target = q * snap["count"]
+        for bound, cumulative in snap["buckets"].items():
+            if cumulative >= target:
+                return bound
+        return None
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._series.items())
+
+        lines = []
+        for key, (counts, total, count) in items:
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+# ----------------------------------------------------
+# REGISTRO GLOBAL
+# ----------------------------------------------------
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str, help_text: str = "") -> Counter:
+    metric = _registry.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _registry.setdefault(name, Counter(name, help_text))
+    return metric  # type: ignore[return-value]
+
+
+def histogram(name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    metric = _registry.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _registry.setdefault(name, Histogram(name, help_text, buckets))
+    return metric  # type: ignore[return-value]
+
+
+def inc(name: str, amount: float = 1.0, **labels) -> None:
+    counter(name).inc(amount, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    histogram(name).observe(value, **labels)
+
+
+@contextmanager
+def timed(name: str, **labels) -> Iterator[None]:
+    """Mede o bloco e registra a duração (s) no histograma `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(name).observe(time.perf_counter() - t0, **labels)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Contador padrão de acertos/erros de cache, usado por todos os caches."""
+    counter("cache_requests_total", "Consultas a caches internos por resultado.").inc(
+        cache=cache, result="hit" if hit else "miss"
+    )
+
+
+def render() -> str:
+    """Todas as métricas no formato texto do Prometheus (versão 0.0.4)."""
+    lines: List[str] = []
+    for name in sorted(_registry):
+        metric = _registry[name]
+        if metric.help:
+            lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Zera os valores de todas as métricas (usado por benchmarks)."""
+    for metric in list(_registry.values()):
+        metric.clear()
+
+
+# ----------------------------------------------------
+# MIDDLEWARE ASGI
+# ----------------------------------------------------
+class MetricsMiddleware:
+    """
+    Mede a latência de cada requisição HTTP e registra em
+    `http_request_duration_seconds{method, route, status}`.
+
+    A rota usa o template (`/api/league/{league_id}/teams`), não o caminho
+    real, para não explodir a cardinalidade dos labels.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            histogram("http_request_duration_seconds").observe(
+                time.perf_counter() - t0,
+                method=scope.get("method", ""),
+                route=template,
+                status=status_holder["status"],
+            )
+
+
+# Métricas principais já registradas, com HELP
+histogram("http_request_duration_seconds", "Latência das requisições HTTP por rota.")
+histogram("h2h_phase_duration_seconds", "Tempo de cada fase do /api/h2h (file_io, csv_parse, snapshot_io, form_sync, model_fit, engine, serialization).")
+counter("cache_requests_total", "Consultas a caches internos por resultado.")
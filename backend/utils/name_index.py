@@ -0,0 +1,245 @@
+"""
+Resolução de nomes de times -> arquivo do time na liga.
+
+Os CSVs têm nomes inconsistentes (`italy---serie-a---napoli.csv`,
+`hellas_verona.csv`, `sevilla_fc.csv`) e os clientes mandam o nome de
+exibição ("Napoli", "Hellas Verona", "Sevilla"). `slugify(nome) + exists()`
+não acha boa parte deles e o cliente tenta variantes (404 atrás de 404).
+
+Por liga, um índice montado uma vez a partir de:
+
+- o nome do arquivo (inteiro e sem o prefixo "país---liga---");
+- as colunas `team_name` / `team` da primeira linha do CSV;
+- os apelidos em `liga.json` (`"aliases": {"Barça": "barcelona"}`).
+
+Cada nome gera chaves normalizadas: o slug e o "núcleo" (slug sem tokens
+de clube como fc, ac, calcio). A busca exata é um dict. Quando não acha, a
+busca aproximada usa um índice de trigramas do núcleo (similaridade de
+Dice, mínimo NAME_MATCH_MIN_SCORE) e só aceita um vencedor claro. As
+respostas ficam em cache por índice.
+
+O índice é refeito quando a pasta da liga ou o liga.json mudam (um stat de
+cada) e pelo updater, depois de atualizar a liga (`invalidate`). As consultas
+históricas (`as_of`) usam um índice à parte, dos times com snapshots, que
+vale também para times cujo CSV já foi removido ou renomeado.
+"""
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.utils.team_normalizer import slugify
+from config.settings import settings
+
+from .response_cache import file_version
+from .team_data import team_data
+
+# Tokens que não identificam o clube ("Sevilla FC" = "Sevilla", "AC Milan" = "Milan")
+CLUB_TOKENS = frozenset({
+    "fc", "cf", "afc", "ac", "as", "ssc", "sc", "us", "ss", "cd", "rcd", "ud", "sd", "ca",
+    "club", "calcio", "futbol", "football", "de",
+})
+NAME_COLUMNS = ("team_name", "team")
+PREFIX_SEPARATOR = "---"
+AMBIGUOUS = ""
+
+
+def name_keys(name: str) -> Tuple[str, ...]:
+    """Chaves exatas de um nome: slug, slug sem prefixo de liga e núcleo sem tokens de clube."""
+    slug = slugify(str(name))
+    if not slug:
+        return ()
+    keys = [slug]
+    if PREFIX_SEPARATOR in str(name):
+        keys.append(slugify(str(name).rsplit(PREFIX_SEPARATOR, 1)[-1]))
+    core = core_key(keys[-1])
+    if core:
+        keys.append(core)
+    return tuple(dict.fromkeys(k for k in keys if k))
+
+
+def core_key(slug: str) -> str:
+    tokens = [t for t in slug.split("-") if t and t not in CLUB_TOKENS]
+    return "-".join(tokens)
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key.replace('-', ' ')} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LeagueNameIndex:
+    def __init__(self, league_id: str, version: Tuple, names: Iterable[Tuple[str, str]]):
+        """`names`: pares (nome conhecido, slug do arquivo)."""
+        self.league_id = league_id
+        self.version = version
+        self._exact: Dict[str, str] = {}
+        self._grams: Dict[str, Set[int]] = {}
+        self._gram_counts: List[int] = []
+        self._targets: List[str] = []
+        self._resolved: Dict[str, Optional[str]] = {}
+
+        seen_cores: Set[Tuple[str, str]] = set()
+        for name, slug in names:
+            keys = name_keys(name)
+            for key in keys:
+                current = self._exact.get(key)
+                # a mesma chave para dois arquivos não resolve nenhum dos dois
+                self._exact[key] = slug if current in (None, slug) else AMBIGUOUS
+            if keys and (keys[-1], slug) not in seen_cores:
+                seen_cores.add((keys[-1], slug))
+                self._add_fuzzy(keys[-1], slug)
+
+    def add_alias(self, alias: str, target: str) -> None:
+        """Apelido -> time já indexado (`target` pode ser qualquer nome que resolva)."""
+        slug = self.resolve(target)
+        self._resolved.clear()
+        if slug is None:
+            print(f"Apelido '{alias}' de {self.league_id}: '{target}' não corresponde a nenhum time")
+            return
+        for key in name_keys(alias):
+            self._exact[key] = slug
+
+    def _add_fuzzy(self, key: str, slug: str) -> None:
+        i = len(self._targets)
+        self._targets.append(slug)
+        grams = trigrams(key)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(i)
+
+    def _scores(self, key: str) -> List[Tuple[float, str]]:
+        """(Dice, slug) do melhor núcleo de cada arquivo, em ordem decrescente."""
+        grams = trigrams(key)
+        common: Counter = Counter()
+        for gram in grams:
+            for i in self._grams.get(gram, ()):
+                common[i] += 1
+        best: Dict[str, float] = {}
+        for i, n in common.items():
+            score = 2.0 * n / (len(grams) + self._gram_counts[i])
+            slug = self._targets[i]
+            if score > best.get(slug, 0.0):
+                best[slug] = score
+        return sorted(((score, slug) for slug, score in best.items()), reverse=True)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Slug do arquivo do time (None se nenhum casa com segurança)."""
+        if name in self._resolved:
+            return self._resolved[name]
+
+        result = None
+        keys = name_keys(name)
+        for key in keys:
+            slug = self._exact.get(key)
+            if slug is not None:
+                result = slug or None
+                break
+        else:
+            if keys:
+                scores = self._scores(keys[-1])
+                if scores and scores[0][0] >= settings.NAME_MATCH_MIN_SCORE:
+                    runner_up = scores[1][0] if len(scores) > 1 else 0.0
+                    if scores[0][0] - runner_up >= settings.NAME_MATCH_MIN_MARGIN:
+                        result = scores[0][1]
+
+        if len(self._resolved) < 4096:
+            self._resolved[name] = result
+        return result
+
+    def suggestions(self, name: str, limit: int = 3) -> List[str]:
+        keys = name_keys(name)
+        if not keys:
+            return []
+        return [slug for _, slug in self._scores(keys[-1])[:limit]]
+
+
+class NameIndex:
+    """Índices de todas as ligas de uma pasta base (data/leagues)."""
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, str], LeagueNameIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version(league_path: Path) -> Tuple:
+        return (file_version(league_path), file_version(league_path / "liga.json"))
+
+    def league(self, base: Path, league_id: str) -> LeagueNameIndex:
+        league_path = Path(base) / league_id
+        key = (str(base), league_id)
+        version = self._version(league_path)
+        index = self._indexes.get(key)
+        if index is not None and index.version == version:
+            return index
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None or index.version != version:
+                index = self._indexes[key] = self._build(league_path, league_id, version)
+            return index
+
+    def _build(self, league_path: Path, league_id: str, version: Tuple) -> LeagueNameIndex:
+        names: List[Tuple[str, str]] = []
+        for slug in team_data.team_slugs(league_path.parent, league_id):
+            names.append((slug, slug))
+            data = team_data.load(league_path / f"{slug}.csv")
+            try:
+                frame = data.frame if data is not None else None
+            except Exception:
+                frame = None
+            if frame is not None and len(frame):
+                for column in NAME_COLUMNS:
+                    if column in frame.columns and isinstance(frame[column].iloc[0], str):
+                        names.append((frame[column].iloc[0], slug))
+
+        index = LeagueNameIndex(league_id, version, names)
+
+        meta = league_path / "liga.json"
+        if meta.exists():
+            try:
+                with open(meta, "r", encoding="utf-8") as f:
+                    aliases = json.load(f).get("aliases", {})
+            except Exception as exc:
+                print(f"Falha ao ler apelidos de {league_id}: {exc}")
+                aliases = {}
+            for alias, target in aliases.items():
+                index.add_alias(alias, target)
+        return index
+
+    def names(
+        self, scope: str, league_id: str, version: Hashable, names: Callable[[], Iterable[str]]
+    ) -> LeagueNameIndex:
+        """
+        Índice sobre nomes que não vêm da pasta da liga (ledger, ranking, modelo
+        de placares): `resolve` devolve o nome da própria lista. `names` só é
+        chamado quando `version` muda.
+        """
+        key = (scope, league_id)
+        index = self._indexes.get(key)
+        if index is not None and index.version == version:
+            return index
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None or index.version != version:
+                index = self._indexes[key] = LeagueNameIndex(league_id, version, ((n, n) for n in names()))
+            return index
+
+    def snapshot_league(self, league_id: str, team_ids: Sequence[str]) -> LeagueNameIndex:
+        """Índice dos times com histórico (utils/snapshots.py), para as consultas `as_of`."""
+        return self.names("snapshots", league_id, tuple(team_ids), lambda: team_ids)
+
+    def resolve(self, base: Path, league_id: str, name: str) -> Optional[str]:
+        return self.league(base, league_id).resolve(name)
+
+    def invalidate(self, league_id: Optional[str] = None) -> None:
+        with self._lock:
+            for key in list(self._indexes):
+                if league_id is None or key[1] == league_id:
+                    del self._indexes[key]
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+name_index = NameIndex()
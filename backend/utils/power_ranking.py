@@ -0,0 +1,247 @@
+"""
+Ranking de força da liga (Massey) e classificação, calculados das partidas.
+
+Modelo de Massey com mando de campo, por mínimos quadrados:
+
+    gols_mandante - gols_visitante ≈ força[mandante] - força[visitante] + casa
+
+As equações normais da liga inteira (N times + casa) são montadas com
+np.bincount e resolvidas de uma vez. Um termo de ridge (RIDGE jogos
+fictícios contra um time médio) deixa o sistema sempre inversível e puxa
+para zero quem tem poucos jogos; as forças somam zero. A força fica na
+mesma unidade do antigo `rpg` (saldo de gols por jogo contra um time médio).
+
+A classificação (pontos, saldo, gols pró) sai das mesmas partidas. As duas
+coisas são calculadas uma vez por atualização da liga (`update_engine`) e
+guardadas em `RankingStore` (memória + JSON em RANKINGS_DIR). O H2H e a
+rota de classificação só fazem consultas O(1) por time.
+
+A fonte é o ledger de partidas (`match_ledger.py`), temporada mais recente.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.team_normalizer import slugify
+from config.settings import settings
+
+from .match_ledger import MatchLedgerStore, get_match_ledger_store
+from .name_index import name_index
+
+RIDGE = 1.0  # jogos fictícios (empate com um time médio) por time
+
+
+# ----------------------------------------------------
+# AJUSTE
+# ----------------------------------------------------
+def massey_ratings(
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    home_goals: np.ndarray,
+    away_goals: np.ndarray,
+    n_teams: int,
+    ridge: float = RIDGE,
+) -> Tuple[np.ndarray, float]:
+    """(força por time, vantagem de casa em gols) pelo ajuste de Massey com ridge."""
+    margin = home_goals - away_goals
+    games = np.bincount(home_idx, minlength=n_teams) + np.bincount(away_idx, minlength=n_teams)
+
+    # [times..., casa] x [times..., casa]
+    size = n_teams + 1
+    a = np.zeros((size, size))
+    np.add.at(a, (home_idx, away_idx), -1.0)
+    np.add.at(a, (away_idx, home_idx), -1.0)
+    a[np.arange(n_teams), np.arange(n_teams)] = games + ridge
+    home_col = np.bincount(home_idx, minlength=n_teams) - np.bincount(away_idx, minlength=n_teams)
+    a[:n_teams, n_teams] = a[n_teams, :n_teams] = home_col
+    a[n_teams, n_teams] = len(margin)
+
+    b = np.empty(size)
+    b[:n_teams] = np.bincount(home_idx, margin, n_teams) - np.bincount(away_idx, margin, n_teams)
+    b[n_teams] = margin.sum()
+
+    solution = np.linalg.solve(a, b)
+    return solution[:n_teams], float(solution[n_teams])
+
+
+def standings(
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    home_goals: np.ndarray,
+    away_goals: np.ndarray,
+    n_teams: int,
+) -> Dict[str, np.ndarray]:
+    """Colunas da classificação (jogos, V/E/D, gols, pontos) por índice de time."""
+    def both(home_values: np.ndarray, away_values: np.ndarray) -> np.ndarray:
+        return (
+            np.bincount(home_idx, home_values, n_teams) + np.bincount(away_idx, away_values, n_teams)
+        ).astype(int)
+
+    home_win = (home_goals > away_goals).astype(float)
+    away_win = (home_goals < away_goals).astype(float)
+    draw = (home_goals == away_goals).astype(float)
+    table = {
+        "played": both(np.ones(len(home_idx)), np.ones(len(home_idx))),
+        "wins": both(home_win, away_win),
+        "draws": both(draw, draw),
+        "losses": both(away_win, home_win),
+        "goals_for": both(home_goals, away_goals),
+        "goals_against": both(away_goals, home_goals),
+    }
+    table["goal_diff"] = table["goals_for"] - table["goals_against"]
+    table["points"] = 3 * table["wins"] + table["draws"]
+    return table
+
+
+# ----------------------------------------------------
+# RESULTADO POR LIGA
+# ----------------------------------------------------
+class LeagueRanking:
+    """Classificação + forças de uma liga, com busca O(1) por nome de time."""
+
+    def __init__(self, league_id: str, season: str, version: Tuple[Any, ...], home_adv: float, table: List[Dict[str, Any]]):
+        self.league_id = league_id
+        self.season = season
+        self.version = tuple(version)
+        self.home_adv = home_adv
+        self.table = table  # ordenada pela posição
+        self._index = {slugify(row["team"]): i for i, row in enumerate(table)}
+
+    def _find(self, name: str) -> Optional[int]:
+        i = self._index.get(slugify(name))
+        if i is not None:
+            return i
+        # nome de arquivo, de exibição ou apelido: o mesmo índice de nomes das outras rotas
+        names = name_index.names("ranking", self.league_id, self.version, lambda: [row["team"] for row in self.table])
+        resolved = names.resolve(name)
+        return self._index.get(slugify(resolved)) if resolved is not None else None
+
+    def team(self, name: str) -> Optional[Dict[str, Any]]:
+        i = self._find(name)
+        return self.table[i] if i is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "league": self.league_id,
+            "season": self.season,
+            "version": [list(v) for v in self.version],
+            "home_advantage": self.home_adv,
+            "table": self.table,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LeagueRanking":
+        version = tuple(tuple(v) for v in data["version"])
+        return cls(data["league"], data["season"], version, data["home_advantage"], data["table"])
+
+
+def compute_ranking(league_id: str, store: Optional[MatchLedgerStore] = None) -> Optional[LeagueRanking]:
+    """Ajusta as forças e monta a classificação da temporada mais recente do ledger."""
+    store = store or get_match_ledger_store()
+    seasons = store.seasons(league_id)
+    if not seasons:
+        return None
+    season = seasons[-1]
+    ledger = store.ledger(league_id, season)
+    ledger.refresh()
+    # jogos sem placar ainda não contam (NaN deixaria todas as forças e a tabela inválidas)
+    matches = ledger.frame().dropna(subset=["home_goals", "away_goals"])
+    if matches.empty:
+        return None
+
+    teams = sorted(set(matches["home_team"]) | set(matches["away_team"]))
+    codes = {name: i for i, name in enumerate(teams)}
+    home_idx = matches["home_team"].map(codes).to_numpy()
+    away_idx = matches["away_team"].map(codes).to_numpy()
+    home_goals = matches["home_goals"].to_numpy(float)
+    away_goals = matches["away_goals"].to_numpy(float)
+
+    ratings, home_adv = massey_ratings(home_idx, away_idx, home_goals, away_goals, len(teams))
+    columns = standings(home_idx, away_idx, home_goals, away_goals, len(teams))
+
+    df = pd.DataFrame({"team": teams, **columns, "rating": ratings.round(3)})
+    df["power_rank"] = df["rating"].rank(ascending=False, method="min").astype(int)
+    df = df.sort_values(
+        ["points", "goal_diff", "goals_for", "team"], ascending=[False, False, False, True], kind="stable"
+    )
+    df.insert(0, "position", np.arange(1, len(df) + 1))
+
+    version = ((season, ledger.rows),)
+    print(f"Ranking {league_id} {season}: {len(teams)} times, {len(matches)} partidas")
+    return LeagueRanking(league_id, season, version, round(home_adv, 3), df.to_dict("records"))
+
+
+# ----------------------------------------------------
+# STORE (memória + JSON por liga)
+# ----------------------------------------------------
+class RankingStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # liga -> (inode + mtime do JSON, ranking): outro processo pode regravar o arquivo
+        self._rankings: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[LeagueRanking]]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, league_id: str) -> Path:
+        return self.root / f"{league_id}.json"
+
+    def _stamp(self, league_id: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path(league_id).stat()
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def get(self, league_id: str) -> Optional[LeagueRanking]:
+        """Último ranking gravado da liga; relê o JSON só quando o arquivo muda (um stat por chamada)."""
+        stamp = self._stamp(league_id)
+        cached = self._rankings.get(league_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._rankings.get(league_id)
+            if cached is None or cached[0] != stamp:
+                cached = self._rankings[league_id] = (stamp, self._load(league_id) if stamp else None)
+            return cached[1]
+
+    def _load(self, league_id: str) -> Optional[LeagueRanking]:
+        path = self.path(league_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return LeagueRanking.from_dict(json.load(f))
+        except Exception as exc:
+            print(f"Falha ao ler ranking de {league_id}: {exc}")
+            return None
+
+    def put(self, ranking: LeagueRanking) -> None:
+        path = self.path(ranking.league_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{time.monotonic_ns()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(ranking.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+        with self._lock:
+            self._rankings[ranking.league_id] = (self._stamp(ranking.league_id), ranking)
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+_store: Optional[RankingStore] = None
+_store_lock = threading.Lock()
+
+
+def get_ranking_store() -> RankingStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RankingStore(settings.RANKINGS_DIR)
+    return _store
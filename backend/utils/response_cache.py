@@ -0,0 +1,255 @@
+"""
+Cache de respostas com validadores HTTP (ETag / Last-Modified).
+
+As respostas de /api/leagues, /api/league/{id}/teams e /api/h2h são função
+pura dos arquivos em data/leagues. A "versão" desses arquivos (mtime_ns +
+tamanho de cada um) entra no ETag, então:
+
+- If-None-Match igual ao ETag atual  -> 304 sem corpo
+- ETag já calculado antes            -> corpo servido do cache (sem recomputar)
+- qualquer arquivo alterado          -> nova versão, novo ETag, recomputa
+
+O Cache-Control permite que um CDN na frente do Render absorva as repetições
+e que o painel (TanStack Query) revalide praticamente de graça.
+
+Cada entrada guarda também as variantes comprimidas (gzip/br) do corpo,
+criadas no primeiro pedido de cada codificação: acertos repetidos não
+recomprimem. Cada variante tem ETag próprio (sufixo -gz / -br).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from config.settings import settings
+from .compression import ETAG_SUFFIX, compress, is_compressible, negotiate, record_bytes, with_etag_suffix
+from .json_codec import dumps
+from .metrics import record_cache
+from .single_flight import SingleFlight
+
+Version = Tuple[Any, ...]
+
+
+# ----------------------------------------------------
+# VERSÃO DOS DADOS
+# ----------------------------------------------------
+def file_version(path: Path) -> Tuple[str, int, int]:
+    """(nome, mtime_ns, tamanho) de um arquivo; (nome, 0, -1) se não existir."""
+    try:
+        st = path.stat()
+    except OSError:
+        return (path.name, 0, -1)
+    return (path.name, st.st_mtime_ns, st.st_size)
+
+
+def files_version(paths: Iterable[Path]) -> Version:
+    return tuple(file_version(p) for p in paths)
+
+
+def league_dir_version(league_path: Path) -> Version:
+    """Versão de uma liga: o diretório (inclusões/remoções) + cada CSV e o liga.json."""
+    entries = sorted(league_path.glob("*.csv"))
+    meta = league_path / "liga.json"
+    if meta.exists():
+        entries.append(meta)
+    return (file_version(league_path),) + files_version(entries)
+
+
+def leagues_root_version(base: Path) -> Version:
+    """Versão do catálogo de ligas: cada pasta de liga e seu liga.json."""
+    if not base.exists():
+        return ()
+    parts = [file_version(base)]
+    for liga in sorted(base.iterdir()):
+        if liga.is_dir():
+            parts.append(file_version(liga))
+            parts.append(file_version(liga / "liga.json"))
+    return tuple(parts)
+
+
+def last_modified(version: Version) -> Optional[int]:
+    """Maior mtime (ns) presente na versão, para o cabeçalho Last-Modified."""
+    mtimes = [p[1] for p in version if isinstance(p, tuple) and len(p) == 3 and p[1]]
+    return max(mtimes) if mtimes else None
+
+
+# ----------------------------------------------------
+# CACHE
+# ----------------------------------------------------
+class CachedBody:
+    __slots__ = ("etag", "body", "media_type", "last_modified_ns", "encoded")
+
+    def __init__(self, etag: str, body: bytes, media_type: str, last_modified_ns: Optional[int]):
+        self.etag = etag
+        self.body = body
+        self.media_type = media_type
+        self.last_modified_ns = last_modified_ns
+        # codificação -> corpo comprimido
+        self.encoded: Dict[str, bytes] = {}
+
+    def effective_encoding(self, encoding: Optional[str]) -> Optional[str]:
+        """Corpos pequenos ou não compressíveis saem sempre sem codificação."""
+        if encoding is None or not is_compressible(self.media_type, len(self.body)):
+            return None
+        return encoding
+
+    def variant(self, encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+        """(codificação efetiva, corpo) para a codificação negociada."""
+        encoding = self.effective_encoding(encoding)
+        if encoding is None:
+            return None, self.body
+        body = self.encoded.get(encoding)
+        if body is None:
+            # corrida benigna: duas threads podem comprimir ao mesmo tempo, o resultado é idêntico
+            body = self.encoded.setdefault(encoding, compress(self.body, encoding))
+            record_cache("compressed_bodies", hit=False)
+        else:
+            record_cache("compressed_bodies", hit=True)
+        return encoding, body
+
+
+class ResponseCache:
+    """LRU de corpos já serializados, indexado pelo ETag."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, entry: CachedBody) -> None:
+        with self._lock:
+            self._entries[entry.etag] = entry
+            self._entries.move_to_end(entry.etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_SIZE)
+
+# Cache frio: requisições simultâneas do mesmo ETag (mesma rota, mesmos parâmetros,
+# mesma versão dos dados) esperam um único build()
+_builds = SingleFlight("responses")
+
+
+def make_etag(key: Tuple[Any, ...], version: Version) -> str:
+    raw = repr((key, version)).encode("utf-8")
+    return '"' + hashlib.sha1(raw).hexdigest()[:20] + '"'
+
+
+def render_json(content: Any) -> bytes:
+    """JSON compacto via json_codec (orjson quando disponível)."""
+    return dumps(content)
+
+
+def _not_modified(request: Request, etag: str, last_modified_ns: Optional[int]) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        candidates = {t.strip() for t in inm.split(",")}
+        if "*" in candidates:
+            return True
+        # qualquer variante (identity, -gz, -br) da mesma versão vale;
+        # compara ignorando o prefixo fraco W/
+        for tag in [etag] + [with_etag_suffix(etag, enc) for enc in ETAG_SUFFIX]:
+            if tag in candidates or f"W/{tag}" in candidates:
+                return True
+        return False
+
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified_ns:
+        try:
+            since = parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified_ns // 1_000_000_000) <= int(since)
+
+    return False
+
+
+def _validator_headers(etag: str, last_modified_ns: Optional[int]) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.RESPONSE_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={settings.RESPONSE_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+        "Vary": "Accept-Encoding",
+    }
+    if last_modified_ns:
+        headers["Last-Modified"] = formatdate(last_modified_ns / 1e9, usegmt=True)
+    return headers
+
+
+def _build_entry(
+    cache: ResponseCache, etag: str, modified_ns: Optional[int], build: Callable[[], Union[bytes, Any]]
+) -> CachedBody:
+    # outro líder pode ter acabado de gravar este ETag
+    entry = cache.get(etag)
+    if entry is not None:
+        return entry
+    content = build()
+    body = content if isinstance(content, bytes) else render_json(content)
+    entry = CachedBody(etag, body, "application/json", modified_ns)
+    cache.put(entry)
+    return entry
+
+
+def cached_json_response(
+    request: Request,
+    key: Tuple[Any, ...],
+    version: Version,
+    build: Callable[[], Union[bytes, Any]],
+    cache: ResponseCache = response_cache,
+) -> Response:
+    """
+    Responde com 304, com o corpo em cache ou chamando `build()`.
+
+    `build` pode devolver o conteúdo (dict/list) ou os bytes JSON já
+    serializados (quando a rota quer medir a serialização por conta própria).
+    O corpo sai comprimido conforme o Accept-Encoding do cliente.
+
+    Em caso de miss, o `build()` passa por single-flight pelo ETag: N pedidos
+    simultâneos do mesmo confronto (liga, mandante, visitante, versão) fazem
+    uma leitura dos CSVs e uma execução do motor, e todos recebem o mesmo corpo.
+    """
+    etag = make_etag(key, version)
+    modified_ns = last_modified(version)
+    encoding = negotiate(request.headers.get("accept-encoding"))
+
+    if _not_modified(request, etag, modified_ns):
+        record_cache("responses", hit=True)
+        entry = cache.get(etag)
+        if entry is not None:
+            encoding = entry.effective_encoding(encoding)
+        return Response(status_code=304, headers=_validator_headers(with_etag_suffix(etag, encoding), modified_ns))
+
+    entry = cache.get(etag)
+    record_cache("responses", hit=entry is not None)
+
+    if entry is None:
+        entry = _builds.do((id(cache), etag), lambda: _build_entry(cache, etag, modified_ns, build))
+
+    encoding, body = entry.variant(encoding)
+    headers = _validator_headers(with_etag_suffix(etag, encoding), modified_ns)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    record_bytes(encoding, len(entry.body), len(body))
+    return Response(content=body, media_type=entry.media_type, headers=headers)
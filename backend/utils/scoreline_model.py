@@ -0,0 +1,431 @@
+"""
+Modelo de placares Poisson / Dixon-Coles por liga.
+
+Cada time tem força de ataque e de defesa; o mandante ganha um fator de
+casa. Gols esperados de um confronto:
+
+    λ (mandante)  = casa * ataque[mandante] * defesa[visitante]
+    μ (visitante) =        ataque[visitante] * defesa[mandante]
+
+O ajuste usa as partidas do ledger (`match_ledger.py`), com peso que decai
+pela idade do jogo (meia-vida SCORELINE_HALF_LIFE_DAYS). As forças saem das
+iterações de ponto fixo da verossimilhança Poisson, vetorizadas com
+np.bincount. Depois vem o ρ de Dixon-Coles, que corrige 0-0, 1-0, 0-1 e 1-1,
+por busca em grade.
+
+O ajuste é incremental. O modelo de cada liga fica em cache pela versão dos
+ledgers (linhas por temporada). Com partidas novas, o reajuste parte das
+forças anteriores e converge em poucas iterações.
+
+Depois do ajuste, a liga inteira é pré-calculada de uma vez: a matriz de
+placares 0..MAX × 0..MAX de cada par (mandante, visitante) e, a partir dela,
+1X2, over/under, BTTS e a distribuição de cada linha asiática (green, meio
+green, push, meio red, red). As linhas de HT e o HT/FT saem da simulação
+Monte Carlo (`match_simulator.py`) de todos os pares, no mesmo passo. Na
+requisição, `fixture()` só indexa arrays.
+"""
+import math
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.team_normalizer import slugify
+from config.settings import settings
+
+from ..backtest.settlement import settle_handicap, settle_over
+from .match_ledger import MatchLedgerStore, get_match_ledger_store
+from .match_simulator import HT_FT_LABELS, MatchSimulator
+from .name_index import name_index
+
+# Linhas pré-calculadas
+AH_LINES = tuple(np.arange(-2.5, 2.5001, 0.25).round(2).tolist())   # handicap do mandante
+TOTAL_LINES = tuple(np.arange(0.5, 4.5001, 0.25).round(2).tolist())
+AH_HT_LINES = tuple(np.arange(-1.5, 1.5001, 0.25).round(2).tolist())
+TOTAL_HT_LINES = tuple(np.arange(0.5, 2.5001, 0.25).round(2).tolist())
+OU_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+OUTCOMES = ("win", "half_win", "push", "half_loss", "loss")
+_OUTCOME_VALUES = (1.0, 0.5, 0.0, -0.5, -1.0)
+
+RHO_GRID = np.linspace(-0.2, 0.2, 81)
+PRIOR_GOALS = 1.0  # pseudo-observação por time: puxa times com poucos jogos para a média
+DEFAULT_HT_SHARE = 0.45  # fração dos gols no 1º tempo quando o ledger não tem placar de HT
+
+
+# ----------------------------------------------------
+# AJUSTE
+# ----------------------------------------------------
+def fit_strengths(
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    home_goals: np.ndarray,
+    away_goals: np.ndarray,
+    weights: np.ndarray,
+    n_teams: int,
+    start: Optional[Tuple[np.ndarray, np.ndarray, float]] = None,
+    tol: float = 1e-6,
+    max_iter: int = 500,
+) -> Tuple[np.ndarray, np.ndarray, float, int]:
+    """
+    Ataque, defesa e fator casa por máxima verossimilhança Poisson
+    ponderada. Devolve (ataque, defesa, casa, iterações).
+    """
+    if start is None:
+        attack, defence, home_adv = np.ones(n_teams), np.ones(n_teams), 1.2
+    else:
+        attack, defence, home_adv = start[0].copy(), start[1].copy(), start[2]
+
+    wh, wa = weights * home_goals, weights * away_goals
+    scored = np.bincount(home_idx, wh, n_teams) + np.bincount(away_idx, wa, n_teams) + PRIOR_GOALS
+    conceded = np.bincount(away_idx, wh, n_teams) + np.bincount(home_idx, wa, n_teams) + PRIOR_GOALS
+    total_home = wh.sum()
+
+    for iteration in range(1, max_iter + 1):
+        prev_attack, prev_defence = attack, defence
+        attack = scored / (
+            np.bincount(home_idx, weights * home_adv * defence[away_idx], n_teams)
+            + np.bincount(away_idx, weights * defence[home_idx], n_teams)
+            + PRIOR_GOALS
+        )
+        defence = conceded / (
+            np.bincount(away_idx, weights * home_adv * attack[home_idx], n_teams)
+            + np.bincount(home_idx, weights * attack[away_idx], n_teams)
+            + PRIOR_GOALS
+        )
+        # identificabilidade: ataque médio = 1
+        scale = attack.mean()
+        attack, defence = attack / scale, defence * scale
+        home_adv = total_home / max((weights * attack[home_idx] * defence[away_idx]).sum(), 1e-12)
+
+        delta = max(np.abs(attack - prev_attack).max(), np.abs(defence - prev_defence).max())
+        if delta < tol:
+            break
+
+    return attack, defence, float(home_adv), iteration
+
+
+def dc_tau(home_goals: np.ndarray, away_goals: np.ndarray, lam: np.ndarray, mu: np.ndarray, rho: float) -> np.ndarray:
+    """Fator de Dixon-Coles (1 fora dos placares 0-0, 1-0, 0-1, 1-1)."""
+    tau = np.ones(np.broadcast(home_goals, away_goals, lam, mu).shape)
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1.0 - lam * mu * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1.0 + lam * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1.0 + mu * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 1), 1.0 - rho, tau)
+    return tau
+
+
+def fit_rho(home_goals: np.ndarray, away_goals: np.ndarray, lam: np.ndarray, mu: np.ndarray, weights: np.ndarray) -> float:
+    """ρ que maximiza a parte de Dixon-Coles da verossimilhança (busca em grade)."""
+    low = (home_goals <= 1) & (away_goals <= 1)
+    if not low.any():
+        return 0.0
+    hg, ag, lam, mu, w = home_goals[low], away_goals[low], lam[low], mu[low], weights[low]
+    tau = dc_tau(hg[None, :], ag[None, :], lam[None, :], mu[None, :], RHO_GRID[:, None])
+    valid = (tau > 0).all(axis=1)
+    loglik = np.where(valid, (w * np.log(np.clip(tau, 1e-12, None))).sum(axis=1), -np.inf)
+    return float(RHO_GRID[int(np.argmax(loglik))])
+
+
+# ----------------------------------------------------
+# GRADES DE PLACAR
+# ----------------------------------------------------
+def poisson_pmf(rate: np.ndarray, max_goals: int) -> np.ndarray:
+    """P(X = 0..max_goals) para cada taxa (última dimensão = gols)."""
+    goals = np.arange(max_goals + 1)
+    log_fact = np.cumsum(np.log(np.maximum(goals, 1)))
+    rate = np.asarray(rate, dtype=float)[..., None]
+    return np.exp(goals * np.log(rate) - rate - log_fact)
+
+
+def score_grids(lam: np.ndarray, mu: np.ndarray, rho: float, max_goals: int) -> np.ndarray:
+    """Matrizes de placar [..., gols mandante, gols visitante], normalizadas para somar 1."""
+    grid = poisson_pmf(lam, max_goals)[..., :, None] * poisson_pmf(mu, max_goals)[..., None, :]
+    goals = np.arange(max_goals + 1)
+    tau = dc_tau(goals[:, None], goals[None, :], np.asarray(lam)[..., None, None], np.asarray(mu)[..., None, None], rho)
+    grid = grid * tau
+    return grid / grid.sum(axis=(-2, -1), keepdims=True)
+
+
+@lru_cache(maxsize=8)
+def line_masks(max_goals: int, ah_lines: Tuple[float, ...], total_lines: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Máscaras [linha, resultado, placar_m, placar_v] de cada linha asiática
+    (handicap do mandante e total). Constantes para uma dada grade: o
+    resultado de um placar numa linha não depende do confronto.
+    """
+    goals = np.arange(max_goals + 1)
+    diff = (goals[:, None] - goals[None, :]).astype(float)
+    total = (goals[:, None] + goals[None, :]).astype(float)
+    values = np.array(_OUTCOME_VALUES)[:, None, None]
+    ah = np.stack([settle_handicap(diff, np.full(diff.shape, line)) for line in ah_lines])
+    over = np.stack([settle_over(total, np.full(total.shape, line)) for line in total_lines])
+    return (ah[:, None] == values).astype(float), (over[:, None] == values).astype(float)
+
+
+def line_distributions(
+    grids: np.ndarray, ah_lines: Tuple[float, ...], total_lines: Tuple[float, ...]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Grades [..., G, G] -> distribuições [..., linha, resultado] do handicap e do total."""
+    ah_masks, over_masks = line_masks(grids.shape[-1] - 1, ah_lines, total_lines)
+    return (
+        np.einsum("...ab,lkab->...lk", grids, ah_masks),
+        np.einsum("...ab,lkab->...lk", grids, over_masks),
+    )
+
+
+def fair_odds(probs: np.ndarray) -> np.ndarray:
+    """
+    Odds justas de uma linha asiática (EV = 0) a partir de
+    [green, meio green, push, meio red, red] na última dimensão.
+    """
+    gain = probs[..., 0] + probs[..., 1] / 2.0
+    loss = probs[..., 4] + probs[..., 3] / 2.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(gain > 0, 1.0 + loss / gain, np.inf)
+
+
+class LeagueModel:
+    """Forças ajustadas + probabilidades pré-calculadas de todos os pares da liga."""
+
+    def __init__(
+        self,
+        league_id: str,
+        teams: List[str],
+        attack: np.ndarray,
+        defence: np.ndarray,
+        home_adv: float,
+        rho: float,
+        version: Tuple[Any, ...],
+        matches: int,
+        iterations: int,
+        max_goals: int,
+        ht_share: float = DEFAULT_HT_SHARE,
+        simulator: Optional[MatchSimulator] = None,
+    ):
+        self.league_id = league_id
+        self.teams = teams
+        self.index = {slugify(name): i for i, name in enumerate(teams)}
+        self.attack = attack
+        self.defence = defence
+        self.home_adv = home_adv
+        self.rho = rho
+        self.version = version
+        self.matches = matches
+        self.iterations = iterations
+        self.max_goals = max_goals
+        self.ht_share = ht_share
+        self.simulations = simulator.n_sims if simulator is not None else 0
+        self._precompute(simulator)
+
+    def _precompute(self, simulator: Optional[MatchSimulator]) -> None:
+        # [mandante, visitante]: gols esperados, grades e mercados de uma vez
+        self.lam = self.home_adv * self.attack[:, None] * self.defence[None, :]
+        self.mu = self.attack[None, :] * self.defence[:, None]
+        self.grids = score_grids(self.lam, self.mu, self.rho, self.max_goals)
+
+        g = self.grids
+        self.one_x_two = np.stack([
+            (g * np.tril(np.ones(g.shape[-2:]), -1)).sum(axis=(-2, -1)),
+            np.trace(g, axis1=-2, axis2=-1),
+            (g * np.triu(np.ones(g.shape[-2:]), 1)).sum(axis=(-2, -1)),
+        ], axis=-1)
+
+        goals = np.arange(self.max_goals + 1)
+        total = goals[:, None] + goals[None, :]
+        self.overs = np.stack([(g * (total > line)).sum(axis=(-2, -1)) for line in OU_LINES], axis=-1)
+        self.btts = g[..., 1:, 1:].sum(axis=(-2, -1))
+
+        # [mandante, visitante, linha, resultado]
+        self.ah, self.totals = line_distributions(g, AH_LINES, TOTAL_LINES)
+        self.ah_odds = fair_odds(self.ah)
+        self.totals_odds = fair_odds(self.totals)
+
+        # HT e HT/FT: Monte Carlo de todos os pares (mesmo jogo sorteado para os dois tempos)
+        self.ah_ht = self.totals_ht = self.ht_ft = None
+        if simulator is not None:
+            n = len(self.teams)
+            simulator.reset()
+            ht_grids, _, ht_ft = simulator.simulate(self.lam.ravel(), self.mu.ravel(), self.ht_share)
+            ht_grids = ht_grids.reshape(n, n, *ht_grids.shape[1:])
+            self.ah_ht, self.totals_ht = line_distributions(ht_grids, AH_HT_LINES, TOTAL_HT_LINES)
+            self.ah_ht_odds = fair_odds(self.ah_ht)
+            self.totals_ht_odds = fair_odds(self.totals_ht)
+            self.ht_ft = ht_ft.reshape(n, n, 9)
+
+    def team_index(self, team: str) -> Optional[int]:
+        i = self.index.get(slugify(team))
+        if i is None:
+            # nome de arquivo, de exibição ou apelido: o mesmo índice de nomes das outras rotas
+            resolved = name_index.names("scoreline", self.league_id, self.version, lambda: self.teams).resolve(team)
+            if resolved is not None:
+                i = self.index.get(slugify(resolved))
+        return i
+
+    def fixture(self, home: str, away: str, top_scores: int = 5) -> Optional[Dict[str, Any]]:
+        """Probabilidades de um confronto (só consulta aos arrays pré-calculados)."""
+        i, j = self.team_index(home), self.team_index(away)
+        if i is None or j is None:
+            return None
+
+        grid = self.grids[i, j]
+        top = np.argsort(grid, axis=None)[::-1][:top_scores]
+        ah = np.round(self.ah[i, j], 4).tolist()
+        totals = np.round(self.totals[i, j], 4).tolist()
+        ah_odds = np.round(self.ah_odds[i, j], 3).tolist()
+        totals_odds = np.round(self.totals_odds[i, j], 3).tolist()
+
+        def _lines(lines, probs, odds) -> List[Dict[str, Any]]:
+            return [
+                {"line": line, **dict(zip(OUTCOMES, p)), "fair_odds": o if math.isfinite(o) else None}
+                for line, p, o in zip(lines, probs, odds)
+            ]
+
+        response = {
+            "expected_goals": {"home": round(float(self.lam[i, j]), 3), "away": round(float(self.mu[i, j]), 3)},
+            "probabilities": {
+                name: round(100.0 * float(p), 1) for name, p in zip(("home_win", "draw", "away_win"), self.one_x_two[i, j])
+            },
+            "over_under": {f"over_{line}": round(100.0 * float(p), 1) for line, p in zip(OU_LINES, self.overs[i, j])},
+            "btts": round(100.0 * float(self.btts[i, j]), 1),
+            "top_scores": [
+                {"score": f"{k // grid.shape[1]}-{k % grid.shape[1]}", "probability": round(100.0 * float(grid.flat[k]), 2)}
+                for k in top.tolist()
+            ],
+            "asian_handicap_home": _lines(AH_LINES, ah, ah_odds),
+            "asian_totals": _lines(TOTAL_LINES, totals, totals_odds),
+            "model": {
+                "matches": self.matches,
+                "home_advantage": round(self.home_adv, 3),
+                "rho": round(self.rho, 3),
+                "attack": {"home": round(float(self.attack[i]), 3), "away": round(float(self.attack[j]), 3)},
+                "defence": {"home": round(float(self.defence[i]), 3), "away": round(float(self.defence[j]), 3)},
+                "ht_share": round(self.ht_share, 3),
+                "simulations": self.simulations,
+            },
+        }
+
+        if self.ht_ft is not None:
+            response["asian_handicap_home_ht"] = _lines(
+                AH_HT_LINES, np.round(self.ah_ht[i, j], 4).tolist(), np.round(self.ah_ht_odds[i, j], 3).tolist()
+            )
+            response["asian_totals_ht"] = _lines(
+                TOTAL_HT_LINES, np.round(self.totals_ht[i, j], 4).tolist(), np.round(self.totals_ht_odds[i, j], 3).tolist()
+            )
+            response["ht_ft"] = {
+                label: round(100.0 * p, 2) for label, p in zip(HT_FT_LABELS, self.ht_ft[i, j].tolist())
+            }
+        return response
+
+
+# ----------------------------------------------------
+# CACHE POR LIGA
+# ----------------------------------------------------
+class ScorelineEngine:
+    def __init__(
+        self,
+        store: Optional[MatchLedgerStore] = None,
+        half_life_days: float = 180.0,
+        max_goals: int = 10,
+        simulations: int = 20000,
+        seed: int = 0,
+    ):
+        self._store = store
+        self.half_life_days = half_life_days
+        self.max_goals = max_goals
+        self.simulator = MatchSimulator(simulations, seed, max_goals) if simulations > 0 else None
+        self._models: Dict[str, LeagueModel] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> MatchLedgerStore:
+        return self._store or get_match_ledger_store()
+
+    def version(self, league_id: str) -> Tuple[Any, ...]:
+        store = self.store
+        seasons = store.seasons(league_id)
+        ledgers = [store.ledger(league_id, season) for season in seasons]
+        for ledger in ledgers:
+            ledger.refresh()
+        return tuple((season, ledger.rows) for season, ledger in zip(seasons, ledgers))
+
+    def model(self, league_id: str) -> Optional[LeagueModel]:
+        """Modelo da liga; reajusta (a partir do anterior) só se os ledgers mudaram."""
+        version = self.version(league_id)
+        current = self._models.get(league_id)
+        if current is not None and current.version == version:
+            return current
+
+        with self._lock:
+            current = self._models.get(league_id)
+            if current is not None and current.version == version:
+                return current
+            model = self._fit(league_id, version, current)
+            if model is not None:
+                self._models[league_id] = model
+            return model
+
+    def _fit(self, league_id: str, version: Tuple[Any, ...], previous: Optional[LeagueModel]) -> Optional[LeagueModel]:
+        frames = [self.store.ledger(league_id, season).frame() for season, _ in version]
+        if not frames:
+            return None
+        matches = pd.concat(frames, ignore_index=True)
+        # jogos sem placar (adiados, ainda não jogados) deixariam todas as forças NaN
+        matches = matches.dropna(subset=["home_goals", "away_goals"])
+        if matches.empty:
+            return None
+
+        teams = sorted(set(matches["home_team"]) | set(matches["away_team"]))
+        codes = {name: i for i, name in enumerate(teams)}
+        home_idx = matches["home_team"].map(codes).to_numpy()
+        away_idx = matches["away_team"].map(codes).to_numpy()
+        home_goals = matches["home_goals"].to_numpy(float)
+        away_goals = matches["away_goals"].to_numpy(float)
+
+        age_days = (matches["ts"].max() - matches["ts"].to_numpy()) / 86400.0
+        weights = 0.5 ** (age_days / self.half_life_days)
+
+        start = None
+        if previous is not None:
+            # partida a quente: forças anteriores (times novos começam em 1)
+            attack, defence = np.ones(len(teams)), np.ones(len(teams))
+            for name, i in codes.items():
+                j = previous.index.get(slugify(name))
+                if j is not None:
+                    attack[i], defence[i] = previous.attack[j], previous.defence[j]
+            start = (attack, defence, previous.home_adv)
+
+        attack, defence, home_adv, iterations = fit_strengths(
+            home_idx, away_idx, home_goals, away_goals, weights, len(teams), start
+        )
+        lam = home_adv * attack[home_idx] * defence[away_idx]
+        mu = attack[away_idx] * defence[home_idx]
+        rho = fit_rho(home_goals, away_goals, lam, mu, weights)
+
+        # fração dos gols no 1º tempo, das partidas com placar de HT
+        ht_goals = (matches["home_goals_ht"] + matches["away_goals_ht"]).to_numpy(float)
+        known = ~np.isnan(ht_goals)
+        ft_known = (home_goals + away_goals)[known].sum()
+        ht_share = float(ht_goals[known].sum() / ft_known) if ft_known > 0 else DEFAULT_HT_SHARE
+
+        print(f"Modelo de placares {league_id}: {len(matches)} partidas, {iterations} iterações")
+        return LeagueModel(
+            league_id, teams, attack, defence, home_adv, rho, version, len(matches), iterations, self.max_goals,
+            ht_share, self.simulator,
+        )
+
+    def fixture(self, league_id: str, home: str, away: str) -> Optional[Dict[str, Any]]:
+        model = self.model(league_id)
+        return model.fixture(home, away) if model is not None else None
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+scoreline_engine = ScorelineEngine(
+    half_life_days=settings.SCORELINE_HALF_LIFE_DAYS,
+    max_goals=settings.SCORELINE_MAX_GOALS,
+    simulations=settings.SIM_MATCHES,
+    seed=settings.SIM_SEED,
+)
@@ -0,0 +1,213 @@
+"""
+Estatísticas compiladas das ligas compartilhadas entre workers (mmap).
+
+Com `uvicorn --workers N` cada worker teria sua cópia dos CSVs parseados e
+dos caches. Neste modo um processo carregador compila cada liga uma vez:
+
+    python -m backend.utils.shared_stats publish --watch 30
+
+A compilação é a `H2HMatrix` da liga (todos os pares ordenados, registro
+binário de RECORD_SIZE bytes por par). Ela é gravada em SHARED_STATS_DIR
+(por padrão em /dev/shm, ou seja, memória) num arquivo por versão:
+
+    <liga>.<versão>.h2h   cabeçalho | nomes dos times | matriz
+    <liga>.current        manifesto: "<versão> <arquivo>"
+
+A versão é um contador por liga. O arquivo novo é escrito inteiro antes do
+manifesto ser trocado (os.replace, atômico), então o leitor nunca vê um
+arquivo pela metade.
+
+Os workers (SHARED_STATS_ENABLED=1) mapeiam o arquivo só para leitura. As
+páginas são as mesmas para todos os processos, então a memória não cresce
+com o nº de workers. A cada consulta o worker faz um stat do manifesto
+(inode + mtime); se mudou, mapeia a versão nova e troca a referência de uma
+vez. Todos os workers passam a responder com a versão nova assim que o manifesto
+é trocado. Requisições em andamento terminam com o mapeamento antigo, que o
+GC libera depois.
+"""
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+from .h2h_model import RECORD_SIZE, H2HMatrix
+from .response_cache import league_dir_version
+from .team_data import team_data
+
+MAGIC = b"SLS1"
+# magic, versão, nº de times, bytes dos nomes
+HEADER = struct.Struct("<4sQII")
+SUFFIX = ".h2h"
+MANIFEST_SUFFIX = ".current"
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+# ----------------------------------------------------
+# PUBLICAÇÃO (processo carregador)
+# ----------------------------------------------------
+def encode_league(matrix: H2HMatrix, version: int) -> bytes:
+    names = "\n".join(matrix.teams).encode("utf-8")
+    header = HEADER.pack(MAGIC, version, len(matrix.teams), len(names))
+    padding = b"\0" * (_align(HEADER.size + len(names)) - HEADER.size - len(names))
+    return header + names + padding + matrix.to_bytes()
+
+
+class SharedStatsPublisher:
+    def __init__(self, root: Path, leagues_dir: Path):
+        self.root = Path(root)
+        self.leagues_dir = Path(leagues_dir)
+        self._published: Dict[str, Tuple] = {}
+
+    def manifest(self, league_id: str) -> Path:
+        return self.root / f"{league_id}{MANIFEST_SUFFIX}"
+
+    def current_version(self, league_id: str) -> int:
+        try:
+            return int(self.manifest(league_id).read_text().split()[0])
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def publish(self, league_id: str) -> Optional[int]:
+        """Compila a liga e publica uma versão nova. Devolve a versão (None se a liga não tem times)."""
+        features = {}
+        for slug in team_data.team_slugs(self.leagues_dir, league_id):
+            data = team_data.load(team_data.team_csv(self.leagues_dir, league_id, slug))
+            if data is not None:
+                features[slug] = data.features
+        if len(features) < 2:
+            return None
+
+        matrix = H2HMatrix.build(league_id, features)
+        version = self.current_version(league_id) + 1
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        path = self.root / f"{league_id}.{version}{SUFFIX}"
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(encode_league(matrix, version))
+        os.replace(tmp, path)
+
+        manifest = self.manifest(league_id)
+        manifest_tmp = manifest.with_name(manifest.name + ".tmp")
+        manifest_tmp.write_text(f"{version} {path.name}\n")
+        os.replace(manifest_tmp, manifest)
+
+        self._cleanup(league_id, keep={path.name, f"{league_id}.{version - 1}{SUFFIX}"})
+        print(f"Stats compartilhadas {league_id}: versão {version}, {len(matrix.teams)} times, {matrix.nbytes} bytes")
+        return version
+
+    def _cleanup(self, league_id: str, keep) -> None:
+        # versões antigas: quem ainda as mapeia continua lendo (o unlink não invalida o mmap)
+        for old in self.root.glob(f"{league_id}.*{SUFFIX}"):
+            if old.name not in keep:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+
+    def publish_changed(self) -> Dict[str, int]:
+        """Publica só as ligas cujos CSVs mudaram desde a última publicação deste processo."""
+        published: Dict[str, int] = {}
+        for league_id in team_data.leagues(self.leagues_dir):
+            data_version = league_dir_version(self.leagues_dir / league_id)
+            if self._published.get(league_id) == data_version:
+                continue
+            version = self.publish(league_id)
+            self._published[league_id] = data_version
+            if version is not None:
+                published[league_id] = version
+        return published
+
+
+# ----------------------------------------------------
+# LEITURA (workers)
+# ----------------------------------------------------
+class SharedLeague:
+    """Uma versão publicada de uma liga, mapeada só para leitura."""
+
+    __slots__ = ("league_id", "version", "matrix", "_mmap")
+
+    def __init__(self, league_id: str, path: Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_teams, names_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: arquivo de stats inválido")
+
+        names = self._mmap[HEADER.size:HEADER.size + names_len].decode("utf-8")
+        teams: List[str] = names.split("\n") if names else []
+        start = _align(HEADER.size + names_len)
+        buffer = memoryview(self._mmap)[start:start + n_teams * n_teams * RECORD_SIZE]
+
+        self.league_id = league_id
+        self.version = version
+        self.matrix = H2HMatrix(league_id, teams, buffer)
+
+
+class SharedStatsReader:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._leagues: Dict[str, Tuple[Tuple[int, int], SharedLeague]] = {}
+        self._lock = threading.Lock()
+
+    def league(self, league_id: str) -> Optional[SharedLeague]:
+        """Versão corrente da liga (None se nada publicado); remapeia só quando o manifesto muda."""
+        manifest = self.root / f"{league_id}{MANIFEST_SUFFIX}"
+        try:
+            st = manifest.stat()
+        except OSError:
+            return None
+        stamp = (st.st_ino, st.st_mtime_ns)
+
+        cached = self._leagues.get(league_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        with self._lock:
+            cached = self._leagues.get(league_id)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            try:
+                _, filename = manifest.read_text().split()
+                league = SharedLeague(league_id, self.root / filename)
+            except (OSError, ValueError) as exc:
+                print(f"Falha ao mapear stats compartilhadas de {league_id}: {exc}")
+                return cached[1] if cached is not None else None
+            # troca atômica: quem já tem a versão anterior termina com ela
+            self._leagues[league_id] = (stamp, league)
+            return league
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+shared_stats = SharedStatsReader(settings.SHARED_STATS_DIR)
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Publica as stats compiladas das ligas para os workers.")
+    sub = p.add_subparsers(dest="command", required=True)
+    pub = sub.add_parser("publish", help="compila e publica as ligas que mudaram")
+    pub.add_argument("leagues_dir", type=Path, nargs="?", default=settings.LEAGUES_DIR)
+    pub.add_argument("--watch", type=float, default=None, help="repete a cada N segundos")
+    args = p.parse_args(argv)
+
+    publisher = SharedStatsPublisher(settings.SHARED_STATS_DIR, args.leagues_dir)
+    while True:
+        publisher.publish_changed()
+        if args.watch is None:
+            return
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
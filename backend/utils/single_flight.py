@@ -0,0 +1,62 @@
+"""
+Single-flight: chamadas simultâneas com a mesma chave viram uma só.
+
+Perto do início de um jogo muitos clientes pedem o mesmo confronto ao mesmo
+tempo. Com o cache frio (ou recém-invalidado por um CSV novo) cada
+requisição leria os dois CSVs e rodaria o motor por conta própria.
+`SingleFlight.do(key, fn)` deixa só a primeira chamada (a "líder") executar
+`fn`; as demais com a mesma chave esperam e recebem o mesmo resultado (ou a
+mesma exceção).
+
+É para rotas síncronas (threads do threadpool do Starlette). Para corrotinas,
+ver `async_io.run_io`.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .metrics import counter
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        counter("singleflight_calls_total", "Chamadas ao single-flight por papel (líder executa, seguidor espera).").inc(
+            flight=self.name, role="leader" if leader else "follower"
+        )
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # sai do mapa antes de liberar: quem chegar depois já encontra o resultado no cache
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
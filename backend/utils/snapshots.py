@@ -0,0 +1,331 @@
+"""
+Snapshots históricos das estatísticas dos times ("como estava em...").
+
+Cada execução do updater grava uma versão imutável de cada time atualizado
+em um SQLite local (SNAPSHOTS_PATH). As versões são colunares e
+codificadas por delta:
+
+- keyframe: todas as colunas
+- delta:    só as colunas que mudaram desde a versão anterior
+
+A cada SNAPSHOT_KEYFRAME_EVERY versões grava-se um keyframe novo, então
+reconstruir qualquer versão custa uma busca indexada
+(league_id, team_id, ts) + no máximo KEYFRAME_EVERY-1 deltas. As versões
+reconstruídas ficam em um LRU: backtests que repetem milhares de consultas
+"as_of" leem da memória.
+
+Uso:
+    store = get_snapshot_store()
+    run_id = store.begin_run("laliga")
+    store.record("laliga", "barcelona", df, run_id=run_id)
+    snap = store.load("laliga", "barcelona", as_of=datetime(2025, 3, 1))
+
+Captura inicial da árvore atual de CSVs:
+    python -m backend.utils.snapshots capture data/leagues
+"""
+import argparse
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, time as dtime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from app.utils.sqlite_store import SQLiteDatabase
+from config.settings import settings
+
+SNAPSHOTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    league_id  TEXT NOT NULL,
+    started_ts INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS versions (
+    league_id   TEXT NOT NULL,
+    team_id     TEXT NOT NULL,
+    ts          INTEGER NOT NULL,   -- microssegundos desde a época (UTC)
+    run_id      INTEGER,
+    keyframe_ts INTEGER NOT NULL,   -- ts do keyframe em que esta versão se apoia
+    seq         INTEGER NOT NULL,   -- 0 = keyframe, n = n-ésimo delta após ele
+    payload     BLOB NOT NULL,      -- JSON comprimido (zlib)
+    PRIMARY KEY (league_id, team_id, ts)
+) WITHOUT ROWID;
+"""
+
+# Colunas de um time: nome -> valores (uma entrada por linha do CSV)
+Columns = Dict[str, List[Any]]
+AsOf = Union[None, int, datetime, str]
+
+
+class Snapshot:
+    __slots__ = ("league_id", "team_id", "ts", "run_id", "columns", "_frame")
+
+    def __init__(self, league_id: str, team_id: str, ts: int, run_id: Optional[int], columns: Columns):
+        self.league_id = league_id
+        self.team_id = team_id
+        self.ts = ts
+        self.run_id = run_id
+        self.columns = columns
+        self._frame: Optional[pd.DataFrame] = None
+
+    @property
+    def taken_at(self) -> datetime:
+        return datetime.fromtimestamp(self.ts / 1e6, tz=timezone.utc)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame da versão (montado uma vez; cada chamada recebe uma cópia)."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns)
+        return self._frame.copy()
+
+
+# ----------------------------------------------------
+# CODIFICAÇÃO
+# ----------------------------------------------------
+def frame_to_columns(df: pd.DataFrame) -> Columns:
+    """Colunas com valores nativos do Python; NaN vira None (comparável e JSON válido)."""
+    columns: Columns = {}
+    for col in df.columns:
+        series = df[col]
+        values = series.tolist()
+        if series.isna().any():
+            values = [None if pd.isna(v) else v for v in values]
+        columns[str(col)] = values
+    return columns
+
+
+def _encode(obj: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(obj, separators=(",", ":"), allow_nan=False, default=str).encode("utf-8"), 6)
+
+
+def _decode(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+def encode_keyframe(columns: Columns) -> bytes:
+    return _encode({"c": list(columns), "v": list(columns.values())})
+
+
+def encode_delta(previous: Columns, columns: Columns) -> bytes:
+    changed = {col: values for col, values in columns.items() if previous.get(col) != values}
+    return _encode({"c": list(columns), "d": changed})
+
+
+def apply_payload(previous: Optional[Columns], payload: bytes) -> Columns:
+    data = _decode(payload)
+    if "v" in data:
+        return dict(zip(data["c"], data["v"]))
+    changed = data["d"]
+    return {col: changed[col] if col in changed else previous[col] for col in data["c"]}
+
+
+def to_ts(value: AsOf) -> int:
+    """
+    datetime / ISO 8601 / microssegundos -> microssegundos UTC.
+    Uma data sem hora ("2025-03-01") vale até o fim daquele dia.
+    """
+    if value is None:
+        return int(datetime.now(timezone.utc).timestamp() * 1e6)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        text = value.strip().replace("Z", "+00:00")
+        dt = datetime.fromisoformat(text)
+        if len(text) == 10:
+            dt = datetime.combine(dt.date(), dtime.max)
+        value = dt
+    if value.tzinfo is None:
+        # o updater grava last_update_utc sem fuso: tratamos tudo como UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1e6)
+
+
+# ----------------------------------------------------
+# STORE
+# ----------------------------------------------------
+class SnapshotStore(SQLiteDatabase):
+    SCHEMA = SNAPSHOTS_SCHEMA
+
+    def __init__(self, path: Path, keyframe_every: int = 16, cache_size: int = 1024):
+        super().__init__(path)
+        self.keyframe_every = max(1, keyframe_every)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str, int], Snapshot]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    # ---------- cache ----------
+    def _cached(self, key: Tuple[str, str, int]) -> Optional[Snapshot]:
+        with self._cache_lock:
+            snap = self._cache.get(key)
+            if snap is not None:
+                self._cache.move_to_end(key)
+            return snap
+
+    def _remember(self, snap: Snapshot) -> None:
+        with self._cache_lock:
+            self._cache[(snap.league_id, snap.team_id, snap.ts)] = snap
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ---------- escrita ----------
+    def begin_run(self, league_id: str, started: AsOf = None) -> int:
+        with self.transaction() as conn:
+            cur = conn.execute("INSERT INTO runs (league_id, started_ts) VALUES (?, ?)", (league_id, to_ts(started)))
+            return int(cur.lastrowid)
+
+    def record(
+        self,
+        league_id: str,
+        team_id: str,
+        df: pd.DataFrame,
+        taken_at: AsOf = None,
+        run_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Grava uma versão do time. Devolve o ts gravado, ou None quando nada
+        mudou desde a última versão (não duplica).
+        """
+        columns = frame_to_columns(df)
+        ts = to_ts(taken_at)
+
+        with self.transaction() as conn:
+            last = conn.execute(
+                "SELECT ts, keyframe_ts, seq FROM versions WHERE league_id = ? AND team_id = ? "
+                "ORDER BY ts DESC LIMIT 1",
+                (league_id, team_id),
+            ).fetchone()
+
+            previous = self._load_exact(conn, league_id, team_id, last[0], last[1]) if last else None
+            if previous is not None and previous.columns == columns:
+                return None
+
+            if last is not None and ts <= last[0]:
+                # versões são imutáveis e ordenadas: nunca reescreve um ts
+                ts = last[0] + 1
+
+            if previous is None or last[2] + 1 >= self.keyframe_every:
+                keyframe_ts, seq, payload = ts, 0, encode_keyframe(columns)
+            else:
+                keyframe_ts, seq, payload = last[1], last[2] + 1, encode_delta(previous.columns, columns)
+
+            conn.execute(
+                "INSERT INTO versions (league_id, team_id, ts, run_id, keyframe_ts, seq, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (league_id, team_id, ts, run_id, keyframe_ts, seq, payload),
+            )
+
+        self._remember(Snapshot(league_id, team_id, ts, run_id, columns))
+        return ts
+
+    # ---------- leitura ----------
+    def _load_exact(self, conn, league_id: str, team_id: str, ts: int, keyframe_ts: int) -> Snapshot:
+        key = (league_id, team_id, ts)
+        snap = self._cached(key)
+        if snap is not None:
+            return snap
+
+        columns: Optional[Columns] = None
+        run_id = None
+        for _, run_id, payload in conn.execute(
+            "SELECT ts, run_id, payload FROM versions "
+            "WHERE league_id = ? AND team_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (league_id, team_id, keyframe_ts, ts),
+        ):
+            columns = apply_payload(columns, payload)
+
+        snap = Snapshot(league_id, team_id, ts, run_id, columns or {})
+        self._remember(snap)
+        return snap
+
+    def load(self, league_id: str, team_id: str, as_of: AsOf = None) -> Optional[Snapshot]:
+        """Versão mais recente com ts <= as_of (None = a última)."""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT ts, keyframe_ts FROM versions WHERE league_id = ? AND team_id = ? AND ts <= ? "
+            "ORDER BY ts DESC LIMIT 1",
+            (league_id, team_id, to_ts(as_of)),
+        ).fetchone()
+        if row is None:
+            return None
+        return self._load_exact(conn, league_id, team_id, row[0], row[1])
+
+    def load_frame(self, league_id: str, team_id: str, as_of: AsOf = None) -> Optional[pd.DataFrame]:
+        snap = self.load(league_id, team_id, as_of)
+        return snap.to_frame() if snap is not None else None
+
+    def team_ids(self, league_id: str) -> List[str]:
+        """Times com alguma versão gravada na liga (inclusive os que não têm mais CSV)."""
+        rows = self._connection().execute(
+            "SELECT DISTINCT team_id FROM versions WHERE league_id = ? ORDER BY team_id", (league_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def versions(self, league_id: str, team_id: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT ts, run_id, seq, length(payload) FROM versions WHERE league_id = ? AND team_id = ? ORDER BY ts",
+            (league_id, team_id),
+        ).fetchall()
+        return [
+            {
+                "taken_at": datetime.fromtimestamp(ts / 1e6, tz=timezone.utc).isoformat(),
+                "ts": ts,
+                "run_id": run_id,
+                "kind": "keyframe" if seq == 0 else "delta",
+                "bytes": size,
+            }
+            for ts, run_id, seq, size in rows
+        ]
+
+    # ---------- captura da árvore de CSVs ----------
+    def capture_tree(self, leagues_dir: Path) -> Dict[str, int]:
+        """Grava a versão atual de cada CSV (um run por liga). Devolve versões novas por liga."""
+        counts: Dict[str, int] = {}
+        if not leagues_dir.exists():
+            return counts
+        for league_dir in sorted(p for p in leagues_dir.iterdir() if p.is_dir()):
+            run_id = self.begin_run(league_dir.name)
+            counts[league_dir.name] = 0
+            for csv_file in sorted(league_dir.glob("*.csv")):
+                try:
+                    df = pd.read_csv(csv_file, sep=";|,", engine="python")
+                except Exception as e:
+                    print(f"Snapshot ignorado ({csv_file}): {e}")
+                    continue
+                if self.record(league_dir.name, csv_file.stem, df, run_id=run_id) is not None:
+                    counts[league_dir.name] += 1
+        return counts
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore(settings.SNAPSHOTS_PATH, settings.SNAPSHOT_KEYFRAME_EVERY)
+    return _store
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(description="Snapshots históricos dos CSVs dos times.")
+    p.add_argument("command", choices=["capture"])
+    p.add_argument("leagues_dir", type=Path, nargs="?", default=settings.LEAGUES_DIR)
+    args = p.parse_args(argv)
+
+    counts = get_snapshot_store().capture_tree(args.leagues_dir)
+    for league_id, n in counts.items():
+        print(f"{league_id}: {n} versões novas")
+
+
+if __name__ == "__main__":
+    main()
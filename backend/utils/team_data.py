@@ -0,0 +1,121 @@
+"""
+Camada única de acesso aos CSVs dos times, compartilhada pelos dois apps.
+
+Antes cada rota lia os mesmos arquivos do seu jeito: o `main.py` da raiz com
+csv.DictReader (linhas cruas), o `/api/h2h` com pandas e o `app/` com o
+file_manager. Agora todos passam por `team_data`:
+
+- um arquivo é lido do disco só quando muda (versão = mtime/tamanho, a
+  mesma do ETag em response_cache.py);
+- o parse é preguiçoso e fica em cache junto com os bytes: `frame` (pandas,
+  `;` ou `,`), `rows` (dicts de strings, formato Base44) e `features`
+  (`TeamFeatures`, a entrada do motor H2H);
+- o cache é por caminho e limitado (LRU de TEAM_DATA_CACHE_SIZE arquivos).
+
+Quem recebe o `frame` não deve alterá-lo (é o mesmo objeto para todas as
+requisições); o file_manager devolve cópias para o código legado.
+"""
+import csv
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import settings
+
+from .h2h_model import TeamFeatures
+from .metrics import record_cache
+from .response_cache import file_version
+
+
+class TeamData:
+    """Um CSV de time: bytes + parses sob demanda."""
+
+    __slots__ = ("path", "version", "raw", "_frame", "_rows", "_features")
+
+    def __init__(self, path: Path, version: Tuple[str, int, int], raw: bytes):
+        self.path = path
+        self.version = version
+        self.raw = raw
+        self._frame: Optional[pd.DataFrame] = None
+        self._rows: Optional[List[Dict[str, str]]] = None
+        self._features: Optional[TeamFeatures] = None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            # Suporte para ; ou ,
+            self._frame = pd.read_csv(io.BytesIO(self.raw), sep=";|,", engine="python")
+        return self._frame
+
+    @property
+    def rows(self) -> List[Dict[str, str]]:
+        if self._rows is None:
+            self._rows = list(csv.DictReader(io.StringIO(self.raw.decode("utf-8")), delimiter=";"))
+        return self._rows
+
+    @property
+    def features(self) -> TeamFeatures:
+        if self._features is None:
+            self._features = TeamFeatures.from_frame(self.frame)
+        return self._features
+
+
+class TeamDataStore:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Path, TeamData]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: Path) -> Optional[TeamData]:
+        """Dados do CSV em `path` (None se não existir); relê só se mudou."""
+        path = Path(path)
+        version = file_version(path)
+        if version[2] < 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(path)
+                record_cache("team_data", hit=True)
+                return entry
+
+        record_cache("team_data", hit=False)
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        entry = TeamData(path, version, raw)
+
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    # ---------- catálogo ----------
+    @staticmethod
+    def leagues(base: Path) -> List[str]:
+        base = Path(base)
+        if not base.exists():
+            return []
+        return sorted(p.name for p in base.iterdir() if p.is_dir())
+
+    @staticmethod
+    def team_slugs(base: Path, league_id: str) -> List[str]:
+        return sorted(p.stem for p in (Path(base) / league_id).glob("*.csv"))
+
+    @staticmethod
+    def team_csv(base: Path, league_id: str, team_slug: str) -> Path:
+        return Path(base) / league_id / f"{team_slug}.csv"
+
+
+# ----------------------------------------------------
+# INSTÂNCIA GLOBAL
+# ----------------------------------------------------
+team_data = TeamDataStore(settings.TEAM_DATA_CACHE_SIZE)
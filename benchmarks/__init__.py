@@ -0,0 +1 @@
+# Benchmarks de desempenho do backend (dados sintéticos, execução local).
@@ -0,0 +1,164 @@
+"""
+Benchmark da API de leitura (backend/main.py) com cliente ASGI em processo.
+
+Cobre:
+    GET /api/leagues
+    GET /api/league/{league_id}/teams
+    GET /api/h2h?league=...&home=...&away=...
+    GET /api/logos/{team_id}
+
+Uso:
+    python -m benchmarks.api_bench --leagues 4 --teams 20 --requests 500 \
+        --concurrency 16 --output bench_api.json
+
+O resultado é um JSON com vazão (req/s) e latências p50/p90/p99 (ms) por rota,
+para comparar execuções antes/depois de mudanças de cache e armazenamento.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlencode
+
+from .report import emit, percentile, run_meta
+from .synthetic import generate_leagues
+
+
+def point_backend_at(root: Path) -> None:
+    """Aponta os routers do backend para a árvore sintética em `root`."""
+    from backend.routers import h2h, leagues, teams, upload
+    from backend.updater import update_engine
+    from backend.utils import logo_cache
+
+    leagues_dir = Path(root) / "leagues"
+    leagues.BASE = leagues_dir
+    teams.BASE = leagues_dir
+    h2h.BASE = leagues_dir
+    upload.BASE = leagues_dir
+    update_engine.DATA_BASE = leagues_dir
+    logo_cache.LOGOS_DIR = Path(root) / "team_logos"
+
+
+def summarize(latencies_ns: List[int], errors: int, wall_s: float, wire_bytes: int = 0) -> Dict[str, Any]:
+    ms = sorted(v / 1e6 for v in latencies_ns)
+    count = len(ms)
+    return {
+        "requests": count,
+        "errors": errors,
+        "wall_s": round(wall_s, 4),
+        "throughput_rps": round(count / wall_s, 2) if wall_s > 0 else 0.0,
+        "mean_ms": round(sum(ms) / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p90_ms": round(percentile(ms, 90), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "max_ms": round(ms[-1], 4) if ms else 0.0,
+        "wire_bytes_mean": round(wire_bytes / count, 1) if count else 0.0,
+    }
+
+
+async def run_scenario(client, make_url: Callable[[int], str], requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    for i in range(warmup):
+        await client.get(make_url(i))
+
+    latencies: List[int] = []
+    errors = 0
+    wire_bytes = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        nonlocal errors, wire_bytes
+        async with sem:
+            t0 = time.perf_counter_ns()
+            r = await client.get(make_url(i))
+            await r.aread()
+            latencies.append(time.perf_counter_ns() - t0)
+            wire_bytes += r.num_bytes_downloaded
+            if r.status_code >= 400:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(latencies, errors, time.perf_counter() - t0, wire_bytes)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover
+        sys.exit("httpx é necessário para o benchmark: pip install httpx")
+
+    with tempfile.TemporaryDirectory(prefix="h2h-bench-") as tmp:
+        catalog = generate_leagues(Path(tmp), leagues=args.leagues, teams=args.teams, seed=args.seed, dialect=args.dialect)
+        point_backend_at(Path(tmp))
+
+        from backend.main import app
+
+        rng = random.Random(args.seed)
+        league_ids = sorted(catalog)
+        pairs = []
+        for _ in range(args.requests):
+            league = rng.choice(league_ids)
+            home, away = rng.sample(catalog[league], 2)
+            pairs.append((league, home["name"], away["name"]))
+        team_ids = [t["team_id"] for entries in catalog.values() for t in entries]
+
+        scenarios: Dict[str, Callable[[int], str]] = {
+            "leagues": lambda i: "/api/leagues",
+            "league_teams": lambda i: f"/api/league/{league_ids[i % len(league_ids)]}/teams",
+            "h2h": lambda i: "/api/h2h?" + urlencode(dict(zip(("league", "home", "away"), pairs[i % len(pairs)]))),
+            "logos": lambda i: f"/api/logos/{team_ids[i % len(team_ids)]}",
+        }
+        selected = args.only or list(scenarios)
+
+        transport = httpx.ASGITransport(app=app)
+        results: Dict[str, Any] = {}
+        headers = {"accept-encoding": args.accept_encoding}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for name in selected:
+                results[name] = await run_scenario(client, scenarios[name], args.requests, args.concurrency, args.warmup)
+
+    return {
+        "meta": run_meta(
+            {
+                "leagues": args.leagues,
+                "teams": args.teams,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "warmup": args.warmup,
+                "dialect": args.dialect or "mixed",
+                "accept_encoding": args.accept_encoding,
+                "seed": args.seed,
+            }
+        ),
+        "results": results,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark da API de leitura (ASGI em processo).")
+    p.add_argument("--leagues", type=int, default=2)
+    p.add_argument("--teams", type=int, default=20)
+    p.add_argument("--requests", type=int, default=300, help="requisições medidas por rota")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--warmup", type=int, default=20)
+    p.add_argument("--dialect", choices=["aggregated", "season"], default=None, help="padrão: alterna por liga")
+    p.add_argument("--seed", type=int, default=44)
+    p.add_argument(
+        "--accept-encoding", default="identity", help='ex.: "gzip" ou "br" para medir respostas comprimidas'
+    )
+    p.add_argument("--only", nargs="*", choices=["leagues", "league_teams", "h2h", "logos"])
+    p.add_argument("--output", type=Path, default=None, help="arquivo JSON de saída (padrão: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    emit(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
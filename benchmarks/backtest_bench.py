@@ -0,0 +1,75 @@
+"""
+Vazão do backtest (`backend/backtest/engine.py`) sobre ledgers sintéticos.
+
+Gera ligas × temporadas em um diretório temporário e mede partidas/s e
+apostas/s com 1 processo e com `--workers` processos.
+
+Uso:
+    python -m benchmarks.backtest_bench --leagues 8 --seasons 5 --workers 4 --output bench_backtest.json
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from backend.backtest.engine import run_backtest
+from backend.backtest.ledger import discover_ledgers
+
+from .report import emit, run_meta
+from .synthetic import generate_ledgers
+
+
+def bench_backtest(ledgers_dir: Path, matches: int, workers: int) -> Dict[str, Any]:
+    jobs = discover_ledgers(ledgers_dir)
+    start = time.perf_counter()
+    bets = run_backtest(jobs, workers=workers)
+    elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "ledgers": len(jobs),
+        "matches": matches,
+        "bets": int(len(bets)),
+        "seconds": round(elapsed, 3),
+        "matches_per_s": round(matches / elapsed, 1),
+        "bets_per_s": round(len(bets) / elapsed, 1),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Vazão do backtest de mercados H2H.")
+    p.add_argument("--leagues", type=int, default=4)
+    p.add_argument("--seasons", type=int, default=5)
+    p.add_argument("--teams", type=int, default=20)
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--seed", type=int, default=44)
+    p.add_argument("--output", type=Path, default=None, help="arquivo JSON de saída (padrão: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="bench_backtest_") as tmp:
+        matches = generate_ledgers(Path(tmp), args.leagues, args.seasons, args.teams, args.seed)
+        ledgers_dir = Path(tmp) / "ledgers"
+        results = [bench_backtest(ledgers_dir, matches, 1)]
+        if args.workers > 1:
+            results.append(bench_backtest(ledgers_dir, matches, args.workers))
+
+    report = {
+        "meta": run_meta(
+            {
+                "leagues": args.leagues,
+                "seasons": args.seasons,
+                "teams": args.teams,
+                "workers": args.workers,
+                "seed": args.seed,
+            }
+        ),
+        "results": results,
+    }
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Micro-benchmarks do motor H2H.
+
+Funções medidas:
+    backend.utils.h2h_engine._safe_mean
+    backend.utils.h2h_engine.analyze_h2h
+    backend.utils.h2h_engine.analyze_asian_markets
+    app.services.h2h_analyzer.H2HAnalyzer.analyze_h2h   (com e sem leitura de CSV)
+
+Para cada função: DataFrames com número de linhas variável e layouts de colunas
+diferentes (nome principal, aliases, só o último alias, nenhuma coluna conhecida).
+Reporta ns por chamada (min/p50/mean) e alocações por chamada (pico e bytes
+retidos, via tracemalloc).
+
+O cenário "league_sweep" roda todos os pares ordenados de uma liga sintética,
+que é o custo de uma matriz pré-calculada da liga inteira. "league_matrix" faz o
+mesmo com `H2HMatrix` (features uma vez por time, registro binário por par) e
+compara a memória da matriz com a das respostas em dicts.
+
+Uso:
+    python -m benchmarks.engine_bench --rows 1 10 100 1000 --output bench_engine.json
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .report import emit, percentile, run_meta
+from .synthetic import generate_leagues
+
+# Colunas lidas pelo motor, por layout.
+# "primary"  -> primeiro nome de cada lista de aliases (achado na 1ª tentativa)
+# "alias"    -> segundo nome
+# "last"     -> último alias de cada lista (pior caso de busca com sucesso)
+# "missing"  -> nenhuma coluna conhecida (todas as médias caem no default)
+LAYOUTS: Dict[str, Dict[str, str]] = {
+    "primary": {
+        "win": "win_rate", "rpg": "rpg", "over15": "over15", "over25": "over25",
+        "btts": "btts_yes", "over05_ht": "over_0_5_ht",
+    },
+    "alias": {
+        "win": "home_win_rate", "rpg": "power_index", "over15": "over_1_5_ft", "over25": "over_2_5_ft",
+        "btts": "btts", "over05_ht": "ht_over_0_5",
+    },
+    "last": {
+        "win": "home_win_rate", "rpg": "rating", "over15": "ft_over_1_5", "over25": "ft_over_2_5",
+        "btts": "btts", "over05_ht": "over05ht",
+    },
+    "missing": {},
+}
+
+
+def make_frame(rows: int, layout: str, seed: int) -> pd.DataFrame:
+    """DataFrame com `rows` linhas, colunas do `layout` + gf/ga e algumas colunas extras."""
+    rng = np.random.default_rng(seed)
+    cols = LAYOUTS[layout]
+    data: Dict[str, Any] = {
+        "team_name": ["Bench FC"] * rows,
+        "gf": rng.integers(0, 5, rows),
+        "ga": rng.integers(0, 4, rows),
+        "corners_for_avg": rng.uniform(2, 9, rows),
+        "total_corners_avg": rng.uniform(6, 13, rows),
+    }
+    if cols:
+        data[cols["win"]] = rng.uniform(10, 80, rows)
+        data[cols["rpg"]] = rng.uniform(-1.5, 2.5, rows)
+        data[cols["over15"]] = rng.uniform(40, 100, rows)
+        data[cols["over25"]] = rng.uniform(20, 90, rows)
+        data[cols["btts"]] = rng.uniform(20, 80, rows)
+        data[cols["over05_ht"]] = rng.uniform(40, 95, rows)
+    return pd.DataFrame(data)
+
+
+def measure(fn: Callable[[], Any], calls: int, alloc_calls: int) -> Dict[str, Any]:
+    """Tempo por chamada (ns) e alocações por chamada (bytes) de `fn`."""
+    fn()  # aquecimento
+
+    samples: List[int] = []
+    for _ in range(calls):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    samples.sort()
+
+    peaks: List[int] = []
+    retained: List[int] = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = fn()
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+            del result
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "ns_min": samples[0],
+        "ns_p50": int(percentile(samples, 50)),
+        "ns_p99": int(percentile(samples, 99)),
+        "ns_mean": int(sum(samples) / len(samples)),
+        "alloc_peak_bytes": int(sum(peaks) / len(peaks)) if peaks else 0,
+        "alloc_retained_bytes": int(sum(retained) / len(retained)) if retained else 0,
+    }
+
+
+def bench_functions(rows_list: List[int], calls: int, alloc_calls: int, seed: int) -> Dict[str, Any]:
+    from backend.utils.h2h_engine import _safe_mean, analyze_asian_markets, analyze_h2h
+    from app.services import h2h_analyzer as analyzer_mod
+
+    analyzer = analyzer_mod.H2HAnalyzer()
+    results: Dict[str, Any] = {}
+
+    for layout in LAYOUTS:
+        for rows in rows_list:
+            df_home = make_frame(rows, layout, seed)
+            df_away = make_frame(rows, layout, seed + 1)
+            key = f"{layout}/rows={rows}"
+            rpg_cols = ["rpg", "power_index", "rating"]
+
+            frames = {"home": df_home, "away": df_away}
+            original_loader = analyzer_mod.load_team_data
+            analyzer_mod.load_team_data = lambda league_id, team_id: frames[team_id]
+            try:
+                results[key] = {
+                    "_safe_mean": measure(lambda: _safe_mean(df_home, rpg_cols, 1.0), calls, alloc_calls),
+                    "analyze_h2h": measure(lambda: analyze_h2h(df_home, df_away), calls, alloc_calls),
+                    "analyze_asian_markets": measure(
+                        lambda: analyze_asian_markets(df_home, df_away, "Home FC", "Away FC"), calls, alloc_calls
+                    ),
+                    "H2HAnalyzer.analyze_h2h[compute]": measure(
+                        lambda: analyzer.analyze_h2h("bench", "home", "away"), calls, alloc_calls
+                    ),
+                }
+            finally:
+                analyzer_mod.load_team_data = original_loader
+
+    return results
+
+
+def bench_analyzer_io(teams: int, calls: int, alloc_calls: int, seed: int) -> Dict[str, Any]:
+    """H2HAnalyzer.analyze_h2h lendo CSVs reais do disco (dois dialetos)."""
+    from app.services.h2h_analyzer import H2HAnalyzer
+    from app.utils import file_manager
+
+    analyzer = H2HAnalyzer()
+    results: Dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory(prefix="h2h-engine-bench-") as tmp:
+        catalog = generate_leagues(Path(tmp), leagues=2, teams=teams, seed=seed, with_logos=False)
+        original = file_manager.get_leagues_path
+        file_manager.get_leagues_path = lambda: Path(tmp) / "leagues"
+        try:
+            for league, entries in sorted(catalog.items()):
+                home, away = entries[0]["slug"], entries[1]["slug"]
+                results[league] = measure(lambda: analyzer.analyze_h2h(league, home, away), calls, alloc_calls)
+        finally:
+            file_manager.get_leagues_path = original
+
+    return results
+
+
+def bench_league_sweep(teams: int, rows: int, layout: str, seed: int) -> Dict[str, Any]:
+    """Todos os pares ordenados de uma liga com frames já carregados em memória."""
+    from backend.utils.h2h_engine import analyze_asian_markets, analyze_h2h
+
+    rng = random.Random(seed)
+    frames = [make_frame(rows, layout, rng.randrange(1 << 30)) for _ in range(teams)]
+    names = [f"Team {i:03d}" for i in range(teams)]
+    pairs = [(h, a) for h in range(teams) for a in range(teams) if h != a]
+
+    t0 = time.perf_counter_ns()
+    for h, a in pairs:
+        analyze_h2h(frames[h], frames[a])
+        analyze_asian_markets(frames[h], frames[a], names[h], names[a])
+    elapsed = time.perf_counter_ns() - t0
+
+    return {
+        "teams": teams,
+        "rows": rows,
+        "layout": layout,
+        "pairs": len(pairs),
+        "total_s": round(elapsed / 1e9, 4),
+        "ns_per_pair": int(elapsed / len(pairs)),
+    }
+
+
+def bench_league_matrix(teams: int, rows: int, layout: str, seed: int) -> Dict[str, Any]:
+    """H2HMatrix da liga inteira: tempo de construção e memória vs. árvore de dicts."""
+    from backend.utils.h2h_engine import build_h2h_response
+    from backend.utils.h2h_model import H2HMatrix, TeamFeatures
+
+    rng = random.Random(seed)
+    names = [f"Team {i:03d}" for i in range(teams)]
+    frames = {name: make_frame(rows, layout, rng.randrange(1 << 30)) for name in names}
+    pairs = [(h, a) for h in names for a in names if h != a]
+
+    t0 = time.perf_counter_ns()
+    matrix = H2HMatrix.build("bench", {name: TeamFeatures.from_frame(df) for name, df in frames.items()})
+    build_ns = time.perf_counter_ns() - t0
+
+    t0 = time.perf_counter_ns()
+    for h, a in pairs:
+        matrix.response(h, a)
+    render_ns = time.perf_counter_ns() - t0
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        responses = {(h, a): build_h2h_response("bench", frames[h], frames[a], h, a) for h, a in pairs}
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del responses
+
+    return {
+        "teams": teams,
+        "rows": rows,
+        "layout": layout,
+        "pairs": len(pairs),
+        "build_total_s": round(build_ns / 1e9, 4),
+        "build_ns_per_pair": int(build_ns / len(pairs)),
+        "render_ns_per_pair": int(render_ns / len(pairs)),
+        "matrix_bytes": matrix.nbytes,
+        "dict_tree_bytes": after - before,
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Micro-benchmarks do motor H2H.")
+    p.add_argument("--rows", type=int, nargs="+", default=[1, 10, 100, 1000])
+    p.add_argument("--calls", type=int, default=200, help="chamadas medidas por caso")
+    p.add_argument("--alloc-calls", type=int, default=20, help="chamadas medidas com tracemalloc")
+    p.add_argument("--sweep-teams", type=int, default=20)
+    p.add_argument("--sweep-layout", choices=sorted(LAYOUTS), default="primary")
+    p.add_argument("--seed", type=int, default=44)
+    p.add_argument("--output", type=Path, default=None, help="arquivo JSON de saída (padrão: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    report = {
+        "meta": run_meta(
+            {
+                "rows": args.rows,
+                "calls": args.calls,
+                "alloc_calls": args.alloc_calls,
+                "sweep_teams": args.sweep_teams,
+                "sweep_layout": args.sweep_layout,
+                "seed": args.seed,
+            }
+        ),
+        "results": {
+            "functions": bench_functions(args.rows, args.calls, args.alloc_calls, args.seed),
+            "analyzer_with_io": bench_analyzer_io(args.sweep_teams, args.calls, args.alloc_calls, args.seed),
+            "league_sweep": bench_league_sweep(args.sweep_teams, 1, args.sweep_layout, args.seed),
+            "league_matrix": bench_league_matrix(args.sweep_teams, 1, args.sweep_layout, args.seed),
+        },
+    }
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
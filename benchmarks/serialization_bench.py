@@ -0,0 +1,179 @@
+"""
+Benchmark de serialização das respostas H2H.
+
+Compara, para os dois formatos de resposta:
+
+- backend  (/api/h2h do backend/): dicts aninhados com os mercados asiáticos
+- root     (/api/h2h do main.py):  linhas do csv.DictReader (dicts de strings)
+
+os caminhos:
+
+- fastapi_default : jsonable_encoder + json.dumps (o que o FastAPI faz por padrão)
+- codec           : backend.utils.json_codec.dumps (orjson, ou stdlib sem jsonable_encoder)
+- codec_fragments : explicações dos mercados como orjson.Fragment pré-serializados
+                    (só backend, requer orjson >= 3.9)
+
+Na medição original, os fragmentos ficaram ~2.5x mais lentos que `codec`: o custo
+de copiar os dicts para trocar os textos supera o ganho de não recodificá-los,
+por isso o caminho de produção usa apenas `codec`. O cenário fica aqui para
+reavaliar com payloads maiores.
+
+Uso:
+    python -m benchmarks.serialization_bench --calls 2000 --output bench_json.json
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from .engine_bench import make_frame
+from .report import emit, percentile, run_meta
+from .synthetic import AGGREGATED_COLUMNS
+
+
+def fastapi_default(content: Any) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def backend_payload(seed: int) -> Dict[str, Any]:
+    """Resposta real do motor para frames com tendência alta de gols (4 mercados candidatos)."""
+    from backend.utils.h2h_engine import build_h2h_response
+
+    df_home = make_frame(1, "primary", seed)
+    df_away = make_frame(1, "primary", seed + 1)
+    for df in (df_home, df_away):
+        df["over25"] = 78.0
+        df["over_0_5_ht"] = 80.0
+        df["btts_yes"] = 70.0
+    df_home["rpg"] = 1.4
+    df_away["rpg"] = 0.2
+    return build_h2h_response("bench-league", df_home, df_away, "Sporting Clube Bench", "Atlético Bench")
+
+
+def root_payload(rows: int) -> Dict[str, Any]:
+    """Mesmo formato do main.py raiz: todas as colunas como strings, por linha."""
+    row = {c: "1.2345" for c in AGGREGATED_COLUMNS}
+    row["team_name"] = "Bench FC"
+    stats = [dict(row) for _ in range(rows)]
+    return {
+        "data": {
+            "league": "bench-league",
+            "home": {"slug": "home", "name": "Home", "stats": stats},
+            "away": {"slug": "away", "name": "Away", "stats": [dict(r) for r in stats]},
+            "prediction": {"better_team": "home", "confidence": 0.7},
+        }
+    }
+
+
+def dumps_with_fragments(response: Dict[str, Any]) -> bytes:
+    """Troca as explicações (textos fixos) por fragmentos pré-serializados."""
+    from backend.utils.json_codec import dumps
+
+    encoded_markets = []
+    for market in response.get("asian_markets", []):
+        suggestions = {
+            kind: dict(s, explanation=_fragment(s["explanation"]))
+            for kind, s in market["suggestions"].items()
+        }
+        encoded_markets.append(dict(market, suggestions=suggestions))
+    return dumps(dict(response, asian_markets=encoded_markets))
+
+
+_FRAGMENTS: Dict[str, Any] = {}
+
+
+def _fragment(text: str) -> Any:
+    import orjson
+
+    frag = _FRAGMENTS.get(text)
+    if frag is None:
+        frag = _FRAGMENTS[text] = orjson.Fragment(orjson.dumps(text))
+    return frag
+
+
+def has_fragments() -> bool:
+    try:
+        import orjson
+    except ImportError:
+        return False
+    return hasattr(orjson, "Fragment")
+
+
+def time_encoder(fn: Callable[[Any], bytes], content: Any, calls: int) -> Dict[str, Any]:
+    fn(content)
+    samples: List[int] = []
+    for _ in range(calls):
+        t0 = time.perf_counter_ns()
+        fn(content)
+        samples.append(time.perf_counter_ns() - t0)
+    samples.sort()
+    return {
+        "ns_p50": int(percentile(samples, 50)),
+        "ns_p99": int(percentile(samples, 99)),
+        "ns_mean": int(sum(samples) / len(samples)),
+        "bytes": len(fn(content)),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark de serialização JSON das respostas H2H.")
+    p.add_argument("--calls", type=int, default=2000)
+    p.add_argument("--root-rows", type=int, nargs="+", default=[1, 20, 200])
+    p.add_argument("--seed", type=int, default=44)
+    p.add_argument("--output", type=Path, default=None, help="arquivo JSON de saída (padrão: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    from backend.utils import json_codec
+
+    args = parse_args(argv)
+    results: Dict[str, Any] = {}
+
+    payload = backend_payload(args.seed)
+    backend = {
+        "fastapi_default": time_encoder(fastapi_default, payload, args.calls),
+        "codec": time_encoder(json_codec.dumps, payload, args.calls),
+    }
+    if has_fragments():
+        assert json.loads(dumps_with_fragments(payload)) == json.loads(fastapi_default(payload))
+        backend["codec_fragments"] = time_encoder(dumps_with_fragments, payload, args.calls)
+    base = backend["fastapi_default"]["ns_p50"]
+    for name in backend:
+        if name == "fastapi_default":
+            continue
+        backend[name]["speedup_vs_default"] = round(base / max(backend[name]["ns_p50"], 1), 2)
+    results["backend_h2h"] = backend
+
+    for rows in args.root_rows:
+        payload = root_payload(rows)
+        root = {
+            "fastapi_default": time_encoder(fastapi_default, payload, args.calls),
+            "codec": time_encoder(json_codec.dumps, payload, args.calls),
+        }
+        root["codec"]["speedup_vs_default"] = round(
+            root["fastapi_default"]["ns_p50"] / max(root["codec"]["ns_p50"], 1), 2
+        )
+        results[f"root_h2h/rows={rows}"] = root
+
+    report = {
+        "meta": run_meta(
+            {
+                "calls": args.calls,
+                "root_rows": args.root_rows,
+                "orjson": json_codec.HAS_ORJSON,
+                "fragments": has_fragments(),
+            }
+        ),
+        "results": results,
+    }
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
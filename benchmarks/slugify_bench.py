@@ -0,0 +1,123 @@
+"""
+Micro-benchmark de `app/utils/team_normalizer.slugify`.
+
+Compara, por tipo de entrada:
+
+- legacy      : a implementação anterior (NFKD + encode/decode + re.sub a cada chamada)
+- precompiled : regex pré-compiladas e atalho para texto só ASCII, sem memoização
+                (`slugify.__wrapped__`, o custo de uma falta no cache)
+- memoized    : `slugify` com o cache quente (o caso da rota H2H: os mesmos times
+                chegam o tempo todo)
+
+Antes de medir, confere que as três dão o mesmo slug para os nomes de exemplo
+e para `--check` strings aleatórias (ASCII, acentos, espaços unicode, `_`).
+
+Os tempos são por chamada, a partir de lotes de `--calls` chamadas (o
+perf_counter por chamada custaria mais que a própria chamada em cache).
+
+Uso:
+    python -m benchmarks.slugify_bench --calls 20000 --output bench_slugify.json
+"""
+import argparse
+import random
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .report import emit, percentile, run_meta
+
+INPUTS: Dict[str, List[str]] = {
+    # o que a rota recebe na maioria das vezes: o próprio slug do arquivo
+    "slug": ["sevilla-fc", "athletic-bilbao", "hellas-verona", "real-madrid"],
+    "ascii_name": ["Sevilla FC", "Athletic Bilbao", "Hellas Verona", "sevilla_fc"],
+    "accented": ["Atlético Madrid", "Deportivo Alavés", "Bayern München", "Málaga CF"],
+    "prefixed": ["italy---serie-a---napoli", "Italy - Serie A - Inter", "spain---laliga---cádiz-cf"],
+}
+
+_ALPHABET = "abcXYZ019 _-.'&/()\t  \x1céãçüñøß–—™"
+
+
+def legacy_slugify(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKD', text)
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    text = text.lower()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = text.replace('_', '-')
+    text = re.sub(r'[-\s]+', '-', text)
+    return text.strip('-')
+
+
+def check_equivalence(slugify: Callable[[str], str], samples: int, seed: int) -> int:
+    rng = random.Random(seed)
+    texts = [t for group in INPUTS.values() for t in group] + [""]
+    texts += ["".join(rng.choice(_ALPHABET) for _ in range(rng.randint(1, 24))) for _ in range(samples)]
+    for text in texts:
+        expected = legacy_slugify(text)
+        for fn in (slugify, slugify.__wrapped__):
+            got = fn(text)
+            assert got == expected, f"{fn.__name__}({text!r}) = {got!r}, esperado {expected!r}"
+    return len(texts)
+
+
+def time_calls(fn: Callable[[str], str], texts: List[str], calls: int, repeats: int) -> Dict[str, Any]:
+    batch = (texts * (calls // len(texts) + 1))[:calls]
+    for text in texts:
+        fn(text)
+    samples: List[float] = []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        for text in batch:
+            fn(text)
+        samples.append((time.perf_counter_ns() - t0) / len(batch))
+    samples.sort()
+    return {"ns_p50": round(percentile(samples, 50), 1), "ns_min": round(samples[0], 1)}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Micro-benchmark do slugify dos nomes de times.")
+    p.add_argument("--calls", type=int, default=20000, help="chamadas por lote")
+    p.add_argument("--repeats", type=int, default=7)
+    p.add_argument("--check", type=int, default=5000, help="strings aleatórias na verificação de equivalência")
+    p.add_argument("--seed", type=int, default=48)
+    p.add_argument("--output", type=Path, default=None, help="arquivo JSON de saída (padrão: stdout)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    from app.utils.team_normalizer import SLUG_CACHE_SIZE, slugify
+
+    args = parse_args(argv)
+    checked = check_equivalence(slugify, args.check, args.seed)
+
+    results: Dict[str, Any] = {}
+    for kind, texts in INPUTS.items():
+        row = {
+            "legacy": time_calls(legacy_slugify, texts, args.calls, args.repeats),
+            "precompiled": time_calls(slugify.__wrapped__, texts, args.calls, args.repeats),
+            "memoized": time_calls(slugify, texts, args.calls, args.repeats),
+        }
+        base = row["legacy"]["ns_p50"]
+        for name in ("precompiled", "memoized"):
+            row[name]["speedup_vs_legacy"] = round(base / max(row[name]["ns_p50"], 0.1), 2)
+        results[kind] = row
+
+    report = {
+        "meta": run_meta(
+            {
+                "calls": args.calls,
+                "repeats": args.repeats,
+                "checked_inputs": checked,
+                "cache_size": SLUG_CACHE_SIZE,
+            }
+        ),
+        "results": results,
+    }
+    emit(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
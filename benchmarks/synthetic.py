@@ -0,0 +1,269 @@
+"""
+Gerador de ligas sintéticas para os benchmarks.
+
+Produz a mesma estrutura de `data/leagues`:
+
+    {root}/leagues/{league_slug}/liga.json
+    {root}/leagues/{league_slug}/{team_slug}.csv
+    {root}/team_logos/{team_id}.png
+
+Os CSVs alternam entre os dois dialetos existentes no repositório:
+
+- "aggregated": `team_name;matches_played;...;total_corners_avg` (ex.: laliga/barcelona.csv)
+- "season":     `team;league;season;gp_total;...;clean_sheets_pct` (ex.: italy---serie-a---napoli.csv)
+"""
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DIALECTS = ("aggregated", "season")
+
+AGGREGATED_COLUMNS = [
+    "team_name", "matches_played", "home_matches", "away_matches",
+    "ppg_home", "ppg_away", "ppg_total",
+    "gf_home", "gf_away", "gf_total", "gf_avg_home", "gf_avg_away", "gf_avg_total",
+    "ga_home", "ga_away", "ga_total", "ga_avg_home", "ga_avg_away", "ga_avg_total",
+    "over15", "over25", "over35", "under15", "under25", "btts_yes", "btts_no",
+    "corners_for_home", "corners_for_away", "corners_for_avg",
+    "corners_against_home", "corners_against_away", "corners_against_avg", "total_corners_avg",
+]
+
+SEASON_COLUMNS = [
+    "team", "league", "season",
+    "gp_total", "w_total", "d_total", "l_total", "ppg_total",
+    "gp_home", "w_home", "d_home", "l_home", "ppg_home",
+    "gp_away", "w_away", "d_away", "l_away", "ppg_away",
+    "gf_per_match", "ga_per_match", "total_goals_per_match",
+    "over15_pct", "over25_pct", "over35_pct", "btts_pct", "ht_over05_pct", "ht_over15_pct",
+    "corners_for_avg", "corners_against_avg", "total_corners_avg",
+    "scoring_rate_pct", "conceding_rate_pct", "clean_sheets_pct",
+]
+
+# PNG 1x1 transparente
+_PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def _aggregated_row(rng: random.Random, name: str) -> Dict[str, object]:
+    home, away = rng.randint(4, 10), rng.randint(4, 10)
+    played = home + away
+    gf_home, gf_away = rng.randint(0, 3 * home), rng.randint(0, 3 * away)
+    ga_home, ga_away = rng.randint(0, 2 * home), rng.randint(0, 2 * away)
+    over15, over25 = rng.randint(40, 100), rng.randint(20, 90)
+    btts = rng.randint(20, 80)
+    cf_home, cf_away = round(rng.uniform(2, 9), 2), round(rng.uniform(2, 9), 2)
+    ca_home, ca_away = round(rng.uniform(2, 8), 2), round(rng.uniform(2, 8), 2)
+
+    return {
+        "team_name": name,
+        "matches_played": played,
+        "home_matches": home,
+        "away_matches": away,
+        "ppg_home": round(rng.uniform(0.3, 3.0), 2),
+        "ppg_away": round(rng.uniform(0.2, 2.8), 2),
+        "ppg_total": round(rng.uniform(0.3, 2.9), 2),
+        "gf_home": gf_home,
+        "gf_away": gf_away,
+        "gf_total": gf_home + gf_away,
+        "gf_avg_home": gf_home / home,
+        "gf_avg_away": gf_away / away,
+        "gf_avg_total": (gf_home + gf_away) / played,
+        "ga_home": ga_home,
+        "ga_away": ga_away,
+        "ga_total": ga_home + ga_away,
+        "ga_avg_home": ga_home / home,
+        "ga_avg_away": ga_away / away,
+        "ga_avg_total": (ga_home + ga_away) / played,
+        "over15": over15,
+        "over25": min(over25, over15),
+        "over35": rng.randint(0, min(over25, over15)),
+        "under15": 100 - over15,
+        "under25": 100 - min(over25, over15),
+        "btts_yes": btts,
+        "btts_no": 100 - btts,
+        "corners_for_home": cf_home,
+        "corners_for_away": cf_away,
+        "corners_for_avg": round((cf_home + cf_away) / 2, 3),
+        "corners_against_home": ca_home,
+        "corners_against_away": ca_away,
+        "corners_against_avg": round((ca_home + ca_away) / 2, 3),
+        "total_corners_avg": round((cf_home + cf_away + ca_home + ca_away) / 2, 2),
+    }
+
+
+def _season_row(rng: random.Random, name: str, league_name: str) -> Dict[str, object]:
+    gp_home, gp_away = rng.randint(4, 10), rng.randint(4, 10)
+    w_home, w_away = rng.randint(0, gp_home), rng.randint(0, gp_away)
+    d_home, d_away = rng.randint(0, gp_home - w_home), rng.randint(0, gp_away - w_away)
+    gp = gp_home + gp_away
+    w, d = w_home + w_away, d_home + d_away
+    gf, ga = round(rng.uniform(0.5, 2.8), 2), round(rng.uniform(0.4, 2.2), 2)
+
+    return {
+        "team": name,
+        "league": league_name,
+        "season": "2025/2026",
+        "gp_total": gp,
+        "w_total": w,
+        "d_total": d,
+        "l_total": gp - w - d,
+        "ppg_total": round((3 * w + d) / gp, 2),
+        "gp_home": gp_home,
+        "w_home": w_home,
+        "d_home": d_home,
+        "l_home": gp_home - w_home - d_home,
+        "ppg_home": round((3 * w_home + d_home) / gp_home, 2),
+        "gp_away": gp_away,
+        "w_away": w_away,
+        "d_away": d_away,
+        "l_away": gp_away - w_away - d_away,
+        "ppg_away": round((3 * w_away + d_away) / gp_away, 2),
+        "gf_per_match": gf,
+        "ga_per_match": ga,
+        "total_goals_per_match": round(gf + ga, 2),
+        "over15_pct": rng.randint(40, 100),
+        "over25_pct": rng.randint(20, 80),
+        "over35_pct": rng.randint(0, 40),
+        "btts_pct": rng.randint(20, 80),
+        "ht_over05_pct": rng.randint(40, 90),
+        "ht_over15_pct": rng.randint(5, 45),
+        "corners_for_avg": round(rng.uniform(2, 9), 2),
+        "corners_against_avg": round(rng.uniform(2, 8), 2),
+        "total_corners_avg": round(rng.uniform(6, 13), 2),
+        "scoring_rate_pct": rng.randint(40, 95),
+        "conceding_rate_pct": rng.randint(30, 90),
+        "clean_sheets_pct": rng.randint(5, 60),
+    }
+
+
+def _write_csv(path: Path, columns: List[str], row: Dict[str, object]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(";".join(columns) + "\n")
+        f.write(";".join(str(row[c]) for c in columns) + "\n")
+
+
+def generate_leagues(
+    root: Path,
+    leagues: int = 2,
+    teams: int = 20,
+    seed: int = 44,
+    dialect: Optional[str] = None,
+    with_logos: bool = True,
+) -> Dict[str, List[Dict[str, object]]]:
+    """
+    Gera `leagues` ligas com `teams` times cada em `root`.
+
+    Se `dialect` for None, as ligas alternam entre os dois dialetos de CSV.
+    Retorna {league_slug: [{"slug", "name", "team_id"}, ...]}.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    leagues_dir = root / "leagues"
+    logos_dir = root / "team_logos"
+    leagues_dir.mkdir(parents=True, exist_ok=True)
+    if with_logos:
+        logos_dir.mkdir(parents=True, exist_ok=True)
+
+    catalog: Dict[str, List[Dict[str, object]]] = {}
+    next_team_id = 100000
+
+    for li in range(leagues):
+        league_dialect = dialect or DIALECTS[li % len(DIALECTS)]
+        league_slug = f"bench-league-{li + 1:02d}"
+        league_name = f"Bench League {li + 1:02d}"
+        league_path = leagues_dir / league_slug
+        league_path.mkdir(exist_ok=True)
+
+        with open(league_path / "liga.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "league": league_name,
+                    "league_slug": league_slug,
+                    "league_id": str(900000 + li),
+                    "season_id": "2025/2026",
+                    "dialect": league_dialect,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+        entries = []
+        for ti in range(teams):
+            name = f"Team {li + 1:02d} {ti + 1:03d}"
+            slug = f"team-{li + 1:02d}-{ti + 1:03d}"
+            team_id = next_team_id
+            next_team_id += 1
+
+            if league_dialect == "aggregated":
+                _write_csv(league_path / f"{slug}.csv", AGGREGATED_COLUMNS, _aggregated_row(rng, name))
+            else:
+                _write_csv(league_path / f"{slug}.csv", SEASON_COLUMNS, _season_row(rng, name, league_name))
+
+            if with_logos:
+                (logos_dir / f"{team_id}.png").write_bytes(_PNG_1X1)
+
+            entries.append({"slug": slug, "name": name, "team_id": team_id})
+
+        catalog[league_slug] = entries
+
+    return catalog
+
+
+# ----------------------------------------------------
+# LEDGERS DE PARTIDAS (BACKTEST)
+# ----------------------------------------------------
+LEDGER_COLUMNS = ["date", "home_team", "away_team", "home_goals", "away_goals", "home_goals_ht", "away_goals_ht"]
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    # Knuth: suficiente para médias de gols (< 4)
+    limit, k, p = pow(2.718281828459045, -lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def generate_ledgers(
+    root: Path,
+    leagues: int = 2,
+    seasons: int = 3,
+    teams: int = 20,
+    seed: int = 44,
+) -> int:
+    """
+    Gera `{root}/ledgers/{league_slug}/{season}.csv` (turno e returno, gols
+    Poisson por força do time, ~45% dos gols no 1º tempo). Retorna o total de partidas.
+    """
+    rng = random.Random(seed)
+    ledgers_dir = Path(root) / "ledgers"
+    total = 0
+
+    for li in range(leagues):
+        league_path = ledgers_dir / f"bench-league-{li + 1:02d}"
+        league_path.mkdir(parents=True, exist_ok=True)
+        names = [f"team-{li + 1:02d}-{ti + 1:03d}" for ti in range(teams)]
+
+        for si in range(seasons):
+            attack = {n: rng.uniform(0.8, 1.9) for n in names}
+            defense = {n: rng.uniform(0.7, 1.4) for n in names}
+            fixtures = [(h, a) for h in names for a in names if h != a]
+            rng.shuffle(fixtures)
+
+            with open(league_path / f"{2015 + si}.csv", "w", encoding="utf-8") as f:
+                f.write(";".join(LEDGER_COLUMNS) + "\n")
+                for day, (h, a) in enumerate(fixtures):
+                    hg = _poisson(rng, attack[h] * defense[a] * 1.1)
+                    ag = _poisson(rng, attack[a] * defense[h] * 0.9)
+                    hg_ht = sum(rng.random() < 0.45 for _ in range(hg))
+                    ag_ht = sum(rng.random() < 0.45 for _ in range(ag))
+                    date = f"{2015 + si}-08-01T{day % 24:02d}:00:00"
+                    f.write(f"{date};{h};{a};{hg};{ag};{hg_ht};{ag_ht}\n")
+            total += len(fixtures)
+
+    return total
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -22,12 +23,81 @@ class Settings:
     LEAGUES_DIR = DATA_DIR / "leagues"
 
 
+    # ===========================
+    # ARMAZENAMENTO DOS TIMES
+    # ===========================
+    # csv    -> data/leagues/<liga>/<time>.csv (padrão)
+    # sqlite -> TEAM_STORE_SQLITE_PATH (importar com: python -m app.utils.sqlite_store import)
+    TEAM_STORE = os.getenv("TEAM_STORE", "csv")
+    TEAM_STORE_SQLITE_PATH = Path(os.getenv("TEAM_STORE_SQLITE_PATH", str(DATA_DIR / "team_stats.sqlite3")))
+    # CSVs lidos e parseados mantidos em memória (backend/utils/team_data.py), por arquivo
+    TEAM_DATA_CACHE_SIZE = int(os.getenv("TEAM_DATA_CACHE_SIZE", "512"))
+    # Resolução de nomes de times (backend/utils/name_index.py): busca aproximada por trigramas
+    NAME_MATCH_MIN_SCORE = float(os.getenv("NAME_MATCH_MIN_SCORE", "0.5"))
+    NAME_MATCH_MIN_MARGIN = float(os.getenv("NAME_MATCH_MIN_MARGIN", "0.1"))
+    # Threads para leituras de disco das rotas async (backend/utils/async_io.py)
+    IO_THREADS = int(os.getenv("IO_THREADS", "16"))
+    # Vários workers: stats compiladas publicadas por um carregador e mapeadas (mmap) por todos
+    # (python -m backend.utils.shared_stats publish --watch 30)
+    SHARED_STATS_ENABLED = os.getenv("SHARED_STATS_ENABLED", "0") == "1"
+    SHARED_STATS_DIR = Path(os.getenv(
+        "SHARED_STATS_DIR",
+        "/dev/shm/h2h-stats" if Path("/dev/shm").is_dir() else str(DATA_DIR / "shared_stats"),
+    ))
+
+
+    # ===========================
+    # SNAPSHOTS HISTÓRICOS (as_of)
+    # ===========================
+    # Cada atualização grava uma versão imutável de cada time
+    SNAPSHOTS_ENABLED = os.getenv("SNAPSHOTS_ENABLED", "1") == "1"
+    SNAPSHOTS_PATH = Path(os.getenv("SNAPSHOTS_PATH", str(DATA_DIR / "snapshots.sqlite3")))
+    # Um keyframe (todas as colunas) a cada N versões; as demais guardam só o delta
+    SNAPSHOT_KEYFRAME_EVERY = int(os.getenv("SNAPSHOT_KEYFRAME_EVERY", "16"))
+
+
+    # ===========================
+    # HISTÓRICO DE PARTIDAS (LEDGER / BACKTEST)
+    # ===========================
+    # data/ledgers/<liga>/<temporada>.ledger (colunar, append-only) ou .csv
+    LEDGERS_DIR = Path(os.getenv("LEDGERS_DIR", str(DATA_DIR / "ledgers")))
+    # O SofascoreService grava cada partida buscada no ledger da temporada
+    MATCH_LEDGER_ENABLED = os.getenv("MATCH_LEDGER_ENABLED", "1") == "1"
+    # Forma recente (/api/h2h?form=ewm): meia-vida da média exponencial, em jogos
+    FORM_EWM_HALF_LIFE = float(os.getenv("FORM_EWM_HALF_LIFE", "6"))
+    # Modelo de placares (/api/h2h/scoreline): peso das partidas cai pela metade a cada N dias
+    SCORELINE_HALF_LIFE_DAYS = float(os.getenv("SCORELINE_HALF_LIFE_DAYS", "180"))
+    SCORELINE_MAX_GOALS = int(os.getenv("SCORELINE_MAX_GOALS", "10"))
+    # Monte Carlo das linhas HT e do HT/FT: partidas simuladas por confronto (0 desliga)
+    SIM_MATCHES = int(os.getenv("SIM_MATCHES", "20000"))
+    SIM_SEED = int(os.getenv("SIM_SEED", "0"))
+    # Ranking de força + classificação por liga, recalculados a cada atualização (JSON por liga)
+    RANKINGS_DIR = Path(os.getenv("RANKINGS_DIR", str(DATA_DIR / "rankings")))
+
+
     # ===========================
     # CONFIGS CORS
     # ===========================
     CORS_ORIGINS = ["*"]
 
 
+    # ===========================
+    # CACHE DE RESPOSTAS (ETag)
+    # ===========================
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "60"))
+    RESPONSE_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("RESPONSE_CACHE_STALE_WHILE_REVALIDATE", "300"))
+
+
+    # ===========================
+    # COMPRESSÃO (gzip / br)
+    # ===========================
+    # Corpos menores que isso vão sem compressão (o cabeçalho gzip não compensa)
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "512"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+
     # ===========================
     # ATUALIZAÇÃO DOS CSVs
     # ===========================
@@ -48,5 +118,39 @@ class Settings:
         )
     }
 
+    # ===========================
+    # TRANSPORTE HTTP (RECORD/REPLAY)
+    # ===========================
+    # live   -> chamadas reais ao SofaScore
+    # record -> chamadas reais + grava as respostas em fixtures
+    # replay -> responde a partir das fixtures, sem rede
+    SOFASCORE_HTTP_MODE = os.getenv("SOFASCORE_HTTP_MODE", "live")
+    SOFASCORE_FIXTURES_DIR = Path(
+        os.getenv("SOFASCORE_FIXTURES_DIR", str(DATA_DIR / "fixtures" / "sofascore"))
+    )
+
+    # Cache nome -> id do time no SofaScore (backend/updater/team_ids.py); após o TTL busca de novo
+    TEAM_IDS_PATH = Path(os.getenv("TEAM_IDS_PATH", str(DATA_DIR / "team_ids.json")))
+    TEAM_ID_TTL_DAYS = float(os.getenv("TEAM_ID_TTL_DAYS", "90"))
+
+    # Novas tentativas em falhas de rede / 5xx (0 = sem retry, o padrão: cada retry é mais
+    # uma chamada contra a cota do upstream)
+    SOFASCORE_MAX_RETRIES = int(os.getenv("SOFASCORE_MAX_RETRIES", "0"))
+    SOFASCORE_RETRY_BACKOFF_S = float(os.getenv("SOFASCORE_RETRY_BACKOFF_S", "0.5"))
+
+    # Limite de taxa (token bucket) de todas as chamadas ao SofaScore do processo (0 desliga)
+    SOFASCORE_RATE_PER_S = float(os.getenv("SOFASCORE_RATE_PER_S", "4"))
+    SOFASCORE_BURST = float(os.getenv("SOFASCORE_BURST", "8"))
+    # Circuit breaker: N respostas 429/403 ou timeouts seguidos abrem o circuito pelo cooldown
+    SOFASCORE_BREAKER_THRESHOLD = int(os.getenv("SOFASCORE_BREAKER_THRESHOLD", "3"))
+    SOFASCORE_BREAKER_COOLDOWN_S = float(os.getenv("SOFASCORE_BREAKER_COOLDOWN_S", "30"))
+    SOFASCORE_BREAKER_MAX_COOLDOWN_S = float(os.getenv("SOFASCORE_BREAKER_MAX_COOLDOWN_S", "600"))
+
+    # Latência (ms) e injeção de erros usadas apenas no modo replay
+    REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+    REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+    REPLAY_ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+    REPLAY_TIMEOUT_RATE = float(os.getenv("REPLAY_TIMEOUT_RATE", "0"))
+
 
 settings = Settings()